@@ -15,6 +15,7 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 from .board import ChessBoard, fen_flip, fen_mirror, fen_swap
+from .board_array import ChessBoardArray
 from .common import (
     ANY_COLOR,
     BLACK,
@@ -28,21 +29,27 @@ from .common import (
     fench_to_text,
     get_fen_type,
     get_fen_type_detail,
+    iccs2packed,
     iccs2pos,
     iccs_flip,
     iccs_list_mirror,
     iccs_mirror,
     iccs_swap,
+    pack_move,
+    packed2iccs,
     pos2iccs,
+    unpack_move,
 )
 from .engine import (
+    EngineIOHub,
     EngineManager,
+    EnginePool,
     EngineStatus,
     FenCache,
     UcciEngine,
     UciEngine,
 )
-from .engine_async import AsyncEngine, analyse_position, play_move
+from .engine_async import AsyncEngine, AsyncEnginePool, analyse_position, play_move
 from .exception import CChessError, EngineError
 from .game import Game
 from .move import Move
@@ -56,6 +63,8 @@ from .piece import (
     Piece,
     Rook,
 )
+from .search import Searcher
+from .ttable import TranspositionTable
 
 __all__ = [
     # exception
@@ -73,6 +82,10 @@ __all__ = [
     "iccs_list_mirror",
     "iccs_flip",
     "iccs_swap",
+    "pack_move",
+    "unpack_move",
+    "packed2iccs",
+    "iccs2packed",
     "fen_mirror",
     "fen_flip",
     "fen_swap",
@@ -94,6 +107,7 @@ __all__ = [
     "Pawn",
     # board
     "ChessBoard",
+    "ChessBoardArray",
     # move
     "Move",
     # game
@@ -103,10 +117,16 @@ __all__ = [
     "UcciEngine",
     "UciEngine",
     "EngineManager",
+    "EnginePool",
+    "EngineIOHub",
     "FenCache",
     "AsyncEngine",
+    "AsyncEnginePool",
     "play_move",
     "analyse_position",
+    # search
+    "Searcher",
+    "TranspositionTable",
     # version
     "__version__",
 ]
@@ -18,6 +18,7 @@ import argparse
 import pathlib
 import sys
 
+from .board import ChessBoard
 from .game import Game
 
 
@@ -79,15 +80,72 @@ def convert_format(input_file, output_file):
     print(f"转换成功: {input_file} ({in_ext[1:]}) -> {output_file} ({out_ext[1:]})")
 
 
+# -----------------------------------------------------#
+def perft_command(args):
+    """执行 perft：指定 FEN 时只测该局面，否则跑全部参考局面并校验节点数。"""
+    from .board_array import ChessBoardArray
+    from .perft import PERFT_POSITIONS, run_perft
+
+    board_class = ChessBoardArray if args.array else ChessBoard
+    if args.fen:
+        positions = [("custom", args.fen, ())]
+    else:
+        positions = PERFT_POSITIONS
+
+    failed = False
+    for name, fen, expected in positions:
+        print(f"{name}: {fen}")
+        for depth in range(1, args.depth + 1):
+            last = depth == args.depth
+            nodes, seconds = run_perft(
+                fen,
+                depth,
+                args.divide and last,
+                board_class,
+                output=print,
+                hash_mb=args.hash,
+            )
+            nps = int(nodes / seconds) if seconds > 0 else 0
+            status = ""
+            if depth <= len(expected):
+                ok = nodes == expected[depth - 1]
+                failed = failed or not ok
+                status = "OK" if ok else f"FAIL (expected {expected[depth - 1]})"
+            print(f"  depth {depth}: {nodes} nodes {seconds:.3f}s {nps} nps {status}")
+
+    if failed:
+        sys.exit(1)
+
+
 # -----------------------------------------------------#
 def main():
-    """命令行入口：读取棋谱并打印内容，或进行格式转换。"""
+    """命令行入口：读取棋谱并打印内容，进行格式转换，或执行 perft。"""
     parser = argparse.ArgumentParser(prog="python -m cchess")
     parser.add_argument("-r", "--readfile", help="read pgn,xqf,cbf and cbl file")
     parser.add_argument("-i", "--input", help="input file for format conversion")
     parser.add_argument("-o", "--output", help="output file for format conversion")
+
+    subparsers = parser.add_subparsers(dest="command")
+    perft_parser = subparsers.add_parser(
+        "perft", help="count move-generation nodes and report nodes per second"
+    )
+    perft_parser.add_argument("-d", "--depth", type=int, default=3, help="search depth")
+    perft_parser.add_argument("--fen", help="position to test (default: reference suite)")
+    perft_parser.add_argument(
+        "--divide", action="store_true", help="print node counts per first move"
+    )
+    perft_parser.add_argument(
+        "--array", action="store_true", help="use the ChessBoardArray backend"
+    )
+    perft_parser.add_argument(
+        "--hash", type=float, default=0, help="transposition table size in MB (0: off)"
+    )
     args = parser.parse_args()
 
+    if args.command == "perft":
+        perft_command(args)
+        return
+
     if args.input and args.output:
         convert_format(args.input, args.output)
         return
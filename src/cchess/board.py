@@ -14,20 +14,24 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
-from typing import Iterator, List, Optional, Tuple
+from array import array
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 
 from .common import (
+    PIECE_CODES,
     fench_to_species,
     fench_to_txt_name,
     iccs2pos,
     load_json,
     next_color,
+    pos2iccs,
     swap_fench,
 )
 from .constants import ANY_COLOR, BLACK, FEN_CHAR_SET, FEN_NUM_SET, RED
 from .exception import CChessError
 from .move import Move, MoveInfo
-from .piece import Piece
+from .piece import _ATTACK_FROM_TABLE, Piece
+from .ttable import EXACT, TranspositionTable
 from .zhash_data import Z_HASH_C90, Z_HASH_TABLE, Z_MAP_PIECES, Z_RED_KEY
 
 # -----------------------------------------------------#
@@ -60,6 +64,41 @@ _text_board = [
 ]
 
 
+# Zobrist 棋子键值表：_Z_PIECE_KEYS[fench][y][x]，预先展开避免每次计算下标
+_Z_PIECE_KEYS = {
+    fench: tuple(
+        tuple(Z_HASH_TABLE[chess * 256 + Z_HASH_C90[x + (9 - y) * 9]] for x in range(9))
+        for y in range(10)
+    )
+    for fench, chess in Z_MAP_PIECES.items()
+}
+
+# 按颜色索引的棋子字符（ANY_COLOR 不对应任何棋子）
+_COLOR_FENCHS = ("", "KABNRCP", "kabnrcp")
+
+# 直线方向（车、炮、对脸将的攻击线）
+_LINE_DIRECTIONS = ((0, 1), (0, -1), (1, 0), (-1, 0))
+
+# 马将军：马相对于王的偏移量，以及该马的马腿相对于王的偏移量
+_KNIGHT_CHECKS = tuple(
+    ((dx, dy), ((dx > 0) - (dx < 0), (dy > 0) - (dy < 0)))
+    for dx, dy in ((1, 2), (1, -2), (-1, 2), (-1, -2), (2, 1), (2, -1), (-2, 1), (-2, -1))
+)
+
+# 按被攻击方颜色索引的敌方棋子字符：(车, 炮, 马, 兵, 将)
+_ENEMY_FENCHS = ((), ("r", "c", "n", "p", "k"), ("R", "C", "N", "P", "K"))
+
+# MVV-LVA 排序：被吃棋子的价值等级（越大越先吃）与攻击子的价值等级（越小越先走）
+_VICTIM_RANK = {"k": 6, "r": 5, "c": 4, "n": 4, "a": 2, "b": 2, "p": 1}
+_ATTACKER_RANK = {"p": 1, "a": 2, "b": 2, "n": 3, "c": 3, "r": 4, "k": 5}
+
+# 静态交换评估（SEE）使用的子力价值，吃将视为远高于其他棋子
+SEE_VALUES = {"k": 10000, "r": 600, "c": 285, "n": 270, "a": 120, "b": 120, "p": 30}
+
+# 反向查找攻击者时按表查找的棋子种类（车、炮沿直线扫描）
+_TABLE_ATTACKERS = ("p", "a", "b", "n", "k")
+
+
 # -----------------------------------------------------#
 def _pos_to_text_board_pos(pos):
     """将棋盘坐标 (x,y) 转换为文本画板中字符位置。
@@ -91,18 +130,17 @@ class ChessBoard:
 
     def clear(self) -> "ChessBoard":
         """清空棋盘并将走子方设为任意颜色（`ANY_COLOR`）。"""
-        self._board: List[List[Optional[str]]] = [
-            [None for _ in range(9)] for _ in range(10)
-        ]
+        self._board: List[List[Optional[str]]] = [[None] * 9 for _ in range(10)]
         self._move_side = ANY_COLOR
-        # 攻击矩阵缓存
-        self._red_attacks: List[List[bool]] = [
-            [False for _ in range(9)] for _ in range(10)
-        ]
-        self._black_attacks: List[List[bool]] = [
-            [False for _ in range(9)] for _ in range(10)
-        ]
-        self._attack_matrix_dirty = True
+        # 棋子部分的 Zobrist 键值，随走子增量维护（走子方在 zhash() 中合入）
+        self._zkey = 0
+        # 棋子位置表：{fench: 位置集合}，随走子增量维护
+        self._piece_pos: Dict[str, Set[Tuple[int, int]]] = {
+            fench: set() for fench in _COLOR_FENCHS[RED] + _COLOR_FENCHS[BLACK]
+        }
+        # push()/pop() 的撤销栈，以及每次 push 之前局面的哈希值
+        self._undo_stack: List[MoveInfo] = []
+        self._hash_history: List[int] = []
 
         return self
 
@@ -117,44 +155,54 @@ class ChessBoard:
         self._move_side = value
         return self
 
-    def copy(self) -> "ChessBoard":
-        """返回棋盘的快照（独立副本）。"""
+    def copy(self, history: bool = False) -> "ChessBoard":
+        """返回棋盘的快照（独立副本）。
+
+        默认只复制局面，副本的 push/pop 撤销栈与哈希历史为空（`move()` 每步都会
+        复制棋盘，复制历史的开销会随对局长度增长）；`history=True` 时一并复制，
+        副本可以继续 `pop()` 并检测重复局面。
+        """
         b = self.__class__()
         b._board = [row[:] for row in self._board]
         b.set_move_side(self._move_side)
-        b._red_attacks = [row[:] for row in self._red_attacks]
-        b._black_attacks = [row[:] for row in self._black_attacks]
-        b._attack_matrix_dirty = self._attack_matrix_dirty
+        b._zkey = self._zkey
+        b._piece_pos = {fench: pos.copy() for fench, pos in self._piece_pos.items()}
+        if history:
+            b._undo_stack = self._undo_stack[:]
+            b._hash_history = self._hash_history[:]
         return b
 
     def from_board(self, b: "ChessBoard") -> "ChessBoard":
-        """从另一个ChessBoard Copy属性"""
-        self._board = b._board
+        """从另一个ChessBoard Copy属性
+
+        复制格子与增量维护的状态，之后两个棋盘各自走子互不影响。
+        """
+        self._board = [row[:] for row in b._board]
         self._move_side = b.move_side()
-        # 复制攻击矩阵缓存（如果存在）
-        if hasattr(b, "_red_attacks"):
-            self._red_attacks = b._red_attacks
-            self._black_attacks = b._black_attacks
-            self._attack_matrix_dirty = b._attack_matrix_dirty
-        else:
-            # 旧版本棋盘没有这些属性，标记为脏
-            self._red_attacks = [[False for _ in range(9)] for _ in range(10)]
-            self._black_attacks = [[False for _ in range(9)] for _ in range(10)]
-            self._attack_matrix_dirty = True
+        zkey = getattr(b, "_zkey", None)
+        piece_pos = getattr(b, "_piece_pos", None)
+        if zkey is None or piece_pos is None:
+            self._board_replaced()
+            return self
+        self._zkey = zkey
+        self._piece_pos = {fench: pos.copy() for fench, pos in piece_pos.items()}
+        # 局面被整体替换，原有走子历史不再适用
+        self._undo_stack = []
+        self._hash_history = []
         return self
 
     def mirror(self) -> "ChessBoard":
         """返回新棋盘: 沿竖直中线镜像（左右翻转）。"""
         b = self.copy()
         b._board = [[self._board[y][8 - x] for x in range(9)] for y in range(10)]
-        b._attack_matrix_dirty = True
+        b._board_replaced()
         return b
 
     def flip(self) -> "ChessBoard":
         """返回新棋盘: 绕横轴翻转（上下翻转）+ 沿竖直中线镜像（左右翻转）。"""
         b = self.copy()
         b._board = [[self._board[9 - y][8 - x] for x in range(9)] for y in range(10)]
-        b._attack_matrix_dirty = True
+        b._board_replaced()
         return b
 
     def swap(self) -> "ChessBoard":
@@ -174,7 +222,7 @@ class ChessBoard:
         ]
 
         b.set_move_side(next_color(b.move_side()))
-        b._attack_matrix_dirty = True
+        b._board_replaced()
 
         return b
 
@@ -263,16 +311,27 @@ class ChessBoard:
             self（支持链式调用）
         """
         self._validate_pos(pos)
-        self._board[pos[1]][pos[0]] = fench
-        self._attack_matrix_dirty = True
+        x, y = pos
+        old = self._board[y][x]
+        if old:
+            self._zkey ^= _Z_PIECE_KEYS[old][y][x]
+            self._piece_pos[old].discard(pos)
+        if fench:
+            self._zkey ^= _Z_PIECE_KEYS[fench][y][x]
+            self._piece_pos[fench].add(pos)
+        self._board[y][x] = fench
+        self._squares_changed((pos,))
         return self
 
     def pop_fench(self, pos):
         """移除并返回指定位置的棋子（若为空则返回 None）。"""
         self._validate_pos(pos)
         fench = self._board[pos[1]][pos[0]]
+        if fench:
+            self._zkey ^= _Z_PIECE_KEYS[fench][pos[1]][pos[0]]
+            self._piece_pos[fench].discard(pos)
         self._board[pos[1]][pos[0]] = None
-        self._attack_matrix_dirty = True
+        self._squares_changed((pos,))
         return fench
 
     def get_fench(self, pos):
@@ -305,20 +364,28 @@ class ChessBoard:
         return RED if fench.isupper() else BLACK
 
     def get_fench_positions(self, fench):
-        """返回棋盘上所有与给定 fench 相同的坐标列表。"""
-        positions = []
-        for x in range(9):
-            for y in range(10):
-                if self._board[y][x] == fench:
-                    positions.append((x, y))
-        return positions
+        """返回棋盘上所有与给定 fench 相同的坐标列表（按 x、y 排序）。"""
+        return sorted(self._piece_pos.get(fench, ()))
+
+    def count_fench(self, fench) -> int:
+        """返回棋盘上与给定 fench 相同的棋子个数。"""
+        return len(self._piece_pos.get(fench, ()))
 
     def get_fench_positions_x(self, fench, x):
         """返回指定列 x 上匹配 fench 的所有坐标。"""
+        return sorted(pos for pos in self._piece_pos.get(fench, ()) if pos[0] == x)
+
+    def _piece_positions(self, color=None) -> List[Tuple[int, int]]:
+        """返回指定颜色（None 为全部）所有棋子的位置，按 x、y 排序。"""
+        if color is None:
+            fenchs = _COLOR_FENCHS[RED] + _COLOR_FENCHS[BLACK]
+        else:
+            fenchs = _COLOR_FENCHS[color]
+        piece_pos = self._piece_pos
         positions = []
-        for y in range(10):
-            if self._board[y][x] == fench:
-                positions.append((x, y))
+        for fench in fenchs:
+            positions.extend(piece_pos[fench])
+        positions.sort()
         return positions
 
     def get_piece(self, pos):
@@ -332,17 +399,9 @@ class ChessBoard:
         参数:
             color (int|None): 若指定，仅返回该颜色的棋子。
         """
-        for x in range(9):
-            for y in range(10):
-                fench = self._board[y][x]
-                if not fench:
-                    continue
-                if color is None:
-                    yield Piece.create(self, fench, (x, y))
-                else:
-                    _, p_color = fench_to_species(fench)
-                    if color == p_color:
-                        yield Piece.create(self, fench, (x, y))
+        board = self._board
+        for x, y in self._piece_positions(color):
+            yield Piece.create(self, board[y][x], (x, y))
 
     def get_king(self, color):
         """查找并返回指定颜色的王 `Piece`，找不到返回 None。
@@ -350,15 +409,16 @@ class ChessBoard:
         参数:
             color (int): 指定要查找的颜色。
         """
-        limit_y = ((), (0, 1, 2), (7, 8, 9))
-        for x in (3, 4, 5):
-            for y in limit_y[color]:
-                fench = self._board[y][x]
-                if not fench:
-                    continue
-                if fench.lower() == "k":
-                    return Piece.create(self, fench, (x, y))
-        return None
+        if color not in (RED, BLACK):
+            return None
+        fench = "K" if color == RED else "k"
+        limit_y = (0, 2) if color == RED else (7, 9)
+        found = None
+        for pos in self._piece_pos[fench]:
+            if 3 <= pos[0] <= 5 and limit_y[0] <= pos[1] <= limit_y[1]:
+                if found is None or pos < found:
+                    found = pos
+        return Piece.create(self, fench, found) if found else None
 
     # Move 相关
     def is_valid_move_t(self, move_t):
@@ -402,49 +462,74 @@ class ChessBoard:
         self, pos_from: Tuple[int, int], pos_to: Tuple[int, int]
     ) -> Optional[str]:
         """在内部执行棋子移动（不做合法性检查），并返回被移动的 fench。"""
-        fench = self._board[pos_from[1]][pos_from[0]]
-        self._board[pos_to[1]][pos_to[0]] = fench
-        self._board[pos_from[1]][pos_from[0]] = None
-        self._attack_matrix_dirty = True
+        x_from, y_from = pos_from
+        x_to, y_to = pos_to
+        fench = self._board[y_from][x_from]
+        captured = self._board[y_to][x_to]
+        if fench:
+            keys = _Z_PIECE_KEYS[fench]
+            self._zkey ^= keys[y_from][x_from] ^ keys[y_to][x_to]
+            positions = self._piece_pos[fench]
+            positions.discard(pos_from)
+            positions.add(pos_to)
+        if captured:
+            self._zkey ^= _Z_PIECE_KEYS[captured][y_to][x_to]
+            self._piece_pos[captured].discard(pos_to)
+        self._board[y_to][x_to] = fench
+        self._board[y_from][x_from] = None
+        self._squares_changed((pos_from, pos_to))
 
         return fench
 
-    def make_move(self, pos_from: Tuple[int, int], pos_to: Tuple[int, int]) -> MoveInfo:
+    def make_move(
+        self,
+        pos_from: Tuple[int, int],
+        pos_to: Tuple[int, int],
+        snapshot: bool = False,
+    ) -> MoveInfo:
         """执行移动并返回状态记录，不进行合法性检查。
 
+        返回的 MoveInfo 只记录起止位置、移动/被吃棋子和走子方，
+        足以通过 unmake_move 撤销；`snapshot=True` 时额外保存移动前后的棋盘数组深拷贝。
+
         注意：此函数不切换走子方，走子方由外部程序控制。
         """
         # 记录移动前状态
-        prev_attack_matrix_dirty = self._attack_matrix_dirty
         prev_move_side = self._move_side
         moving_fench = self._board[pos_from[1]][pos_from[0]]
         captured_fench = self._board[pos_to[1]][pos_to[0]]
-        board_before = [row[:] for row in self._board]  # 深拷贝棋盘数组
+        board_before = [row[:] for row in self._board] if snapshot else None
 
         # 执行移动
         self._move_piece(pos_from, pos_to)
 
-        # 记录移动后状态（不切换走子方）
-        next_attack_matrix_dirty = self._attack_matrix_dirty
-        next_move_side = self._move_side
-        board_after = [row[:] for row in self._board]  # 深拷贝棋盘数组
-
-        # 返回状态记录
+        # 返回状态记录（不切换走子方）
         return MoveInfo(
             from_pos=pos_from,
             to_pos=pos_to,
             moving_fench=moving_fench,
             captured_fench=captured_fench,
-            prev_attack_matrix_dirty=prev_attack_matrix_dirty,
-            next_attack_matrix_dirty=next_attack_matrix_dirty,
             prev_move_side=prev_move_side,
-            next_move_side=next_move_side,
+            next_move_side=self._move_side,
             board_before=board_before,
-            board_after=board_after,
+            board_after=[row[:] for row in self._board] if snapshot else None,
         )
 
     def unmake_move(self, move_info: MoveInfo) -> None:
         """根据 MoveInfo 撤销移动，恢复棋盘状态"""
+        x_from, y_from = move_info.from_pos
+        x_to, y_to = move_info.to_pos
+        # 增量恢复 Zobrist 键值与棋子位置表
+        if move_info.moving_fench:
+            keys = _Z_PIECE_KEYS[move_info.moving_fench]
+            self._zkey ^= keys[y_from][x_from] ^ keys[y_to][x_to]
+            positions = self._piece_pos[move_info.moving_fench]
+            positions.discard(move_info.to_pos)
+            positions.add(move_info.from_pos)
+        if move_info.captured_fench:
+            self._zkey ^= _Z_PIECE_KEYS[move_info.captured_fench][y_to][x_to]
+            self._piece_pos[move_info.captured_fench].add(move_info.to_pos)
+
         # 恢复被吃棋子（如果有）
         if move_info.captured_fench is not None:
             self._board[move_info.to_pos[1]][move_info.to_pos[0]] = (
@@ -458,25 +543,56 @@ class ChessBoard:
             move_info.moving_fench
         )
 
-        # 恢复攻击矩阵脏标志
-        self._attack_matrix_dirty = move_info.prev_attack_matrix_dirty
+        self._squares_changed((move_info.from_pos, move_info.to_pos))
 
         # 恢复走子方
         self._move_side = move_info.prev_move_side
 
+    def push(self, pos_from: Tuple[int, int], pos_to: Tuple[int, int]) -> MoveInfo:
+        """执行走子并压入撤销栈，同时切换走子方，不进行合法性检查。
+
+        每步只分配一个 MoveInfo 撤销记录（不复制棋盘），并记录走子前局面的
+        哈希值，可用 `pop()` 撤销、用 `repetition_count()` 检测重复局面。
+        """
+        self._hash_history.append(self.zhash())
+        move_info = self.make_move(pos_from, pos_to)
+        self._move_side = next_color(move_info.prev_move_side)
+        self._undo_stack.append(move_info)
+        return move_info
+
+    def pop(self) -> MoveInfo:
+        """撤销最近一次 `push()` 的走子并返回其撤销记录。"""
+        if not self._undo_stack:
+            raise CChessError("没有可撤销的走子")
+        move_info = self._undo_stack.pop()
+        self.unmake_move(move_info)
+        self._hash_history.pop()
+        return move_info
+
+    def peek(self) -> Optional[MoveInfo]:
+        """返回最近一次 `push()` 的撤销记录，没有时返回 None。"""
+        return self._undo_stack[-1] if self._undo_stack else None
+
+    def ply(self) -> int:
+        """返回撤销栈中的走子数。"""
+        return len(self._undo_stack)
+
+    def repetition_count(self) -> int:
+        """返回当前局面（含走子方）在 push 历史中出现的次数，包括当前这一次。"""
+        return self._hash_history.count(self.zhash()) + 1
+
     def move(
         self, pos_from: Tuple[int, int], pos_to: Tuple[int, int], check: bool = True
     ) -> Optional[Move]:
         """尝试执行走子：若合法则修改棋盘并返回 `Move` 对象，否则返回 None。
-        返回的 `Move` 包含移动前后的棋盘快照（独立副本）。"""
+        返回的 `Move` 可通过 `board_before()`/`board_after()` 取得移动前后的棋盘。"""
         if not self.is_valid_move(pos_from, pos_to):
             return None
 
-        # 1. 创建移动前的棋盘快照
+        # 1. 创建移动前的棋盘快照（走子挂入棋局树后即释放，之后按需重放）
         board_before = self.copy()
 
         # 记录移动前状态
-        prev_attack_matrix_dirty = self._attack_matrix_dirty
         prev_move_side = self._move_side
         moving_fench = self._board[pos_from[1]][pos_from[0]]
         captured_fench = self._board[pos_to[1]][pos_to[0]]
@@ -485,38 +601,30 @@ class ChessBoard:
         self._move_piece(pos_from, pos_to)
 
         # 记录移动后状态
-        next_attack_matrix_dirty = self._attack_matrix_dirty
         next_move_side = self._move_side
 
-        # 3. 创建移动后的棋盘快照
-        board_after = self.copy()
-
         # 创建 MoveInfo（仍然需要，因为 Move 类需要它）
         move_info = MoveInfo(
             from_pos=pos_from,
             to_pos=pos_to,
             moving_fench=moving_fench,
             captured_fench=captured_fench,
-            prev_attack_matrix_dirty=prev_attack_matrix_dirty,
-            next_attack_matrix_dirty=next_attack_matrix_dirty,
             prev_move_side=prev_move_side,
             next_move_side=next_move_side,
-            board_before=board_before._board,  # 仍然需要数组用于撤销
-            board_after=board_after._board,  # 仍然需要数组用于撤销
         )
 
         # 切换走子方（除非吃掉将帅）
         if captured_fench not in ("k", "K"):
             self._move_side = next_color(self._move_side)
 
-        # 创建 Move 对象，传入棋盘实例
-        move = Move(move_info, board_before, board_after)
+        # 创建 Move 对象，移动后的棋盘由 Move 按需生成
+        move = Move(move_info, board_before)
 
         if check:
-            # 检查将军/将死
+            # 检查将军/将死：直接探测对方王是否被攻击
             original_move_side = self._move_side
             self._move_side = prev_move_side
-            is_checking = self.is_checking()
+            is_checking = self.is_king_attacked(next_color(prev_move_side))
             move.is_checking = is_checking
             move.is_checkmate = is_checking and self.is_checkmate()
             self._move_side = original_move_side
@@ -619,7 +727,6 @@ class ChessBoard:
         board_before = self.copy()
 
         # 记录移动前状态
-        prev_attack_matrix_dirty = self._attack_matrix_dirty
         prev_move_side = self._move_side
         moving_fench = self._board[pos_from[1]][pos_from[0]]
         captured_fench = self._board[pos_to[1]][pos_to[0]]
@@ -628,27 +735,19 @@ class ChessBoard:
         self._move_piece(pos_from, pos_to)
 
         # 记录移动后状态
-        next_attack_matrix_dirty = self._attack_matrix_dirty
         next_move_side = self._move_side
 
-        # 创建移动后的棋盘快照
-        board_after = self.copy()
-
         # 创建 MoveInfo
         move_info = MoveInfo(
             from_pos=pos_from,
             to_pos=pos_to,
             moving_fench=moving_fench,
             captured_fench=captured_fench,
-            prev_attack_matrix_dirty=prev_attack_matrix_dirty,
-            next_attack_matrix_dirty=next_attack_matrix_dirty,
             prev_move_side=prev_move_side,
             next_move_side=next_move_side,
-            board_before=board_before._board,
-            board_after=board_after._board,
         )
 
-        move = Move(move_info, board_before, board_after)
+        move = Move(move_info, board_before)
 
         # 如果不切换走子方，恢复原来的走子方
         if not switch_turn:
@@ -669,46 +768,110 @@ class ChessBoard:
     def create_moves(self) -> Iterator[Tuple[Tuple[int, int], Tuple[int, int]]]:
         """生成当前走子方的所有候选走法（每个为 (from, to) 元组）。
 
-        使用规范局面：将黑方走子转换为红方视角处理，简化逻辑。
+        各棋子按自身颜色的方向、九宫与河界规则直接在原棋盘上生成走法，
+        不再构造规范化棋盘；走子方未确定（ANY_COLOR）时按红方生成。
         """
-        is_flipped = not self.is_normalized()
-        normalized_board = self.normalized()
+        color = BLACK if self._move_side == BLACK else RED
+        for piece in self.get_all_pieces(color):
+            yield from piece.create_moves()
 
-        for piece in normalized_board.get_all_pieces(RED):
-            for from_pos, to_pos in piece.create_moves():
-                if is_flipped:
-                    from_pos = self.denormalize_pos(from_pos)
-                    to_pos = self.denormalize_pos(to_pos)
-                yield (from_pos, to_pos)
-
-    def create_piece_moves(
-        self, pos: Tuple[int, int]
+    def create_captures(
+        self, sort: bool = False
     ) -> Iterator[Tuple[Tuple[int, int], Tuple[int, int]]]:
-        """生成指定位置棋子的所有候选走法。
+        """只生成当前走子方的吃子候选走法（目标格为敌方棋子）。
 
-        使用规范局面：将黑方走子转换为红方视角处理，简化逻辑。
+        各棋子直接跳过空目标格（炮直接扫描炮架之后的棋子），不生成完整走法列表。
+        sort 为 True 时按 MVV-LVA 排序：先吃价值高的棋子，同一目标时价值低的攻击子优先。
+        与 `create_moves()` 一样不检查走后己方是否被将军。
         """
-        piece = self.get_piece(pos)
-        if not piece:
+        color = BLACK if self._move_side == BLACK else RED
+        if not sort:
+            for piece in self.get_all_pieces(color):
+                yield from piece.create_captures()
             return
 
-        _, piece_color = fench_to_species(piece.fench)
-        if piece_color != self._move_side:
-            return
+        board = self._board
+        captures = []
+        for piece in self.get_all_pieces(color):
+            captures.extend(piece.create_captures())
+        captures.sort(
+            key=lambda m: _ATTACKER_RANK[board[m[0][1]][m[0][0]].lower()]
+            - _VICTIM_RANK[board[m[1][1]][m[1][0]].lower()] * 8
+        )
+        yield from captures
 
-        is_flipped = not self.is_normalized()
-        normalized_board = self.normalized()
+    def create_quiet_moves(self) -> Iterator[Tuple[Tuple[int, int], Tuple[int, int]]]:
+        """只生成当前走子方的不吃子候选走法（目标格为空）。"""
+        color = BLACK if self._move_side == BLACK else RED
+        for piece in self.get_all_pieces(color):
+            yield from piece.create_quiet_moves()
 
-        # 在规范局面中找到对应位置的棋子
-        norm_pos = self.denormalize_pos(pos) if is_flipped else pos
-        norm_piece = normalized_board.get_piece(norm_pos)
+    def create_checking_moves(
+        self,
+    ) -> Iterator[Tuple[Tuple[int, int], Tuple[int, int]]]:
+        """只生成走后对对方王形成将军的候选走法（含闪击将军与炮架将军）。
 
-        if norm_piece:
-            for from_pos, to_pos in norm_piece.create_moves():
-                if is_flipped:
-                    from_pos = self.denormalize_pos(from_pos)
-                    to_pos = self.denormalize_pos(to_pos)
-                yield (from_pos, to_pos)
+        能改变对方王受攻击状态的走法，其起点或终点必然落在王所在的行列上，
+        或落在以王为中心的 5×5 范围内（马的将军位置、马腿格与兵的将军位置）；
+        只有这些走法才试走验证，其余走法直接跳过。
+        与 `create_moves()` 一样不检查走后己方是否被将军。
+        """
+        color = BLACK if self._move_side == BLACK else RED
+        enemy = next_color(color)
+        king = self.get_king(enemy)
+        if king is None:
+            return
+        kx, ky = king.x, king.y
+        for pos_from, pos_to in self.create_moves():
+            fx, fy = pos_from
+            tx, ty = pos_to
+            if not (
+                fx == kx
+                or fy == ky
+                or tx == kx
+                or ty == ky
+                or (abs(fx - kx) <= 2 and abs(fy - ky) <= 2)
+                or (abs(tx - kx) <= 2 and abs(ty - ky) <= 2)
+            ):
+                continue
+            move_info = self.make_move(pos_from, pos_to)
+            checking = self.is_king_attacked(enemy)
+            self.unmake_move(move_info)
+            if checking:
+                yield (pos_from, pos_to)
+
+    def create_moves_packed(self, with_captured: bool = False) -> array:
+        """以紧凑整数编码返回当前走子方的全部候选走法。
+
+        默认返回 array("H")，每个元素为 from_sq | to_sq << 7；
+        `with_captured=True` 时返回 array("I") 并附带被吃棋子编码（见 `pack_move`）。
+        """
+        board = self._board
+        if not with_captured:
+            return array(
+                "H",
+                [
+                    (fy * 9 + fx) | (ty * 9 + tx) << 7
+                    for (fx, fy), (tx, ty) in self.create_moves()
+                ],
+            )
+        moves = array("I")
+        for (fx, fy), (tx, ty) in self.create_moves():
+            captured = board[ty][tx]
+            move = (fy * 9 + fx) | (ty * 9 + tx) << 7
+            if captured:
+                move |= PIECE_CODES[captured] << 14
+            moves.append(move)
+        return moves
+
+    def create_piece_moves(
+        self, pos: Tuple[int, int]
+    ) -> Iterator[Tuple[Tuple[int, int], Tuple[int, int]]]:
+        """生成指定位置棋子的所有候选走法（仅限当前走子方的棋子）。"""
+        piece = self.get_piece(pos)
+        if not piece or piece.color != self._move_side:
+            return
+        yield from piece.create_moves()
 
     def _check_move_for_general(
         self,
@@ -727,21 +890,11 @@ class ChessBoard:
         返回:
             bool: 是否处于将军状态
         """
+        color = self._move_side
+        if not check_after_move:
+            color = next_color(color)
         move_info = self.make_move(pos_from, pos_to)
-
-        if check_after_move:
-            # 检查移动后己方是否被将军
-            # make_move 不切换走子方，需要手动切换
-            self._move_side = next_color(self._move_side)
-            checking = self.is_checking()
-            self._move_side = move_info.prev_move_side
-        else:
-            # 检查移动后是否将军对方
-            original_player = self._move_side
-            self._move_side = move_info.prev_move_side
-            checking = self.is_checking()
-            self._move_side = original_player
-
+        checking = self.is_king_attacked(color)
         self.unmake_move(move_info)
         return checking
 
@@ -760,49 +913,114 @@ class ChessBoard:
         """判断执行该走子后是否对对方形成将军（不切换走子方）。"""
         return self._check_move_for_general(pos_from, pos_to, check_after_move=False)
 
-    def _compute_piece_attacks(self, piece: Piece) -> List[Tuple[int, int]]:
-        """返回棋子可以攻击到的坐标列表（包括吃子位置）。"""
-        attacks = []
-        for from_pos, to_pos in piece.create_moves():
-            attacks.append(to_pos)
-        return attacks
+    def _squares_changed(self, squares: Tuple[Tuple[int, int], ...]) -> None:
+        """`_board` 中 squares 的格子内容已改变时调用的钩子。
 
-    def _get_attack_matrix(self, color: int) -> List[List[bool]]:
-        """根据颜色获取对应的攻击矩阵。
+        基类不维护其他派生状态；`ChessBoardArray` 用它同步 mailbox。
+        """
 
-        参数:
-            color: 颜色值 (RED 或 BLACK)
+    def attackers_of(self, pos: Tuple[int, int], color: int) -> List[Tuple[int, int]]:
+        """返回 color 方所有能走到（吃到）pos 格的棋子位置，按子力价值从低到高排列。
 
-        返回:
-            List[List[bool]]: 对应的攻击矩阵
+        从 pos 反向查找：车取每条直线上的第一个棋子，炮取隔一个炮架后的棋子，
+        马、象、士、将、兵按反向走法表查找并检查马腿、象眼是否被堵；
+        pos 上是对方将/帅时，同一直线上无遮挡的己方将/帅也算（对脸）。
+        不考虑牵制，也不考虑 pos 上是否有己方棋子。
+        """
+        board = self._board
+        px, py = pos
+        king, _, _, _, rook, cannon, _ = _COLOR_FENCHS[color]
+        target = board[py][px]
+        enemy_king = _COLOR_FENCHS[next_color(color)][0]
+        attackers = []
+
+        for species in _TABLE_ATTACKERS:
+            fench = species.upper() if color == RED else species
+            for (x, y), block in _ATTACK_FROM_TABLE[species][color][py][px]:
+                if board[y][x] == fench and (
+                    block is None or board[block[1]][block[0]] is None
+                ):
+                    attackers.append((x, y))
+
+        for dx, dy in _LINE_DIRECTIONS:
+            x, y = px + dx, py + dy
+            screened = False
+            while 0 <= x <= 8 and 0 <= y <= 9:
+                fench = board[y][x]
+                if fench is not None:
+                    if screened:
+                        if fench == cannon:
+                            attackers.append((x, y))
+                        break
+                    if fench == rook or (
+                        fench == king and dx == 0 and target == enemy_king
+                    ):
+                        attackers.append((x, y))
+                    screened = True
+                x += dx
+                y += dy
+
+        attackers.sort(key=lambda p: SEE_VALUES[board[p[1]][p[0]].lower()])
+        return attackers
+
+    def see(self, move: Tuple[Tuple[int, int], Tuple[int, int]]) -> int:
+        """静态交换评估：返回走子 move=(from, to) 之后在目标格上双方轮流用
+        价值最低的棋子吃回、且任何一方都可以选择停止时，走子方的子力得失。
+
+        每次吃子后重新反向查找攻击者，因此车、炮后面的棋子、被移走的炮架
+        以及新形成的炮架、被让开的马腿和象眼都会自动计入；不考虑牵制。
+        不吃子的走法返回 0 或走过去的棋子会被白吃时的负值。
         """
-        return self._red_attacks if color == RED else self._black_attacks
+        (fx, fy), (tx, ty) = move
+        board = self._board
+        moving = board[fy][fx]
+        if moving is None:
+            return 0
+        captured = board[ty][tx]
+        side = RED if moving.isupper() else BLACK
+
+        gains = [SEE_VALUES[captured.lower()] if captured else 0]
+        # 直接在棋盘数组上模拟交换，结束后按相反顺序恢复
+        changes = [((fx, fy), moving), ((tx, ty), captured)]
+        board[ty][tx] = moving
+        board[fy][fx] = None
+        try:
+            on_square = SEE_VALUES[moving.lower()]
+            side = next_color(side)
+            while True:
+                attackers = self.attackers_of((tx, ty), side)
+                if not attackers:
+                    break
+                ax, ay = attackers[0]
+                fench = board[ay][ax]
+                changes.append(((ax, ay), fench))
+                changes.append(((tx, ty), board[ty][tx]))
+                board[ty][tx] = fench
+                board[ay][ax] = None
+                # 将/帅不能吃回仍受保护的棋子；在吃回之后的局面上查找，
+                # 将/帅让开后露出的车、炮（以及对脸）也计入
+                if fench.lower() == "k" and self.attackers_of(
+                    (tx, ty), next_color(side)
+                ):
+                    break
+                gains.append(on_square - gains[-1])
+                on_square = SEE_VALUES[fench.lower()]
+                side = next_color(side)
+        finally:
+            for (x, y), fench in reversed(changes):
+                board[y][x] = fench
 
-    def _recompute_attack_matrix(self) -> None:
-        """重新计算红黑双方的攻击矩阵，并将脏标志设置为 False。"""
-        # 清空攻击矩阵
-        for y in range(10):
-            for x in range(9):
-                self._red_attacks[y][x] = False
-                self._black_attacks[y][x] = False
-        # 遍历所有棋子，填充攻击矩阵
-        for piece in self.get_all_pieces():
-            attacks = self._compute_piece_attacks(piece)
-            color = piece.color
-            matrix = self._get_attack_matrix(color)
-            for x, y in attacks:
-                matrix[y][x] = True
-        self._attack_matrix_dirty = False
+        # 从交换序列末端倒推：每一方都可以选择不再吃回
+        for i in range(len(gains) - 1, 0, -1):
+            gains[i - 1] = -max(-gains[i - 1], gains[i])
+        return gains[0]
 
     def is_checking(self) -> bool:
-        """判断当前走子方是否对对方构成将军（对方王被攻击）。"""
-        if self._attack_matrix_dirty:
-            self._recompute_attack_matrix()
-        king = self.get_king(next_color(self._move_side))
-        if not king:
-            return False
-        matrix = self._get_attack_matrix(self._move_side)
-        return matrix[king.y][king.x]
+        """判断当前走子方是否对对方构成将军（对方王被攻击）。
+
+        从对方王的位置反向探测攻击者。
+        """
+        return self.is_king_attacked(next_color(self._move_side))
 
     def is_checkmate(self) -> bool:
         """判断当前局面在对方回合是否为将死（无路可走）。"""
@@ -814,17 +1032,316 @@ class ChessBoard:
             self._move_side = original_player
 
     def has_no_legal_moves(self) -> bool:
-        """判断当前走子方是否没有任何合法且不留被将军的走法（困毙）。"""
-        king = self.get_king(self._move_side)
+        """判断当前走子方是否没有任何合法且不留被将军的走法（困毙）。
+
+        被将军时只检查应将走法（见 `evasions()`），否则逐个棋子生成走法，
+        找到第一个合法走法即返回。
+        """
+        color = self._move_side
+        king = self.get_king(color)
         if not king:
             return True
-        for piece in self.get_all_pieces(self._move_side):
-            for move_it in piece.create_moves():
-                if self.is_valid_move_t(move_it):
-                    if not self.is_checked_move(move_it[0], move_it[1]):
-                        return False
+        king_pos = (king.x, king.y)
+        if self.is_king_attacked(color):
+            return next(self._evasions(color, king_pos), None) is None
+
+        pinned, hazards = self._find_pins(king_pos, color)
+        for piece in self.get_all_pieces(color):
+            verify = (piece.x, piece.y) == king_pos or (piece.x, piece.y) in pinned
+            for pos_from, pos_to in piece.create_moves():
+                if not (
+                    (verify or pos_to in hazards)
+                    and self._try_move_attacked(pos_from, pos_to, color)
+                ):
+                    return False
         return True
 
+    def legal_moves(self) -> Iterator[Tuple[Tuple[int, int], Tuple[int, int]]]:
+        """生成当前走子方的所有合法走法（走后己方王不被将军）。
+
+        每个局面只计算一次王所受的将军、牵制棋子（车线/对脸将的唯一阻挡子、
+        炮线上的两个阻挡子、将军马的马腿）以及炮架危险格；只有王的走法、
+        牵制棋子的走法以及走到危险格的走法才需要试走验证，其余候选走法直接输出。
+        被将军时只生成应将走法（见 `evasions()`）。走子方未确定（ANY_COLOR）
+        或找不到己方王时，与 is_checked_move 一致，不做将军过滤。
+        """
+        color = self._move_side
+        king = self.get_king(color) if color in (RED, BLACK) else None
+        if king is None:
+            yield from list(self.create_moves())
+            return
+
+        king_pos = (king.x, king.y)
+        if self.is_king_attacked(color):
+            yield from list(self._evasions(color, king_pos))
+            return
+
+        moves = list(self.create_moves())
+        pinned, hazards = self._find_pins(king_pos, color)
+        for move_t in moves:
+            pos_from, pos_to = move_t
+            if (
+                pos_from == king_pos or pos_from in pinned or pos_to in hazards
+            ) and self._try_move_attacked(pos_from, pos_to, color):
+                continue
+            yield move_t
+
+    def evasions(self) -> Iterator[Tuple[Tuple[int, int], Tuple[int, int]]]:
+        """生成当前走子方被将军时的全部合法应将走法；未被将军时与 `legal_moves()` 相同。"""
+        color = self._move_side
+        king = self.get_king(color) if color in (RED, BLACK) else None
+        if king is None or not self.is_king_attacked(color):
+            yield from self.legal_moves()
+            return
+        yield from list(self._evasions(color, (king.x, king.y)))
+
+    def _evasions(
+        self, color: int, king_pos: Tuple[int, int]
+    ) -> Iterator[Tuple[Tuple[int, int], Tuple[int, int]]]:
+        """color 方的王被将军时，按需生成并逐个验证应将走法。
+
+        应将只有几类：王自己走开；吃掉将军的棋子；在车、炮、对脸将的将军线上
+        垫子或堵住将军马的马腿；移走炮与王之间的己方炮架。只针对其中一个
+        将军棋子生成候选走法，其余将军棋子（双将）由试走验证排除。
+        生成器在两次输出之间不改变棋盘，调用方找到第一个应将后即可停止。
+        """
+        board = self._board
+        kx, ky = king_pos
+        enemy = next_color(color)
+        seen = set()
+
+        def verified(moves):
+            for pos_from, pos_to in moves:
+                if (pos_from, pos_to) in seen:
+                    continue
+                seen.add((pos_from, pos_to))
+                if not self._try_move_attacked(pos_from, pos_to, color):
+                    yield (pos_from, pos_to)
+
+        # 1. 王走开（含吃掉相邻的将军棋子）
+        king = Piece.create(self, board[ky][kx], king_pos)
+        yield from verified(king.create_moves())
+
+        checkers = self.attackers_of(king_pos, enemy)
+        if not checkers:
+            return
+        cx, cy = checkers[0]
+
+        # 2. 吃掉将军的棋子
+        yield from verified(
+            (pos, (cx, cy)) for pos in self.attackers_of((cx, cy), color) if pos != king_pos
+        )
+
+        # 3. 垫子、堵马腿、移走炮架
+        kind = board[cy][cx].lower()
+        if kind == "n":
+            # 马腿紧邻马，位于日字长边的方向上
+            if abs(kx - cx) == 2:
+                blocks = [(cx + (kx > cx) - (kx < cx), cy)]
+            else:
+                blocks = [(cx, cy + (ky > cy) - (ky < cy))]
+            screens = []
+        elif kind in "rck" and (cx == kx or cy == ky):
+            dx = (cx > kx) - (cx < kx)
+            dy = (cy > ky) - (cy < ky)
+            blocks = []
+            screens = []
+            x, y = kx + dx, ky + dy
+            while (x, y) != (cx, cy):
+                if board[y][x] is None:
+                    blocks.append((x, y))
+                else:
+                    screens.append((x, y))
+                x += dx
+                y += dy
+        else:
+            blocks = []
+            screens = []
+
+        for pos in blocks:
+            yield from verified((src, pos) for src in self._movers_to(pos, color))
+        own = str.isupper if color == RED else str.islower
+        for sx, sy in screens:
+            fench = board[sy][sx]
+            if own(fench):
+                yield from verified(Piece.create(self, fench, (sx, sy)).create_moves())
+
+    def _movers_to(self, pos: Tuple[int, int], color: int) -> List[Tuple[int, int]]:
+        """返回 color 方能不吃子走到空格 pos 的棋子位置（不含将/帅）。
+
+        车、炮取每条直线上的第一个棋子，马、象、士、兵按反向走法表查找并
+        检查马腿、象眼。
+        """
+        board = self._board
+        px, py = pos
+        _, _, _, _, rook, cannon, _ = _COLOR_FENCHS[color]
+        movers = []
+        for dx, dy in _LINE_DIRECTIONS:
+            x, y = px + dx, py + dy
+            while 0 <= x <= 8 and 0 <= y <= 9:
+                fench = board[y][x]
+                if fench is not None:
+                    if fench in (rook, cannon):
+                        movers.append((x, y))
+                    break
+                x += dx
+                y += dy
+        for species in ("p", "a", "b", "n"):
+            fench = species.upper() if color == RED else species
+            for (x, y), block in _ATTACK_FROM_TABLE[species][color][py][px]:
+                if board[y][x] == fench and (
+                    block is None or board[block[1]][block[0]] is None
+                ):
+                    movers.append((x, y))
+        return movers
+
+    def _try_move_attacked(
+        self, pos_from: Tuple[int, int], pos_to: Tuple[int, int], color: int
+    ) -> bool:
+        """试走一步并判断 color 方的王是否被攻击，随后撤销。"""
+        move_info = self.make_move(pos_from, pos_to)
+        attacked = self.is_king_attacked(color)
+        self.unmake_move(move_info)
+        return attacked
+
+    def perft(self, depth: int, table: Optional[TranspositionTable] = None) -> int:
+        """统计从当前局面出发、深度为 depth 的合法走子序列数（叶子节点数）。
+
+        用于校验走法生成的正确性并测量其吞吐量；最后一层直接计数，不再试走。
+        传入 `table` 时按 (局面哈希, 深度) 缓存子树节点数，重复局面不再展开。
+        """
+        if depth <= 0:
+            return 1
+        if depth == 1:
+            return sum(1 for _ in self.legal_moves())
+
+        if table is not None:
+            key = self.zhash()
+            entry = table.probe(key)
+            if entry is not None and entry[0] == depth:
+                return entry[2]
+
+        nodes = 0
+        for pos_from, pos_to in list(self.legal_moves()):
+            self.push(pos_from, pos_to)
+            nodes += self.perft(depth - 1, table)
+            self.pop()
+        if table is not None and nodes < 1 << 31:
+            table.store(key, depth, EXACT, nodes)
+        return nodes
+
+    def perft_divide(
+        self, depth: int, table: Optional[TranspositionTable] = None
+    ) -> Dict[str, int]:
+        """按第一步走法（ICCS 格式）分别统计 perft 节点数，便于定位走法生成差异。"""
+        result = {}
+        for pos_from, pos_to in list(self.legal_moves()):
+            self.push(pos_from, pos_to)
+            result[pos2iccs(pos_from, pos_to)] = self.perft(depth - 1, table)
+            self.pop()
+        return result
+
+    def _find_pins(self, king_pos: Tuple[int, int], color: int):
+        """从王的位置反向扫描，返回 (牵制棋子位置集合, 炮架危险格集合)。
+
+        牵制棋子：离开原位可能暴露己方王的己方棋子；
+        炮架危险格：王与敌炮之间的空格，落子后会形成炮架。
+        """
+        board = self._board
+        rook, cannon, knight, _, enemy_king = _ENEMY_FENCHS[color]
+        is_own = str.isupper if color == RED else str.islower
+        kx, ky = king_pos
+        pinned = set()
+        hazards = set()
+
+        for dx, dy in _LINE_DIRECTIONS:
+            x, y = kx + dx, ky + dy
+            empties = []
+            blockers = []
+            while 0 <= x <= 8 and 0 <= y <= 9:
+                fench = board[y][x]
+                if fench is None:
+                    if not blockers:
+                        empties.append((x, y))
+                else:
+                    if fench == cannon:
+                        if not blockers:
+                            hazards.update(empties)
+                        elif len(blockers) == 2:
+                            pinned.update(pos for pos, own in blockers if own)
+                    elif len(blockers) == 1 and (
+                        fench == rook or (fench == enemy_king and dx == 0)
+                    ):
+                        pinned.update(pos for pos, own in blockers if own)
+                    blockers.append(((x, y), is_own(fench)))
+                    if len(blockers) == 3:
+                        break
+                x += dx
+                y += dy
+
+        for (dx, dy), (lx, ly) in _KNIGHT_CHECKS:
+            x, y = kx + dx, ky + dy
+            if 0 <= x <= 8 and 0 <= y <= 9 and board[y][x] == knight:
+                leg = board[ky + ly][kx + lx]
+                if leg is not None and is_own(leg):
+                    pinned.add((kx + lx, ky + ly))
+
+        return pinned, hazards
+
+    def is_king_attacked(self, color: int) -> bool:
+        """判断 color 方的王是否被对方攻击（找不到王时返回 False）。
+
+        与走子方无关：`is_king_attacked(board.move_side())` 即走子方是否被将军。
+        """
+        king = self.get_king(color)
+        if king is None:
+            return False
+        return self.is_attacked((king.x, king.y), next_color(color))
+
+    def is_attacked(self, pos: Tuple[int, int], color: int) -> bool:
+        """判断 color 方是否有棋子能吃到 pos 格，找到第一个攻击者即返回。
+
+        规则与 `attackers_of` 相同：从 pos 反向扫描车、炮（数炮架）与对脸将的直线，
+        再按反向走法表检查马（马腿）、兵、士、象（象眼）和将。
+        """
+        if color not in (RED, BLACK):
+            return False
+        board = self._board
+        px, py = pos
+        king, advisor, bishop, knight, rook, cannon, pawn = _COLOR_FENCHS[color]
+        facing = board[py][px] == _COLOR_FENCHS[next_color(color)][0]
+
+        # 车、炮、对脸将
+        for dx, dy in _LINE_DIRECTIONS:
+            x, y = px + dx, py + dy
+            screened = False
+            while 0 <= x <= 8 and 0 <= y <= 9:
+                fench = board[y][x]
+                if fench is not None:
+                    if screened:
+                        if fench == cannon:
+                            return True
+                        break
+                    if fench == rook or (fench == king and facing and dx == 0):
+                        return True
+                    screened = True
+                x += dx
+                y += dy
+
+        # 马、象：出发格上是该棋子且马腿/象眼为空
+        for species, fench in (("n", knight), ("b", bishop)):
+            for (x, y), (bx, by) in _ATTACK_FROM_TABLE[species][color][py][px]:
+                if board[y][x] == fench and board[by][bx] is None:
+                    return True
+
+        # 兵、士、将
+        for species, fench in (("p", pawn), ("a", advisor), ("k", king)):
+            for (x, y), _ in _ATTACK_FROM_TABLE[species][color][py][px]:
+                if board[y][x] == fench:
+                    return True
+
+        return False
+
     def count_x_line_in(self, y: int, x_from: int, x_to: int) -> int:
         """统计同一行 y 上 x_from 与 x_to 之间（不含端点）被占用的格子数。"""
         return sum(1 for f in self.x_line_in(y, x_from, x_to) if f)
@@ -924,22 +1441,43 @@ class ChessBoard:
         """返回包含占位信息的完整 FEN（方便外部工具兼容）。"""
         return self.to_fen() + " - - 0 1"
 
+    def _compute_piece_pos(self) -> Dict[str, Set[Tuple[int, int]]]:
+        """全盘扫描建立棋子位置表（仅在整体替换棋盘时使用）。"""
+        piece_pos = {fench: set() for fench in _COLOR_FENCHS[RED] + _COLOR_FENCHS[BLACK]}
+        for y in range(10):
+            row = self._board[y]
+            for x in range(9):
+                if row[x]:
+                    piece_pos.setdefault(row[x], set()).add((x, y))
+        return piece_pos
+
+    def _board_replaced(self) -> None:
+        """`_board` 被整体替换后，重建所有由它派生的状态。"""
+        self._zkey = self._compute_zkey()
+        self._piece_pos = self._compute_piece_pos()
+        self._undo_stack = []
+        self._hash_history = []
+
+    def _compute_zkey(self) -> int:
+        """全盘扫描计算棋子部分的 Zobrist 键值（仅在整体替换棋盘时使用）。"""
+        key = 0
+        for y in range(10):
+            row = self._board[y]
+            for x in range(9):
+                fench = row[x]
+                if fench in _Z_PIECE_KEYS:
+                    key ^= _Z_PIECE_KEYS[fench][y][x]
+        return key
+
     def zhash(self, fen: Optional[str] = None) -> int:
-        """计算当前棋盘的 Zobrist 哈希值。
+        """返回当前棋盘的 Zobrist 哈希值。
+        棋子部分由走子增量维护，走子方在此处合入，因此为 O(1) 操作。
         可选地传入 `fen` 先加载局面再计算哈希，返回一个带符号的整数哈希值。
         """
         if fen:
             self.from_fen(fen)
 
-        key = 0
-        for y in range(10):
-            for x in range(9):
-                square = Z_HASH_C90[x + (9 - y) * 9]
-                letter = self.get_fench((x, y))
-                if letter in Z_MAP_PIECES:
-                    chess = Z_MAP_PIECES[letter]
-                    key ^= Z_HASH_TABLE[chess * 256 + square]
-
+        key = self._zkey
         if self._move_side == RED:
             key ^= Z_RED_KEY
 
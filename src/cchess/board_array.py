@@ -0,0 +1,467 @@
+"""Copyright (C) 2024  walker li <walker8088@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from array import array
+from typing import Iterator, List, Optional, Tuple
+
+from .board import ChessBoard
+from .common import PIECE_CODES
+from .constants import ANY_COLOR, BLACK, RED
+
+# -----------------------------------------------------#
+# 扁平棋盘（mailbox）布局：9x10 的棋盘四周各加 2 格边框，共 13x14 格。
+# 边框格填充 OFF，走法生成时落在边框上的目标自然被排除，无需坐标越界检查。
+_PAD = 2
+_WIDTH = 9 + 2 * _PAD
+_HEIGHT = 10 + 2 * _PAD
+_CELL_COUNT = _WIDTH * _HEIGHT
+
+# 棋子编码：低 3 位为兵种，第 4 位（8）为黑方标志
+EMPTY = 0
+OFF = 32
+_BLACK_BIT = 8
+K_CODE, A_CODE, B_CODE, N_CODE, R_CODE, C_CODE, P_CODE = range(1, 8)
+
+FENCH_TO_CODE = {
+    "K": 1,
+    "A": 2,
+    "B": 3,
+    "N": 4,
+    "R": 5,
+    "C": 6,
+    "P": 7,
+    "k": 9,
+    "a": 10,
+    "b": 11,
+    "n": 12,
+    "r": 13,
+    "c": 14,
+    "p": 15,
+}
+
+CODE_TO_FENCH = [None] * (OFF + 1)
+for _fench, _code in FENCH_TO_CODE.items():
+    CODE_TO_FENCH[_code] = _fench
+
+
+def _idx(x: int, y: int) -> int:
+    """棋盘坐标 (x, y) 转换为 mailbox 下标。"""
+    return (y + _PAD) * _WIDTH + (x + _PAD)
+
+
+# 坐标 <-> 下标 查找表（位置元组预先生成，避免走法生成时重复分配）
+POS_TO_IDX = tuple(tuple(_idx(x, y) for x in range(9)) for y in range(10))
+IDX_TO_POS: List[Optional[Tuple[int, int]]] = [None] * _CELL_COUNT
+for _y in range(10):
+    for _x in range(9):
+        IDX_TO_POS[_idx(_x, _y)] = (_x, _y)
+
+# 下标 -> 紧凑走法格子编号（y * 9 + x）及其目标位移值，cell 编码 -> 被吃棋子位移值
+IDX_TO_SQ = [0] * _CELL_COUNT
+for _y in range(10):
+    for _x in range(9):
+        IDX_TO_SQ[_idx(_x, _y)] = _y * 9 + _x
+_IDX_TO_SQ_TO = [sq << 7 for sq in IDX_TO_SQ]
+_CODE_TO_PACKED = [0] * (OFF + 1)
+for _fench, _code in FENCH_TO_CODE.items():
+    _CODE_TO_PACKED[_code] = PIECE_CODES[_fench] << 14
+
+# 所有棋盘内下标，按 x 优先、y 次之的顺序（与 ChessBoard.get_all_pieces 一致）
+_BOARD_INDEXES = tuple(_idx(x, y) for x in range(9) for y in range(10))
+
+_EMPTY_CELLS = bytearray(OFF for _ in range(_CELL_COUNT))
+for _i in _BOARD_INDEXES:
+    _EMPTY_CELLS[_i] = EMPTY
+
+# 方向偏移
+_UP = _WIDTH
+_DOWN = -_WIDTH
+_ORTHOGONAL = (_UP, _DOWN, 1, -1)
+_DIAGONAL = (_UP + 1, _UP - 1, _DOWN + 1, _DOWN - 1)
+# (目标偏移, 蹩腿偏移)
+_KNIGHT_STEPS = (
+    (2 * _UP + 1, _UP),
+    (2 * _UP - 1, _UP),
+    (2 * _DOWN + 1, _DOWN),
+    (2 * _DOWN - 1, _DOWN),
+    (_UP + 2, 1),
+    (_DOWN + 2, 1),
+    (_UP - 2, -1),
+    (_DOWN - 2, -1),
+)
+# (目标偏移, 象眼偏移)
+_BISHOP_STEPS = tuple((2 * d, d) for d in _DIAGONAL)
+
+
+def _region(points) -> bytearray:
+    """将坐标集合转换为按 mailbox 下标索引的标志表。"""
+    flags = bytearray(_CELL_COUNT)
+    for x, y in points:
+        flags[_idx(x, y)] = 1
+    return flags
+
+
+# 按颜色索引 (ANY_COLOR, RED, BLACK) 的区域表
+_PALACE = (
+    bytearray(_CELL_COUNT),
+    _region((x, y) for x in (3, 4, 5) for y in (0, 1, 2)),
+    _region((x, y) for x in (3, 4, 5) for y in (7, 8, 9)),
+)
+_ADVISOR_AREA = (
+    bytearray(_CELL_COUNT),
+    _region(((3, 0), (5, 0), (4, 1), (3, 2), (5, 2))),
+    _region(((3, 9), (5, 9), (4, 8), (3, 7), (5, 7))),
+)
+_OWN_HALF = (
+    bytearray(_CELL_COUNT),
+    _region((x, y) for x in range(9) for y in range(5)),
+    _region((x, y) for x in range(9) for y in range(5, 10)),
+)
+_PAWN_FORWARD = (0, _UP, _DOWN)
+
+
+def _landing_table(color: int) -> bytes:
+    """返回 color 方棋子可落子（空位或敌子）的编码标志表。"""
+    flags = bytearray(OFF + 1)
+    flags[EMPTY] = 1
+    for code in range(1, 16):
+        if CODE_TO_FENCH[code] is None:
+            continue
+        is_black = bool(code & _BLACK_BIT)
+        if (color == RED and is_black) or (color == BLACK and not is_black):
+            flags[code] = 1
+    return bytes(flags)
+
+
+_CAN_LAND = (_landing_table(ANY_COLOR), _landing_table(RED), _landing_table(BLACK))
+_ENEMY_KING = (0, K_CODE | _BLACK_BIT, K_CODE)
+
+
+def code_color(code: int) -> int:
+    """返回棋子编码对应的颜色。"""
+    return BLACK if code & _BLACK_BIT else RED
+
+
+# -----------------------------------------------------#
+# 各类棋子的目标格生成：参数为 mailbox、起点下标与棋子颜色，返回目标下标列表
+def _king_targets(cells, i_from: int, color: int) -> List[int]:
+    """将/帅：九宫内一步，以及白脸将吃对方将帅。"""
+    can_land = _CAN_LAND[color]
+    palace = _PALACE[color]
+    targets = []
+    for d in _ORTHOGONAL:
+        i = i_from + d
+        if palace[i] and can_land[cells[i]]:
+            targets.append(i)
+    # 白脸将：同列之间无子时可直接吃对方将帅
+    d = _PAWN_FORWARD[color]
+    i = i_from + d
+    while cells[i] == EMPTY:
+        i += d
+    if cells[i] == _ENEMY_KING[color]:
+        targets.append(i)
+    return targets
+
+
+def _advisor_targets(cells, i_from: int, color: int) -> List[int]:
+    """士/仕：九宫内斜走一步。"""
+    can_land = _CAN_LAND[color]
+    area = _ADVISOR_AREA[color]
+    targets = []
+    for d in _DIAGONAL:
+        i = i_from + d
+        if area[i] and can_land[cells[i]]:
+            targets.append(i)
+    return targets
+
+
+def _bishop_targets(cells, i_from: int, color: int) -> List[int]:
+    """象/相：走田字，不过河，象眼须为空。"""
+    can_land = _CAN_LAND[color]
+    half = _OWN_HALF[color]
+    targets = []
+    for step, eye in _BISHOP_STEPS:
+        i = i_from + step
+        if half[i] and cells[i_from + eye] == EMPTY and can_land[cells[i]]:
+            targets.append(i)
+    return targets
+
+
+def _knight_targets(cells, i_from: int, color: int) -> List[int]:
+    """马：走日字，马腿须为空。"""
+    can_land = _CAN_LAND[color]
+    targets = []
+    for step, leg in _KNIGHT_STEPS:
+        if cells[i_from + leg] == EMPTY and can_land[cells[i_from + step]]:
+            targets.append(i_from + step)
+    return targets
+
+
+def _rook_targets(cells, i_from: int, color: int) -> List[int]:
+    """车：沿直线走到第一个棋子为止（敌子可吃）。"""
+    can_land = _CAN_LAND[color]
+    targets = []
+    for d in _ORTHOGONAL:
+        i = i_from + d
+        while True:
+            c = cells[i]
+            if c == EMPTY:
+                targets.append(i)
+            else:
+                if can_land[c]:
+                    targets.append(i)
+                break
+            i += d
+    return targets
+
+
+def _cannon_targets(cells, i_from: int, color: int) -> List[int]:
+    """炮：沿直线走到空位，隔一个炮架吃子。"""
+    can_land = _CAN_LAND[color]
+    targets = []
+    for d in _ORTHOGONAL:
+        i = i_from + d
+        c = cells[i]
+        while c == EMPTY:
+            targets.append(i)
+            i += d
+            c = cells[i]
+        if c == OFF:
+            continue
+        # 越过炮架寻找第一个棋子
+        i += d
+        c = cells[i]
+        while c == EMPTY:
+            i += d
+            c = cells[i]
+        if c != OFF and can_land[c]:
+            targets.append(i)
+    return targets
+
+
+def _pawn_targets(cells, i_from: int, color: int) -> List[int]:
+    """兵/卒：向前一步，过河后也可左右一步。"""
+    can_land = _CAN_LAND[color]
+    targets = []
+    forward = i_from + _PAWN_FORWARD[color]
+    if can_land[cells[forward]]:
+        targets.append(forward)
+    if not _OWN_HALF[color][i_from]:
+        for d in (1, -1):
+            if can_land[cells[i_from + d]]:
+                targets.append(i_from + d)
+    return targets
+
+
+# 按棋子种类编码（code & 7）索引
+_TARGET_GENERATORS = (
+    None,
+    _king_targets,
+    _advisor_targets,
+    _bishop_targets,
+    _knight_targets,
+    _rook_targets,
+    _cannon_targets,
+    _pawn_targets,
+)
+
+
+# -----------------------------------------------------#
+class ChessBoardArray(ChessBoard):
+    """使用扁平 mailbox 数组存储局面的 `ChessBoard` 后端。
+
+    局面以 `bytearray` 中的小整数棋子编码保存，四周填充边框格，
+    走法生成与合法性检查只需一次下标访问且无需越界判断。
+    对外接口与 `ChessBoard` 完全相同（`get_fench`/`put_fench` 等），
+    内部同时维护 `_board` 以兼容直接访问它的旧代码。
+    """
+
+    def clear(self) -> "ChessBoardArray":
+        """清空棋盘，同时重置 mailbox 数组。"""
+        super().clear()
+        self._cells = bytearray(_EMPTY_CELLS)
+        return self
+
+    def _sync_cells(self) -> None:
+        """根据 `_board` 重建整个 mailbox 数组。"""
+        cells = bytearray(_EMPTY_CELLS)
+        board = self._board
+        for y in range(10):
+            row = board[y]
+            base = POS_TO_IDX[y]
+            for x in range(9):
+                fench = row[x]
+                if fench:
+                    cells[base[x]] = FENCH_TO_CODE[fench]
+        self._cells = cells
+
+    def _sync_cell(self, pos: Tuple[int, int]) -> None:
+        """根据 `_board` 同步单个格子。"""
+        fench = self._board[pos[1]][pos[0]]
+        self._cells[POS_TO_IDX[pos[1]][pos[0]]] = FENCH_TO_CODE[fench] if fench else EMPTY
+
+    def copy(self, history: bool = False) -> "ChessBoardArray":
+        """返回棋盘的快照（独立副本），`history` 同 `ChessBoard.copy`。"""
+        b = super().copy(history)
+        b._cells = bytearray(self._cells)
+        return b
+
+    def from_board(self, b: ChessBoard) -> "ChessBoardArray":
+        """从另一个棋盘复制属性并重建 mailbox 数组。"""
+        super().from_board(b)
+        self._sync_cells()
+        return self
+
+    def mirror(self) -> "ChessBoardArray":
+        """返回新棋盘: 沿竖直中线镜像（左右翻转）。"""
+        b = super().mirror()
+        b._sync_cells()
+        return b
+
+    def flip(self) -> "ChessBoardArray":
+        """返回新棋盘: 绕横轴翻转 + 沿竖直中线镜像。"""
+        b = super().flip()
+        b._sync_cells()
+        return b
+
+    def swap(self) -> "ChessBoardArray":
+        """返回新棋盘: 交换棋子大小写（红黑互换）。"""
+        b = super().swap()
+        b._sync_cells()
+        return b
+
+    def _squares_changed(self, squares) -> None:
+        """`_board` 中的格子已改变：同步 mailbox。"""
+        for pos in squares:
+            self._sync_cell(pos)
+
+    def occupied(self, pos):
+        """检查指定位置是否有棋子，返回 RED/BLACK 或 None。"""
+        code = self._cells[POS_TO_IDX[pos[1]][pos[0]]]
+        if code == EMPTY:
+            return None
+        return code_color(code)
+
+    def _gen_targets(self, i_from: int, code: int) -> List[int]:
+        """生成 `i_from` 处编码为 `code` 的棋子的全部目标下标。"""
+        return _TARGET_GENERATORS[code & 7](self._cells, i_from, code_color(code))
+
+    def is_valid_move(self, pos_from: Tuple[int, int], pos_to: Tuple[int, int]) -> bool:
+        """检查走子是否符合棋子规则（不检查走子后是否被将军）。"""
+        if not (0 <= pos_to[0] <= 8 and 0 <= pos_to[1] <= 9):
+            return False
+
+        i_from = POS_TO_IDX[pos_from[1]][pos_from[0]]
+        code = self._cells[i_from]
+        if code == EMPTY:
+            return False
+
+        if self._move_side not in (ANY_COLOR, code_color(code)):
+            return False
+
+        return POS_TO_IDX[pos_to[1]][pos_to[0]] in self._gen_targets(i_from, code)
+
+    def create_moves(self) -> Iterator[Tuple[Tuple[int, int], Tuple[int, int]]]:
+        """生成当前走子方的所有候选走法（每个为 (from, to) 元组）。
+
+        直接在 mailbox 上按颜色生成，不需要构造规范化棋盘。
+        """
+        color = BLACK if self._move_side == BLACK else RED
+        cells = self._cells
+        for from_pos in self._piece_positions(color):
+            i_from = POS_TO_IDX[from_pos[1]][from_pos[0]]
+            targets = _TARGET_GENERATORS[cells[i_from] & 7](cells, i_from, color)
+            for i_to in targets:
+                yield (from_pos, IDX_TO_POS[i_to])
+
+    def create_moves_packed(self, with_captured: bool = False) -> array:
+        """以紧凑整数编码返回当前走子方的全部候选走法，直接由 mailbox 下标生成。"""
+        color = BLACK if self._move_side == BLACK else RED
+        cells = self._cells
+        generators = _TARGET_GENERATORS
+        if with_captured:
+            return array(
+                "I",
+                [
+                    sq_from | _IDX_TO_SQ_TO[i_to] | _CODE_TO_PACKED[cells[i_to]]
+                    for i_from, sq_from in self._packed_origins(color)
+                    for i_to in generators[cells[i_from] & 7](cells, i_from, color)
+                ],
+            )
+        return array(
+            "H",
+            [
+                sq_from | _IDX_TO_SQ_TO[i_to]
+                for i_from, sq_from in self._packed_origins(color)
+                for i_to in generators[cells[i_from] & 7](cells, i_from, color)
+            ],
+        )
+
+    def _packed_origins(self, color: int) -> List[Tuple[int, int]]:
+        """返回指定颜色棋子的 (mailbox 下标, 紧凑格子编号) 列表。"""
+        return [
+            (POS_TO_IDX[y][x], y * 9 + x) for x, y in self._piece_positions(color)
+        ]
+
+    def create_piece_moves(
+        self, pos: Tuple[int, int]
+    ) -> Iterator[Tuple[Tuple[int, int], Tuple[int, int]]]:
+        """生成指定位置棋子的所有候选走法。"""
+        i_from = POS_TO_IDX[pos[1]][pos[0]]
+        code = self._cells[i_from]
+        if code == EMPTY or code_color(code) != self._move_side:
+            return
+        from_pos = IDX_TO_POS[i_from]
+        for i_to in self._gen_targets(i_from, code):
+            yield (from_pos, IDX_TO_POS[i_to])
+
+    def count_x_line_in(self, y: int, x_from: int, x_to: int) -> int:
+        """统计同一行 y 上 x_from 与 x_to 之间（不含端点）被占用的格子数。"""
+        step = 1 if x_to > x_from else -1
+        cells = self._cells
+        row = POS_TO_IDX[y]
+        return sum(1 for x in range(x_from + step, x_to, step) if cells[row[x]])
+
+    def count_y_line_in(self, x: int, y_from: int, y_to: int) -> int:
+        """统计同一列 x 上 y_from 与 y_to 之间（不含端点）被占用的格子数。"""
+        step = 1 if y_to > y_from else -1
+        cells = self._cells
+        return sum(
+            1 for y in range(y_from + step, y_to, step) if cells[POS_TO_IDX[y][x]]
+        )
+
+    def to_fen(self):
+        """将棋盘序列化为简化 FEN 字符串（不含额外信息）。"""
+        cells = self._cells
+        rows = []
+        for y in range(9, -1, -1):
+            row = ""
+            count = 0
+            for i in POS_TO_IDX[y]:
+                code = cells[i]
+                if code == EMPTY:
+                    count += 1
+                    continue
+                if count:
+                    row += str(count)
+                    count = 0
+                row += CODE_TO_FENCH[code]
+            if count:
+                row += str(count)
+            rows.append(row)
+
+        side = "b" if self._move_side == BLACK else "w"
+        return f"{'/'.join(rows)} {side}"
@@ -53,6 +53,12 @@ __all__ = [
     "iccs_flip",
     "iccs_swap",
     "iccs_list_mirror",
+    "PIECE_CODES",
+    "pack_move",
+    "unpack_move",
+    "packed_captured",
+    "packed2iccs",
+    "iccs2packed",
     "half2full",
     "full2half",
     "fen_move_color",
@@ -123,6 +129,45 @@ def iccs_list_mirror(iccs_list):
     return [iccs_mirror(x) for x in iccs_list]
 
 
+# -----------------------------------------------------#
+# 紧凑整数走法编码
+# 格子编号 sq = y * 9 + x（0..89），走法 = from_sq | to_sq << 7，可存入 array("H")；
+# 附带被吃棋子时再加上 PIECE_CODES[fench] << 14，需要 array("I")。
+PIECE_CODES = {fench: code for code, fench in enumerate("KABNRCPkabnrcp", 1)}
+_CODE_FENCHS = (None,) + tuple("KABNRCPkabnrcp")
+_SQ_POS = tuple((sq % 9, sq // 9) for sq in range(90))
+_SQ_ICCS = tuple(f"{chr(ord('a') + x)}{y}" for x, y in _SQ_POS)
+
+
+def pack_move(pos_from, pos_to, captured=None):
+    """将 (from, to) 坐标编码为整数走法，captured 为被吃棋子的 fench（可选）。"""
+    move = (pos_from[1] * 9 + pos_from[0]) | (pos_to[1] * 9 + pos_to[0]) << 7
+    if captured:
+        move |= PIECE_CODES[captured] << 14
+    return move
+
+
+def unpack_move(move):
+    """将整数走法解码为 ((x, y), (x, y)) 坐标元组。"""
+    return (_SQ_POS[move & 0x7F], _SQ_POS[(move >> 7) & 0x7F])
+
+
+def packed_captured(move):
+    """返回整数走法中记录的被吃棋子 fench，未记录时返回 None。"""
+    return _CODE_FENCHS[move >> 14]
+
+
+def packed2iccs(move):
+    """将整数走法转换为 ICCS 字符串（如 "h2e2"）。"""
+    return _SQ_ICCS[move & 0x7F] + _SQ_ICCS[(move >> 7) & 0x7F]
+
+
+def iccs2packed(iccs):
+    """将 ICCS 字符串转换为整数走法（不含被吃棋子）。"""
+    pos_from, pos_to = iccs2pos(iccs)
+    return pack_move(pos_from, pos_to)
+
+
 # -----------------------------------------------------#
 _fench_name_dict = {
     "K": "帅",
@@ -17,11 +17,12 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 import enum
 import logging
 import os
+import selectors
 import subprocess
-import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from queue import Empty, Queue
-from threading import Thread
+from threading import Event, Lock, Thread
 
 from .board import ChessBoard, fen_mirror
 from .common import (
@@ -137,12 +138,16 @@ class Engine(Thread):
         self.pin = None
         self.pout = None
         self.perr = None
-        self.engine_out_queue = Queue()
 
         self.last_fen = None
         self.last_go = None
         self.score_dict = {}
         self.move_queue = Queue()
+        # 读线程收到协议应答（uciok/ucciok/readyok）或引擎退出时置位
+        self._ready_event = Event()
+        # 没有正在进行的搜索时置位：收到 bestmove/nobestmove 或引擎退出
+        self._idle_event = Event()
+        self._idle_event.set()
 
     def init_cmd(self):
         """返回启动时发送给引擎的初始化命令。
@@ -156,11 +161,13 @@ class Engine(Thread):
         """返回协议初始化完成时的应答关键字。"""
         return ""
 
-    def load(self, engine_path):
+    def load(self, engine_path, io_hub=None):
         """启动引擎进程并进行必要的初始化。
 
         参数:
             engine_path (str): 引擎可执行文件路径
+            io_hub (EngineIOHub): 可选的 I/O 集线器；提供时由集线器的线程读取
+                引擎输出，不再为本引擎启动读线程
 
         返回:
             bool: 成功则返回 True，失败返回 False
@@ -187,17 +194,18 @@ class Engine(Thread):
             self.engine_status = EngineStatus.ERROR
             return (False, str(e))
 
-        time.sleep(0.5)
-
         self.pin = self.process.stdin
         self.pout = self.process.stdout
         self.perr = self.process.stderr
-        self.engine_out_queue = Queue()
+        self._ready_event.clear()
         self.engine_status = EngineStatus.BOOTING
 
         self._send_cmd(self.init_cmd())
 
-        self.start()
+        if io_hub is None:
+            self.start()
+        else:
+            io_hub.register(self)
 
         return (True, None)
 
@@ -215,30 +223,35 @@ class Engine(Thread):
         if params is None:
             params = {}
 
-        self._send_cmd(f"position fen {fen}")
         param_list = [f"{key} {value}" for key, value in params.items()]
         go_cmd = "go " + " ".join(param_list)
 
-        ok = self._send_cmd(go_cmd)
-        if not ok:
-            return False
-
+        # 读线程解析 info 行时会用到这些字段，需在发送命令前设置
         self.last_fen = fen
         self.last_go = go_cmd
         self.score_dict = {}
+        self._idle_event.clear()
+
+        self._send_cmd(f"position fen {fen}")
+        ok = self._send_cmd(go_cmd)
+        if not ok:
+            return False
 
         return True
 
-    def get_action(self):
-        """尝试获取已解析的引擎动作（非阻塞）。
+    def get_action(self, timeout=0):
+        """获取一条已解析的引擎动作。
 
-        会先处理一次内部消息队列，然后从 `move_queue` 弹出一条
-        已解析的动作信息并返回；若队列为空返回 None。
+        引擎输出由读线程解析后放入 `move_queue`。timeout 为 0（默认）时
+        不等待，队列为空返回 None；为 None 时一直等到有动作；否则最多
+        等待 timeout 秒，动作到达时立即返回。
         """
-        self._handle_msg_once()
-        if self.move_queue.empty():
+        try:
+            if timeout == 0:
+                return self.move_queue.get_nowait()
+            return self.move_queue.get(timeout=timeout)
+        except Empty:
             return None
-        return self.move_queue.get()
 
     def set_option(self, name, value):
         """向引擎发送设置选项的命令（UCI/UCCI setoption）。
@@ -285,41 +298,64 @@ class Engine(Thread):
 
     def wait_for_ready(self, timeout=10):
         """等待引擎进入 READY 状态，最多等待 `timeout` 秒。
-        在等待期间会间歇性地处理来自引擎的输出消息。
+        读线程收到协议应答或引擎退出时立即唤醒，不做轮询。
 
         参数:
             timeout (float): 超时时间（秒）
 
         返回:
-            bool: 引擎准备好返回 True，超时返回 False
+            bool: 引擎准备好返回 True；超时、启动失败（ERROR）或引擎已退出
+                （DEAD）返回 False
         """
-        start_time = time.time()
-
-        while True:
-            self._handle_msg_once()
-            if self.engine_status == EngineStatus.READY:
-                return True
-
-            if time.time() - start_time > timeout:
-                return False
-            time.sleep(0.2)
-
-        return False
+        if self.engine_status in (EngineStatus.ERROR, EngineStatus.DEAD):
+            return False
+        self._ready_event.wait(timeout)
+        return self.engine_status == EngineStatus.READY
+
+    def is_ready(self, timeout=10):
+        """发送 'isready' 并等待 'readyok'，用于确认之前的命令（如设置选项）已处理完。"""
+        self._ready_event.clear()
+        self._send_cmd("isready")
+        return (
+            self._ready_event.wait(timeout)
+            and self.engine_status == EngineStatus.READY
+        )
+
+    def quit(self, timeout=5):
+        """发送 'quit' 命令并等待引擎进程退出。
+
+        超时后先 terminate，再等待 timeout 秒仍未退出则 kill。进程已经退出时
+        直接返回。
+        """
+        if self.process.poll() is None:
+            try:
+                self._send_cmd("quit")
+            except EngineError:
+                # 引擎在写入前后已经退出，下面的 wait 会立即返回
+                pass
+        try:
+            self.process.wait(timeout)
+            return
+        except subprocess.TimeoutExpired:
+            logger.warning("engine %s did not quit in time", self.engine_exec_path)
+        self.process.terminate()
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            logger.warning("engine %s ignored terminate, killing it", self.engine_exec_path)
+            self.process.kill()
+            self.process.wait()
 
-    def quit(self):
-        """发送 'quit' 命令终止引擎并短暂停顿以便进程退出。"""
-        self._send_cmd("quit")
-        time.sleep(0.2)
+    def stop_thinking(self, timeout=5):
+        """请求引擎停止正在进行的搜索并消费其返回信息。
 
-    def stop_thinking(self):
-        """请求引擎停止正在进行的搜索并读取可能的返回信息。
-        发送 'stop' 后尝试多次拉取动作以确保引擎的响应被消费。
+        发送 'stop' 后等待读线程收到 bestmove（没有搜索时立即返回），
+        然后丢弃队列中尚未取走的动作，避免影响下一次搜索。
         """
         self._send_cmd("stop")
-        time.sleep(0.1)
-        self.get_action()
-        time.sleep(0.1)
-        self.get_action()
+        self._idle_event.wait(timeout)
+        while self.get_action() is not None:
+            pass
 
     def run(self):
         """线程主循环。不断调用 `run_once` 读取引擎输出直到停止。"""
@@ -331,11 +367,29 @@ class Engine(Thread):
 
     # run_once 在线程中运行
     def run_once(self):
-        """读取一行引擎输出并放入内部队列。"""
+        """读取并解析一行引擎输出；读到管道结尾（进程退出）时结束线程。"""
         # readline 会阻塞
-        output = self.pout.readline().strip()
-        if len(output) > 0:
-            self.engine_out_queue.put(output)
+        output = self.pout.readline()
+        if not output:
+            self._handle_eof()
+            return
+        output = output.strip()
+        if output:
+            self._handle_output(output)
+
+    def _handle_eof(self):
+        """引擎输出管道已关闭：停止读取，标记终止状态并唤醒所有等待者。
+
+        启动阶段退出记为 ERROR，就绪之后退出记为 DEAD，等待者据此区分
+        已退出的引擎与就绪的引擎。
+        """
+        self.running = False
+        if self.engine_status == EngineStatus.READY:
+            self.engine_status = EngineStatus.DEAD
+        else:
+            self.engine_status = EngineStatus.ERROR
+        self._ready_event.set()
+        self._idle_event.set()
 
     def _merge_cached_score(self, move_info):
         """将缓存中的评分字段合并到 bestmove 结果。"""
@@ -399,25 +453,15 @@ class Engine(Thread):
             move_info["action"] = "ready"
         return move_info
 
-    # handle_msg_once 在前台运行
-    def _handle_msg_once(self):
-        """处理引擎输出队列中的一条消息（非阻塞）。
-
-        从内部输出队列中取出一行引擎输出，解析后根据当前状态构造
-        动作字典并放入 `move_queue`。返回 True 表示处理了消息，
-        返回 False 表示队列为空无消息可处理。
-        """
-
-        try:
-            output = self.engine_out_queue.get_nowait()
-        except Empty:
-            return False
+    # _handle_output 在读线程中运行
+    def _handle_output(self, output):
+        """解析一行引擎输出，构造动作字典放入 `move_queue` 并唤醒等待者。"""
 
         logger.debug("<-- %s", output)
 
-        if output in ["bye", ""]:  # stop pipe
+        if output == "bye":  # stop pipe
             self.process.terminate()
-            return True
+            return
 
         out_list = output.split()
         resp_id = out_list[0]
@@ -431,7 +475,10 @@ class Engine(Thread):
         if len(move_info) > 0:
             self.move_queue.put(move_info)
 
-        return True
+        if resp_id in ("readyok", self.ok_resp()):
+            self._ready_event.set()
+        elif resp_id in ("bestmove", "nobestmove"):
+            self._idle_event.set()
 
 
 # ------------------------------------------------------------------------------
@@ -459,6 +506,144 @@ class UciEngine(Engine):
         return "uciok"
 
 
+# ------------------------------------------------------------------------------
+class EngineIOHub:
+    """用一个线程读取多个引擎进程输出的 I/O 集线器。
+
+    默认每个 `Engine` 都有自己的读线程，逐行阻塞在 readline 上。引擎数量
+    较多时，可以把引擎注册到同一个集线器：集线器线程用 `selectors` 同时
+    等待所有引擎的 stdout，可读时一次读出全部数据并按行切分，再交给对应
+    引擎的 `_handle_output` 解析，引擎退出时调用其 `_handle_eof`。
+
+    Windows 的管道不支持 select，此时 `register` 退回为启动引擎自己的读线程。
+
+    使用示例:
+        hub = EngineIOHub()
+        manager = EngineManager(io_hub=hub)
+        manager.load_uci("pikafish", {}, {"depth": 12})
+        ...
+        manager.quit()
+        hub.close()
+    """
+
+    READ_SIZE = 65536
+
+    def __init__(self):
+        """创建集线器，第一次注册引擎时才启动读线程。"""
+        self._lock = Lock()
+        self._pending = []
+        self._buffers = {}
+        self._selector = None
+        self._thread = None
+        self._wake_r = self._wake_w = None
+        self.running = False
+
+    def __len__(self):
+        """当前由集线器读取输出的引擎数。"""
+        with self._lock:
+            return len(self._buffers) + len(self._pending)
+
+    def register(self, engine):
+        """开始读取 engine 的输出（engine 的进程须已启动）。"""
+        if os.name == "nt":
+            engine.start()
+            return
+
+        with self._lock:
+            if self._thread is None:
+                self._start()
+            elif not self.running:
+                raise EngineError("引擎集线器正在关闭")
+            engine.running = True
+            # 选择器只在集线器线程中修改，这里先登记再唤醒它
+            self._pending.append(engine)
+            os.write(self._wake_w, b"\0")
+
+    def _start(self):
+        """创建选择器与唤醒管道并启动集线器线程。"""
+        self._selector = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = os.pipe()
+        self._selector.register(self._wake_r, selectors.EVENT_READ)
+        self.running = True
+        self._thread = Thread(target=self._run, name="EngineIOHub", daemon=True)
+        self._thread.start()
+
+    def close(self, timeout=5):
+        """停止集线器线程。尚未退出的引擎不再有输出被读取。
+
+        选择器与唤醒管道由集线器线程退出时释放；timeout 秒内线程仍未退出
+        时只记录警告，留给线程自己清理。
+        """
+        with self._lock:
+            thread = self._thread
+            if thread is None or not self.running:
+                return
+            self.running = False
+            os.write(self._wake_w, b"\0")
+        thread.join(timeout)
+        if thread.is_alive():
+            logger.warning("EngineIOHub thread did not stop in %s seconds", timeout)
+
+    def _run(self):
+        """集线器线程主循环，退出时释放选择器与唤醒管道。"""
+        try:
+            while self.running:
+                for key, _events in self._selector.select():
+                    if key.data is None:
+                        os.read(self._wake_r, self.READ_SIZE)
+                        self._register_pending()
+                    else:
+                        self._read(key.fd, key.data)
+        finally:
+            with self._lock:
+                self.running = False
+                self._selector.close()
+                os.close(self._wake_r)
+                os.close(self._wake_w)
+                self._thread = None
+                self._pending = []
+                self._buffers = {}
+
+    def _register_pending(self):
+        """把 register 登记的引擎加入选择器。"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+            for engine in pending:
+                fd = engine.pout.fileno()
+                self._buffers[fd] = b""
+                self._selector.register(fd, selectors.EVENT_READ, engine)
+
+    def _read(self, fd, engine):
+        """读出 fd 上的全部可用数据，按行交给 engine 解析。"""
+        try:
+            data = os.read(fd, self.READ_SIZE)
+        except OSError:
+            data = b""
+
+        lines = (self._buffers[fd] + data).split(b"\n")
+        # 最后一段是不完整的行；读到结尾时也把它当作一行
+        self._buffers[fd] = lines.pop() if data else b""
+        if not data and lines[-1] == b"":
+            lines.pop()
+
+        encoding = engine.pout.encoding
+        for line in lines:
+            output = line.decode(encoding, "replace").strip()
+            if not output:
+                continue
+            try:
+                engine._handle_output(output)  # pylint: disable=protected-access
+            except Exception:  # pylint: disable=broad-except
+                # 单个引擎的解析错误不能让集线器线程退出
+                logger.exception("handle engine output [%s] ERROR", output)
+
+        if not data:
+            with self._lock:
+                self._selector.unregister(fd)
+                del self._buffers[fd]
+            engine._handle_eof()  # pylint: disable=protected-access
+
+
 # ------------------------------------------------------------------------------
 def action_mirror(action):
     """镜像 action 中的走法字段（move/ponder/moves）。"""
@@ -486,6 +671,8 @@ class FenCache:
         self.fen_dict = {}
         self.cache_file = ""
         self.need_save = False
+        # EnginePool 的多个工作线程共享同一个缓存
+        self._lock = Lock()
 
     def get(self, fen):
         """根据给定的 FEN 获取缓存的动作信息。
@@ -536,19 +723,20 @@ class FenCache:
         """
 
         iccs = action["move"]
-        if fen in self.fen_dict:
-            self.fen_dict[fen][iccs] = action
-            return True
+        with self._lock:
+            if fen in self.fen_dict:
+                self.fen_dict[fen][iccs] = action
+                return True
 
-        f_mirror = fen_mirror(fen)
-        i_mirror = iccs_mirror(iccs)
-        if f_mirror in self.fen_dict:
-            self.fen_dict[f_mirror][i_mirror] = action
-            return True
+            f_mirror = fen_mirror(fen)
+            i_mirror = iccs_mirror(iccs)
+            if f_mirror in self.fen_dict:
+                self.fen_dict[f_mirror][i_mirror] = action
+                return True
 
-        self.fen_dict[fen] = {}
-        self.fen_dict[fen][iccs] = action
-        self.need_save = True
+            self.fen_dict[fen] = {}
+            self.fen_dict[fen][iccs] = action
+            self.need_save = True
 
         return True
 
@@ -574,13 +762,18 @@ class FenCache:
 class EngineManager:
     """引擎加载与查询的门面管理器。"""
 
-    def __init__(self, fen_cache=None):
+    # 加载时等待引擎应答（uciok/ucciok、readyok）的超时时间（秒）
+    ready_timeout = 10
+
+    def __init__(self, fen_cache=None, io_hub=None):
         """引擎管理器：加载、配置引擎并对外提供运行和缓存接口。
 
         参数:
             fen_cache (FenCache): 可选的缓存实例，如未提供会创建一个新的。
+            io_hub (EngineIOHub): 可选的 I/O 集线器，提供时引擎输出由它读取
         """
         self.engine = None
+        self.io_hub = io_hub
         self.go_params = {}
         if fen_cache is None:
             fen_cache = FenCache()
@@ -611,17 +804,20 @@ class EngineManager:
         返回 True 表示加载并准备就绪，False 表示失败。
         """
 
-        ok = self.engine.load(engine_exec)
+        ok, _err = self.engine.load(engine_exec, self.io_hub)
         if not ok:
             return False
 
-        ok = self.engine.wait_for_ready()
+        ok = self.engine.wait_for_ready(self.ready_timeout)
         if not ok:
             return False
 
         # self.engine_options = options
         for name, value in options.items():
             self.engine.set_option(name, value)
+        # 确认选项已被处理后再开始搜索
+        if options and not self.engine.is_ready(self.ready_timeout):
+            return False
 
         self.go_params = go_params
 
@@ -652,10 +848,14 @@ class EngineManager:
 
         # print('go:', fen, self.go_params)
         while True:
-            action = self.engine.get_action()
+            # 动作到达时立即唤醒；长时间没有输出时顺便检查引擎是否已退出
+            action = self.engine.get_action(timeout=1)
 
             if action is None:
-                time.sleep(0.2)
+                if self.engine.process.poll() is not None:
+                    raise EngineError(
+                        f"程序异常退出，退出码：{self.engine.process.returncode}"
+                    )
                 continue
 
             action_id = action["action"]
@@ -694,9 +894,194 @@ class EngineManager:
                 return action
 
     def quit(self):
-        """终止当前管理的引擎并短暂停顿以确保进程退出。"""
+        """终止当前管理的引擎并等待进程退出。"""
         self.engine.quit()
-        time.sleep(0.5)
+
+
+# ------------------------------------------------------------------------------
+def _engine_alive(engine):
+    """引擎进程是否仍在运行。"""
+    if engine.engine_status in (EngineStatus.ERROR, EngineStatus.DEAD):
+        return False
+    return engine.process is not None and engine.process.poll() is None
+
+
+def _fail_tasks(tasks, error):
+    """让尚未完成的任务以 error 结束（已取消的任务跳过）。"""
+    for _fen, future, _use_cache in tasks:
+        if future.running() or future.set_running_or_notify_cancel():
+            future.set_exception(error)
+
+
+class EnginePool:
+    """多个引擎进程组成的进程池，用于批量并发分析局面。
+
+    每个引擎进程由一个 `EngineManager` 管理并使用相同的选项与 go 参数，
+    所有管理器共享同一个 `FenCache`。提交的局面放入任务队列，由每个引擎
+    对应的工作线程取出执行，结果与 `EngineManager.run_engine()` 返回的
+    动作字典相同。全部引擎的输出由同一个 `EngineIOHub` 线程读取。
+
+    使用示例:
+        pool = EnginePool(8)
+        pool.load_uci("pikafish", {"Threads": 1}, {"depth": 12})
+        for fen, action in zip(fens, pool.map(fens)):
+            print(fen, action["move"], action["score"])
+        pool.quit()
+    """
+
+    def __init__(self, size=None, fen_cache=None):
+        """创建进程池（此时还没有启动引擎进程）。
+
+        参数:
+            size (int): 引擎进程数，默认为 CPU 核数
+            fen_cache (FenCache): 共享的局面缓存，未提供时新建一个
+        """
+        self.size = size or os.cpu_count() or 1
+        if fen_cache is None:
+            fen_cache = FenCache()
+        self.cache = fen_cache
+        self.io_hub = EngineIOHub()
+        self.managers = []
+        self._tasks = Queue()
+        self._workers = []
+        self._lock = Lock()
+        self._alive = 0  # 引擎仍在运行的工作线程数
+
+    def load_uci(self, engine_exec, options, go_params):
+        """以 UCI 协议启动 size 个引擎进程，全部就绪返回 True。"""
+        return self._load(EngineManager.load_uci, engine_exec, options, go_params)
+
+    def load_ucci(self, engine_exec, options, go_params):
+        """以 UCCI 协议启动 size 个引擎进程（类似 `load_uci`）。"""
+        return self._load(EngineManager.load_ucci, engine_exec, options, go_params)
+
+    def _load(self, load_func, engine_exec, options, go_params):
+        """并行启动并初始化全部引擎，任一失败则关闭已启动的引擎并返回 False。"""
+        managers = [EngineManager(self.cache, self.io_hub) for _ in range(self.size)]
+        with ThreadPoolExecutor(self.size) as executor:
+            results = list(
+                executor.map(
+                    lambda manager: load_func(manager, engine_exec, options, go_params),
+                    managers,
+                )
+            )
+
+        if not all(results):
+            logger.error("load engine pool %s ERROR", engine_exec)
+            # 握手失败的引擎进程可能仍在运行，同样需要关闭
+            for manager in managers:
+                process = manager.engine.process if manager.engine else None
+                if process is not None and process.poll() is None:
+                    manager.quit()
+            self.io_hub.close()
+            return False
+
+        self.managers = managers
+        self._alive = len(managers)
+        for manager in managers:
+            worker = Thread(target=self._work, args=(manager,), daemon=True)
+            worker.start()
+            self._workers.append(worker)
+        return True
+
+    def _work(self, manager):
+        """工作线程：从任务队列取出局面交给 manager 执行，直到收到 None。
+
+        引擎进程退出后，工作线程把手上的任务放回队列交给其他引擎并结束。
+        """
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                return
+            fen, future, use_cache = task
+            # 放回队列的任务已经处于运行状态
+            if not future.running() and not future.set_running_or_notify_cancel():
+                continue
+            try:
+                if use_cache:
+                    action = manager.get_fen_score(fen)
+                else:
+                    action = manager.run_engine(fen)
+            except Exception as e:  # pylint: disable=broad-except
+                if not _engine_alive(manager.engine):
+                    logger.error("engine %s exited, worker stopped", manager.engine.engine_exec_path)
+                    self._retire(task)
+                    return
+                # 异常通过 Future 转交给调用方，工作线程继续处理后续任务
+                future.set_exception(e)
+            else:
+                future.set_result(action)
+
+    def _retire(self, task):
+        """引擎退出的工作线程结束前调用：把任务交给其他引擎。
+
+        已经没有可用的引擎时，该任务与队列中剩余的任务都以 EngineError 结束。
+        """
+        with self._lock:
+            self._alive -= 1
+            if self._alive > 0:
+                self._tasks.put(task)
+                return
+            tasks = [task] + self._drain()
+        _fail_tasks(tasks, EngineError("引擎池中的引擎已全部退出"))
+
+    def _drain(self):
+        """取出任务队列中剩余的全部任务（忽略结束标记 None）。"""
+        tasks = []
+        while True:
+            try:
+                task = self._tasks.get_nowait()
+            except Empty:
+                return tasks
+            if task is not None:
+                tasks.append(task)
+
+    def submit(self, fen, use_cache=False):
+        """提交一个局面，返回 `concurrent.futures.Future`，结果为动作字典。
+
+        参数:
+            fen (str): 要分析的局面
+            use_cache (bool): True 时先查共享缓存（同 `EngineManager.get_fen_score`）
+        """
+        if not self.managers:
+            raise EngineError("引擎池尚未加载引擎")
+        future = Future()
+        with self._lock:
+            if self._alive == 0:
+                raise EngineError("引擎池中的引擎已全部退出")
+            self._tasks.put((fen, future, use_cache))
+        return future
+
+    def map(self, fens, use_cache=False):
+        """立即提交一批局面，返回按提交顺序逐个给出动作字典的迭代器。"""
+        futures = [self.submit(fen, use_cache) for fen in fens]
+        return (future.result() for future in futures)
+
+    def run_engine(self, fen):
+        """分析单个局面并等待结果（与 `EngineManager.run_engine` 相同）。"""
+        return self.submit(fen).result()
+
+    def get_fen_score(self, fen):
+        """先查共享缓存，未命中时交给引擎分析（与 `EngineManager.get_fen_score` 相同）。"""
+        return self.submit(fen, use_cache=True).result()
+
+    def quit(self):
+        """等待已提交的任务完成后关闭全部引擎进程。"""
+        for _ in self._workers:
+            self._tasks.put(None)
+        for worker in self._workers:
+            worker.join()
+        # 引擎退出时放回队列的任务可能排在结束标记之后，没有工作线程再处理
+        with self._lock:
+            self._alive = 0
+            tasks = self._drain()
+        _fail_tasks(tasks, EngineError("引擎池已关闭"))
+        for manager in self.managers:
+            if manager.engine.process.poll() is None:
+                manager.quit()
+        self.io_hub.close()
+        self._workers = []
+        self.managers = []
 
 
 # ------------------------------------------------------------------------------
@@ -3,11 +3,13 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
 import logging
 import subprocess
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 from .board import ChessBoard
+from .exception import EngineError
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +29,10 @@ class AsyncEngine:
         self._initialized = False
         self._options: Dict[str, Any] = {}
         self._id: Dict[str, str] = {}
+        # 已发送 go、尚未读到 bestmove
+        self._searching = False
+        # 引擎当前的 MultiPV 设置（引擎默认为 1）
+        self._multipv = 1
 
     async def __aenter__(self) -> AsyncEngine:
         """异步上下文管理器入口"""
@@ -77,21 +83,26 @@ class AsyncEngine:
             logger.info("Engine initialized: %s", self._id.get("name", "Unknown"))
             return True
 
-        except (RuntimeError, OSError) as e:
+        except (RuntimeError, OSError, EngineError) as e:
             logger.error("Failed to initialize engine: %s", e)
             return False
 
     async def _send_line(self, line: str) -> None:
-        """发送一行命令到引擎"""
+        """发送一行命令到引擎，引擎已退出时抛出 `EngineError`"""
         if self.process and self.process.stdin:
-            self.process.stdin.write((line + "\n").encode())
-            await self.process.stdin.drain()
+            try:
+                self.process.stdin.write((line + "\n").encode())
+                await self.process.stdin.drain()
+            except (BrokenPipeError, ConnectionResetError) as e:
+                raise EngineError("引擎已退出") from e
             logger.debug(">> %s", line)
 
     async def _read_line(self) -> str:
-        """从引擎读取一行"""
+        """从引擎读取一行，引擎已退出（读到结尾）时抛出 `EngineError`"""
         if self.process and self.process.stdout:
             line_bytes = await self.process.stdout.readline()
+            if not line_bytes:
+                raise EngineError("引擎已退出")
             line = line_bytes.decode().strip()
             logger.debug("<< %s", line)
             return line
@@ -129,6 +140,13 @@ class AsyncEngine:
         """
         for name, value in options.items():
             await self._send_line(f"setoption name {name} value {value}")
+            if name == "MultiPV":
+                self._multipv = int(value)
+
+    async def _set_multipv(self, multipv: int) -> None:
+        """与引擎当前设置不同时发送 MultiPV，之前的请求设置过的值不会残留。"""
+        if multipv != self._multipv:
+            await self.configure({"MultiPV": str(multipv)})
 
     async def play(
         self,
@@ -157,6 +175,7 @@ class AsyncEngine:
         # 构建并发送 go 命令
         go_cmd = self._build_go_command(depth, time_limit, ponder)
         await self._send_line(go_cmd)
+        self._searching = True
 
         # 等待结果
         return await self._wait_for_result()
@@ -183,6 +202,7 @@ class AsyncEngine:
         while True:
             line = await self._read_line()
             if line.startswith("bestmove"):
+                self._searching = False
                 parts = line.split()
                 if len(parts) >= 2:
                     result["move"] = parts[1]
@@ -219,8 +239,7 @@ class AsyncEngine:
             raise RuntimeError("Engine not initialized")
 
         # 设置 multipv
-        if multipv > 1:
-            await self.configure({"MultiPV": str(multipv)})
+        await self._set_multipv(multipv)
 
         # 发送局面
         await self._send_line(f"position fen {board.to_fen()}")
@@ -233,6 +252,7 @@ class AsyncEngine:
             go_cmd += f" movetime {int(time_limit * 1000)}"
 
         await self._send_line(go_cmd)
+        self._searching = True
 
         # 收集分析结果
         results: List[Dict[str, Any]] = []
@@ -241,6 +261,7 @@ class AsyncEngine:
         while True:
             line = await self._read_line()
             if line.startswith("bestmove"):
+                self._searching = False
                 break
             if line.startswith("info"):
                 info = self._parse_info(line)
@@ -254,6 +275,80 @@ class AsyncEngine:
 
         return results
 
+    async def analyse_stream(
+        self,
+        board: ChessBoard,
+        depth: Optional[int] = None,
+        time_limit: Optional[float] = None,
+        multipv: int = 1,
+        depth_change_only: bool = False,
+        interval: Optional[float] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """分析局面，边搜索边逐条返回 `_parse_info` 解析出的 info。
+
+        读到 bestmove 时结束迭代。迭代被取消或提前关闭（aclose）时向引擎
+        发送 stop 并读完剩余输出，之后引擎可以直接用于下一次搜索。提前
+        退出循环时建议用 `contextlib.aclosing` 包装，以便立即停止搜索。
+
+        使用示例:
+            async for info in engine.analyse_stream(board, time_limit=10):
+                print(info["depth"], info.get("score"), info.get("pv"))
+
+        参数:
+            board: 当前局面
+            depth: 搜索深度
+            time_limit: 分析时间（秒）
+            multipv: 分析多条线路的数量
+            depth_change_only: 为 True 时只返回深度变化后的第一条 info
+            interval: 两条 info 之间的最短间隔（秒），间隔内到达的 info 被跳过，
+                其中最后一条在搜索结束时补发
+
+        返回:
+            异步迭代器，每项为一条 info 的解析结果
+        """
+        if not self._initialized:
+            raise RuntimeError("Engine not initialized")
+
+        await self._set_multipv(multipv)
+
+        await self._send_line(f"position fen {board.to_fen()}")
+        await self._send_line(self._build_go_command(depth, time_limit))
+        self._searching = True
+
+        loop = asyncio.get_running_loop()
+        last_depth = None
+        last_time = None
+        pending = None
+        try:
+            while True:
+                line = await self._read_line()
+                if line.startswith("bestmove"):
+                    self._searching = False
+                    if pending is not None:
+                        yield pending
+                    return
+                if not line.startswith("info"):
+                    continue
+                info = self._parse_info(line)
+                if "depth" not in info:
+                    # info string、currmove 等不含搜索结果的行
+                    continue
+                if depth_change_only:
+                    if info["depth"] == last_depth:
+                        continue
+                    last_depth = info["depth"]
+                if interval is not None:
+                    now = loop.time()
+                    if last_time is not None and now - last_time < interval:
+                        pending = info
+                        continue
+                    last_time = now
+                    pending = None
+                yield info
+        finally:
+            if self._searching:
+                await self.stop()
+
     def _parse_info(self, line: str) -> Dict[str, Any]:
         """解析 info 行"""
         result = {}
@@ -284,10 +379,26 @@ class AsyncEngine:
 
         return result
 
+    async def stop(self) -> None:
+        """停止正在进行的搜索，并读掉剩余输出直到 bestmove。
+
+        play/analyse 被取消时引擎可能仍在搜索，再次使用前需调用本方法；
+        没有搜索时直接返回。
+        """
+        if not self._searching:
+            return
+        await self._send_line("stop")
+        while True:
+            line = await self._read_line()
+            if line.startswith("bestmove"):
+                break
+        self._searching = False
+
     async def quit(self) -> None:
         """关闭引擎进程"""
         if self.process:
-            await self._send_line("quit")
+            with contextlib.suppress(EngineError):
+                await self._send_line("quit")
             try:
                 await asyncio.wait_for(self.process.wait(), timeout=5.0)
             except asyncio.TimeoutError:
@@ -296,9 +407,191 @@ class AsyncEngine:
 
             self.process = None
             self._initialized = False
+            self._searching = False
+            self._multipv = 1
             logger.info("Engine terminated")
 
 
+class AsyncEnginePool:
+    """由多个 `AsyncEngine` 组成的异步引擎池。
+
+    同一个引擎上的 play/analyse 不能重叠，引擎池为每个请求分配一个空闲
+    引擎，用完后放回。空闲引擎放在 FIFO 队列中，由信号量限制同时使用的
+    引擎数；引擎全忙时请求按到达顺序排队等待。设置 max_waiting 后，
+    排队的请求超过该数量时新请求直接抛出 `EngineError`。
+
+    使用示例:
+        async with AsyncEnginePool("path/to/engine", size=4) as pool:
+            results = await asyncio.gather(
+                *(pool.analyse(board, depth=12) for board in boards)
+            )
+    """
+
+    def __init__(
+        self,
+        exec_path: str,
+        size: int = 2,
+        options: Optional[Dict[str, Any]] = None,
+        max_waiting: Optional[int] = None,
+    ):
+        self.engine_exec_path = exec_path
+        self.size = size
+        self.options: Dict[str, Any] = dict(options or {})
+        self.max_waiting = max_waiting
+        self.engines: List[AsyncEngine] = []
+        # asyncio 对象在 start() 中创建，以绑定到运行中的事件循环
+        self._idle: Optional[asyncio.Queue] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._waiting = 0
+
+    async def __aenter__(self) -> AsyncEnginePool:
+        """异步上下文管理器入口"""
+        if not await self.start():
+            raise EngineError(f"引擎池启动失败：{self.engine_exec_path}")
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        """异步上下文管理器退出"""
+        await self.quit()
+
+    @property
+    def busy(self) -> int:
+        """正在使用中的引擎数"""
+        if self._idle is None:
+            return 0
+        return len(self.engines) - self._idle.qsize()
+
+    @property
+    def waiting(self) -> int:
+        """正在排队等待空闲引擎的请求数"""
+        return self._waiting
+
+    async def _new_engine(self) -> Optional[AsyncEngine]:
+        """启动并配置一个引擎，失败返回 None。"""
+        engine = AsyncEngine(self.engine_exec_path)
+        if not await engine.initialize():
+            return None
+        if self.options:
+            await engine.configure(self.options)
+        return engine
+
+    async def start(self) -> bool:
+        """并发启动 size 个引擎。
+
+        返回:
+            bool: 全部启动成功返回 True；任一失败时关闭已启动的引擎并返回 False
+        """
+        engines = await asyncio.gather(*(self._new_engine() for _ in range(self.size)))
+        if not all(engines):
+            logger.error("Failed to start engine pool: %s", self.engine_exec_path)
+            await asyncio.gather(*(e.quit() for e in engines if e))
+            return False
+
+        self.engines = list(engines)
+        self._idle = asyncio.Queue()
+        for engine in self.engines:
+            self._idle.put_nowait(engine)
+        self._semaphore = asyncio.Semaphore(len(self.engines))
+        return True
+
+    @contextlib.asynccontextmanager
+    async def acquire(self) -> AsyncIterator[AsyncEngine]:
+        """独占一个空闲引擎，用于 async with；引擎全忙时排队等待。
+
+        使用期间被取消或出错时，先停止引擎的搜索再放回；引擎已无法使用时
+        换一个新启动的引擎。
+        """
+        if self._semaphore is None:
+            raise EngineError("引擎池尚未启动")
+        if (
+            self.max_waiting is not None
+            and self._semaphore.locked()
+            and self._waiting >= self.max_waiting
+        ):
+            raise EngineError("引擎池繁忙")
+
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+
+        engine = self._idle.get_nowait()
+        try:
+            yield engine
+        except BaseException as e:
+            engine = await self._recover(engine, e)
+            raise
+        finally:
+            self._idle.put_nowait(engine)
+            self._semaphore.release()
+
+    async def _recover(self, engine: AsyncEngine, error: BaseException) -> AsyncEngine:
+        """让中断的引擎回到空闲状态，必要时替换为新引擎。"""
+        if not isinstance(error, EngineError):
+            try:
+                await asyncio.wait_for(engine.stop(), timeout=5.0)
+                return engine
+            except (asyncio.TimeoutError, EngineError) as e:
+                error = e
+        logger.warning("Restart engine after error: %s", error)
+
+        with contextlib.suppress(OSError):
+            await engine.quit()
+        new_engine = await self._new_engine()
+        if new_engine is None:
+            # 仍放回原引擎，后续请求会得到错误而不是永远等待
+            return engine
+        self.engines[self.engines.index(engine)] = new_engine
+        return new_engine
+
+    async def analyse(
+        self,
+        board: ChessBoard,
+        depth: Optional[int] = None,
+        time_limit: Optional[float] = None,
+        multipv: int = 1,
+    ) -> List[Dict[str, Any]]:
+        """用一个空闲引擎分析局面，参数与返回值同 `AsyncEngine.analyse`。"""
+        async with self.acquire() as engine:
+            return await engine.analyse(
+                board, depth=depth, time_limit=time_limit, multipv=multipv
+            )
+
+    async def analyse_stream(
+        self, board: ChessBoard, **kwargs: Any
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """用一个空闲引擎流式分析局面，参数同 `AsyncEngine.analyse_stream`。
+
+        迭代期间一直占用该引擎，迭代结束或关闭后放回。
+        """
+        async with self.acquire() as engine:
+            stream = engine.analyse_stream(board, **kwargs)
+            try:
+                async for info in stream:
+                    yield info
+            finally:
+                # 立即关闭内层迭代器，确保引擎停止搜索后才放回引擎池
+                await stream.aclose()
+
+    async def play(
+        self,
+        board: ChessBoard,
+        depth: Optional[int] = None,
+        time_limit: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """用一个空闲引擎走一步棋，参数与返回值同 `AsyncEngine.play`。"""
+        async with self.acquire() as engine:
+            return await engine.play(board, depth=depth, time_limit=time_limit)
+
+    async def quit(self) -> None:
+        """关闭全部引擎进程"""
+        await asyncio.gather(*(engine.quit() for engine in self.engines))
+        self.engines = []
+        self._idle = None
+        self._semaphore = None
+
+
 # 便捷函数
 async def play_move(
     engine: AsyncEngine,
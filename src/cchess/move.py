@@ -16,6 +16,9 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from __future__ import annotations
 
+import threading
+import weakref
+from collections import OrderedDict
 from dataclasses import dataclass
 from typing import List, Optional, Tuple
 
@@ -30,25 +33,58 @@ from .common import (
     swap_fench,
     text_to_fench,
 )
+from .exception import CChessError
 
 # pylint: disable=too-many-branches,too-many-statements,too-many-locals
 
 
 # -----------------------------------------------------#
-@dataclass
+@dataclass(init=False)
 class MoveInfo:
     """记录棋盘移动的增量状态信息，用于撤销操作"""
 
+    # 每步棋都会保存一个 MoveInfo，使用 __slots__ 省去实例字典；
+    # 槽位不能带类属性默认值，快照字段的默认值放在 __init__ 中
+    __slots__ = (
+        "board_after",
+        "board_before",
+        "captured_fench",
+        "from_pos",
+        "moving_fench",
+        "next_move_side",
+        "prev_move_side",
+        "to_pos",
+    )
+
     from_pos: Tuple[int, int]
     to_pos: Tuple[int, int]
     moving_fench: str  # 移动的棋子字符
     captured_fench: Optional[str]  # 被吃棋子，None 表示无吃子
     prev_move_side: int  # 移动前走子方 (RED/BLACK/ANY_COLOR)
     next_move_side: int  # 移动后走子方 (RED/BLACK/ANY_COLOR)
-    board_before: List[List[Optional[str]]]  # 移动前棋盘数组的深拷贝
-    board_after: List[List[Optional[str]]]  # 移动后棋盘数组的深拷贝
-    prev_attack_matrix_dirty: bool  # 移动前攻击矩阵脏标志
-    next_attack_matrix_dirty: bool  # 移动后攻击矩阵脏标志
+    # 以下快照仅在 make_move(snapshot=True) 时填充（否则为 None），撤销不依赖它们
+    board_before: Optional[List[List[Optional[str]]]]  # 移动前棋盘数组的深拷贝
+    board_after: Optional[List[List[Optional[str]]]]  # 移动后棋盘数组的深拷贝
+
+    def __init__(
+        self,
+        from_pos: Tuple[int, int],
+        to_pos: Tuple[int, int],
+        moving_fench: str,
+        captured_fench: Optional[str],
+        prev_move_side: int,
+        next_move_side: int,
+        board_before: Optional[List[List[Optional[str]]]] = None,
+        board_after: Optional[List[List[Optional[str]]]] = None,
+    ):
+        self.from_pos = from_pos
+        self.to_pos = to_pos
+        self.moving_fench = moving_fench
+        self.captured_fench = captured_fench
+        self.prev_move_side = prev_move_side
+        self.next_move_side = next_move_side
+        self.board_before = board_before
+        self.board_after = board_after
 
 
 # -----------------------------------------------------#
@@ -996,21 +1032,107 @@ def _king_rook_cannon_pawn_move(pos_from, move_str):
     return (pos_from[0], pos_from[1] + diff)
 
 
+# -----------------------------------------------------#
+# 走子棋盘快照缓存：按加入顺序淘汰，只保存弱引用，不会延长走子对象的生命周期。
+# 以弱引用本身为键：走子被回收后其旧项不会与新对象（可能复用同一 id）混淆。
+# 多个线程可能同时重放棋谱（如引擎池的分析线程），修改缓存时需加锁。
+_SNAPSHOT_CACHE: "OrderedDict[weakref.ref, None]" = OrderedDict()
+_SNAPSHOT_LOCK = threading.Lock()
+
+
+# -----------------------------------------------------#
+class _MoveExtra:  # pylint: disable=too-few-public-methods
+    """走子的不常用字段（注释、评分、引擎局面），只在用到时才分配。
+
+    引擎走子序列不逐步复制：`engine_prev` 指向历史中的上一步，`engine_self`
+    表示本步是否追加在其后，序列与完整局面字符串在需要时才生成。
+    """
+
+    __slots__ = (
+        "annote",
+        "engine_moves",
+        "engine_prev",
+        "engine_self",
+        "engine_text",
+        "fen_for_engine",
+        "score",
+    )
+
+    def __init__(self):
+        self.annote = ""
+        self.score = None
+        self.fen_for_engine = None
+        self.engine_prev = None  # 引擎历史中的上一步（其序列是本步序列的前缀）
+        self.engine_self = False  # 本步的 ICCS 是否在序列末尾
+        self.engine_moves = None  # 直接赋值的序列，优先于 engine_prev 链
+        self.engine_text = None  # to_engine_fen() 结果缓存
+
+
+def _extra_property(name, default, doc):
+    """生成存放在 `_MoveExtra` 中的走子属性；写入默认值时不分配附加结构。"""
+
+    def getter(self):
+        extra = self._extra
+        return default if extra is None else getattr(extra, name)
+
+    def setter(self, value):
+        extra = self._extra
+        if extra is None:
+            if value == default:
+                return
+            extra = self._extra = _MoveExtra()
+        setattr(extra, name, value)
+
+    return property(getter, setter, doc=doc)
+
+
 # -----------------------------------------------------#
 class Move:
-    """表示一步棋及其在走子树中的关系（含变招、注释等）。"""
+    """表示一步棋及其在走子树中的关系（含变招、注释等）。
+
+    走子前后的棋盘不随走子长期保存：挂到父走子之后，需要时由父走子的棋盘
+    重放得到，并放入一个有上限的快照缓存（`Move.snapshot_cache_size`）。
+    注释、评分、引擎局面等不常用字段放在按需分配的附加结构中，同一组兄弟
+    走子共享一个分支列表，单独的走子不分配分支列表。
+    """
+
+    __slots__ = (
+        "__weakref__",
+        "_base_board",
+        "_board_cache",
+        "_board_done_cache",
+        "_extra",
+        "_variations",
+        "captured",
+        "is_checking",
+        "is_checkmate",
+        "move_info",
+        "move_side",
+        "next_move",
+        "parent",
+        "pos_from",
+        "pos_to",
+        "step_index",
+        "variation_next",
+    )
+
+    # 同时缓存棋盘快照的走子数上限，0 表示每次都重新计算
+    snapshot_cache_size = 512
+
+    score = _extra_property("score", None, "走子评分")
 
     def __init__(
         self,
         move_info: "MoveInfo",
-        board_before,
-        board_after,
+        board_before=None,
+        board_after=None,
         is_checking=False,
         is_checkmate=False,
     ):
         """初始化一个走子对象。
 
-        基于 MoveInfo 创建走子记录，包含移动前后棋盘状态。
+        `board_before` 为走子前棋盘（独立副本），在走子挂到父走子之前作为
+        重放起点；`board_after` 可选，仅作为缓存使用。
         """
 
         self.move_info = move_info
@@ -1020,29 +1142,172 @@ class Move:
         self.is_checkmate = is_checkmate
         self.move_side = move_info.prev_move_side
         self.step_index = 0
-        self.score = None
-        self.annote = ""
         self.parent = None
         self.next_move = None
         self.variation_next = None
-        self.variations_all = [self]
-        self.move_list_for_engine = []
-        self.fen_for_engine = None
+        self._variations = None  # 兄弟走子列表，只有一个走子时为 None
+        self._extra = None
 
-        # 直接使用传入的棋盘实例
-        self._board_cache = board_before  # 移动前的棋盘
-        self._board_done_cache = board_after  # 移动后的棋盘
+        # 重放起点：没有父走子（或父节点为 Game）时保留走子前的棋盘
+        self._base_board = board_before
+        self._board_cache = None  # 走子前棋盘的缓存
+        self._board_done_cache = None  # 走子后棋盘的缓存
+        if board_after is not None:
+            self._board_done_cache = board_after
+            self._remember_snapshot()
 
         # 设置被吃棋子
         self.captured = move_info.captured_fench
 
+    @property
+    def variations_all(self):
+        """同组兄弟走子（含自身）列表，整组共享同一个列表对象。"""
+        if self._variations is None:
+            self._variations = [self]
+        return self._variations
+
+    @variations_all.setter
+    def variations_all(self, variations):
+        self._variations = variations
+
+    @property
+    def annote(self):
+        """走子注释，没有注释时为空字符串。"""
+        extra = self._extra
+        return "" if extra is None else extra.annote
+
+    @annote.setter
+    def annote(self, annote):
+        # 读谱时没有注释的走子会写入 None 或空串，此时不分配附加结构
+        annote = annote or ""
+        if self._extra is None:
+            if not annote:
+                return
+            self._extra = _MoveExtra()
+        self._extra.annote = annote
+
+    def _extra_fields(self):
+        """返回附加结构，不存在时分配。"""
+        if self._extra is None:
+            self._extra = _MoveExtra()
+        return self._extra
+
+    @property
+    def fen_for_engine(self):
+        """发送给引擎的基础 FEN。"""
+        extra = self._extra
+        return None if extra is None else extra.fen_for_engine
+
+    @fen_for_engine.setter
+    def fen_for_engine(self, fen):
+        if self._extra is None and fen is None:
+            return
+        extra = self._extra_fields()
+        extra.fen_for_engine = fen
+        extra.engine_text = None
+
+    @property
+    def move_list_for_engine(self):
+        """发送给引擎的 moves 列表（由引擎历史链生成的新列表）。"""
+        extra = self._extra
+        if extra is None:
+            return []
+        if extra.engine_moves is not None:
+            return extra.engine_moves
+
+        moves = []
+        move = self
+        while move is not None:
+            extra = move._extra
+            if extra.engine_moves is not None:
+                moves.extend(reversed(extra.engine_moves))
+                break
+            if extra.engine_self:
+                moves.append(move.to_iccs())
+            move = extra.engine_prev
+        moves.reverse()
+        return moves
+
+    @move_list_for_engine.setter
+    def move_list_for_engine(self, moves):
+        if self._extra is None and not moves:
+            return
+        extra = self._extra_fields()
+        extra.engine_moves = moves
+        extra.engine_prev = None
+        extra.engine_self = False
+        extra.engine_text = None
+
     def board_before(self):
-        """移动前的棋盘状态"""
-        return self._board_cache
+        """移动前的棋盘状态（按需由父走子重放得到，结果会被缓存）"""
+        # 缓存可能被其他线程随时清除，只读取一次
+        board = self._board_cache
+        if board is not None:
+            return board
+        board = self._base_board
+        if board is not None:
+            return board
+
+        board = self._replay_board_before()
+        self._board_cache = board
+        self._remember_snapshot()
+        return board
 
     def board_after(self):
-        """移动后的棋盘状态"""
-        return self._board_done_cache
+        """移动后的棋盘状态（走子方与移动前相同，结果会被缓存）"""
+        board = self._board_done_cache
+        if board is not None:
+            return board
+
+        board = self.board_before().copy()
+        board._move_piece(self.pos_from, self.pos_to)
+        self._board_done_cache = board
+        self._remember_snapshot()
+        return board
+
+    def _replay_board_before(self):
+        """沿父走子链找到最近的已知棋盘，再逐步重放得到走子前的棋盘。"""
+        pending = []
+        board = None
+        move = self.parent
+        while isinstance(move, Move):
+            board = move._board_done_cache
+            if board is not None:
+                break
+            pending.append(move)
+            board = move._board_cache
+            if board is None:
+                board = move._base_board
+            if board is not None:
+                break
+            move = move.parent
+
+        if board is None:
+            raise CChessError("无法还原走子前的棋盘：走子既没有父走子也没有初始棋盘")
+
+        board = board.copy()
+        for move in reversed(pending):
+            board._move_piece(move.pos_from, move.pos_to)
+        board.set_move_side(self.move_info.prev_move_side)
+        return board
+
+    def _remember_snapshot(self):
+        """登记当前走子的快照缓存，超出上限时清除最早登记的走子的缓存。"""
+        cache = _SNAPSHOT_CACHE
+        with _SNAPSHOT_LOCK:
+            cache[weakref.ref(self)] = None
+            while len(cache) > Move.snapshot_cache_size:
+                ref, _ = cache.popitem(last=False)
+                move = ref()
+                if move is not None:
+                    move._board_cache = None
+                    move._board_done_cache = None
+
+    def _attach_to(self, parent):
+        """设置父节点；父节点为走子时不再需要保留自己的重放起点。"""
+        self.parent = parent
+        if isinstance(parent, Move):
+            self._base_board = None
 
     # move_side 是数据属性，在构造函数中已赋值
 
@@ -1058,16 +1323,17 @@ class Move:
     def mirror(self):
         """水平镜像当前走子及其所有子节点（就地修改）。
 
-        将棋盘和坐标进行左右镜像，并对 `board_done`、所有分支和
-        `next_move` 链进行相同处理。该操作会修改当前 `Move` 实例
+        将坐标进行左右镜像，并对所有分支和 `next_move` 链进行相同处理；
+        走子前后的棋盘随后按新坐标重放。该操作会修改当前 `Move` 实例
         及其子节点。
         """
-        # 直接使用 board_before() 获取实例，避免延迟导入
-        mirrored_board = self.board_before().mirror()
-        self.move_info.board_before = mirrored_board._board
+        if self._base_board is not None:
+            self._base_board = self._base_board.mirror()
 
         self.pos_from = (8 - self.pos_from[0], self.pos_from[1])
         self.pos_to = (8 - self.pos_to[0], self.pos_to[1])
+        self.move_info.from_pos = self.pos_from
+        self.move_info.to_pos = self.pos_to
 
         self._clear_caches()
 
@@ -1080,16 +1346,17 @@ class Move:
     def flip(self):
         """垂直翻转当前走子及其所有子节点（就地修改）。
 
-        将棋盘和坐标进行上下翻转，并对 `board_done`、所有分支和
-        `next_move` 链进行相同处理。该操作会修改当前 `Move` 实例
+        将坐标进行上下翻转，并对所有分支和 `next_move` 链进行相同处理；
+        走子前后的棋盘随后按新坐标重放。该操作会修改当前 `Move` 实例
         及其子节点。
         """
-        # 直接使用 board_before() 获取实例，避免延迟导入
-        flipped_board = self.board_before().flip()
-        self.move_info.board_before = flipped_board._board
+        if self._base_board is not None:
+            self._base_board = self._base_board.flip()
 
         self.pos_from = (self.pos_from[0], 9 - self.pos_from[1])
         self.pos_to = (self.pos_to[0], 9 - self.pos_to[1])
+        self.move_info.from_pos = self.pos_from
+        self.move_info.to_pos = self.pos_to
 
         self._clear_caches()
 
@@ -1102,12 +1369,11 @@ class Move:
     def swap(self):
         """交换红黑视角（棋子交换阵营）并更新所有子节点（就地）。
 
-        对当前走子、`board_done` 及所有分支和 `next_move` 做视角
-        交换，使之从另一方视角表示。
+        对当前走子、所有分支和 `next_move` 做视角交换，使之从另一方
+        视角表示；走子前后的棋盘随后重放得到。
         """
-        # 直接使用 board_before() 获取实例，避免延迟导入
-        swapped_board = self.board_before().swap()
-        self.move_info.board_before = swapped_board._board
+        if self._base_board is not None:
+            self._base_board = self._base_board.swap()
 
         self.move_info.moving_fench = swap_fench(self.move_info.moving_fench)
         if self.move_info.captured_fench is not None:
@@ -1134,33 +1400,42 @@ class Move:
 
     def len_variations(self):
         """返回当前走子的分支（变招）数量。"""
-        return len(self.variations_all)
+        if self._variations is None:
+            return 1
+        return len(self._variations)
 
     def get_variations(self, include_me=False):
         """返回当前走子的所有分支（变招），可选择是否包含自身。"""
         if include_me:
             return self.variations_all
 
-        sibs = self.variations_all[:]
+        if self._variations is None:
+            return []
+
+        sibs = self._variations[:]
         sibs.remove(self)
 
         return sibs
 
     def last_variation(self):
         """返回最后一个分支（变招）走子。"""
-        return self.variations_all[-1]
+        if self._variations is None:
+            return self
+        return self._variations[-1]
 
     def get_variation_index(self):
         """返回当前走子在分支列表中的索引及分支总数。"""
-        sibling_count = len(self.variations_all)
-        for index, m in enumerate(self.variations_all):
+        if self._variations is None:
+            return (0, 1)
+        sibling_count = len(self._variations)
+        for index, m in enumerate(self._variations):
             if m == self:
                 return (index, sibling_count)
         return None
 
     def add_variation(self, chess_move):
         """将 `chess_move` 添加为当前走子的一个新分支（变招）。"""
-        chess_move.parent = self.parent
+        chess_move._attach_to(self.parent)
         chess_move.step_index = self.step_index
         last = self.last_variation()
 
@@ -1211,12 +1486,14 @@ class Move:
         设置 `chess_move.parent` 与 `step_index`。若当前无 `next_move`
         则作为线性后继；否则将其作为现有 `next_move` 的一个分支。
         """
-        chess_move.parent = self
+        chess_move._attach_to(self)
         chess_move.step_index = self.step_index + 1
         if not self.next_move:
             self.next_move = chess_move
         else:
-            self.next_move.variations_all.append(chess_move)
+            variations = self.next_move.variations_all
+            variations.append(chess_move)
+            chess_move.variations_all = variations
 
     def dump_moves(
         self, move_list, curr_move_line, is_tree_mode, curr_variation_index=0
@@ -1379,10 +1656,8 @@ class Move:
         self, fmt="chinese", traditional=False, use_fullwidth_for_black=True
     ):
         """返回带有变招标记的走子文本表示（多分支以方括号包裹）。"""
-        assert len(self.variations_all) > 0
-
         # 父节点只有一个孩子，那就是自己
-        if len(self.variations_all) == 1:
+        if self.len_variations() == 1:
             return self.to_text(
                 fmt=fmt,
                 traditional=traditional,
@@ -1404,44 +1679,85 @@ class Move:
         """为引擎查询准备 FEN 与 moves 列表。
 
         如果当前走子为吃子，则引擎的 FEN 应为走子后的局面；否则
-        根据历史拼接 moves 列表以便向引擎发送完整走子序列。
+        接在历史最后一步之后（只记录指向上一步的链接，不复制其序列），
+        整局逐步准备的耗时与内存均为线性。
         """
+        extra = self._extra_fields()
+        extra.engine_moves = None
+        extra.engine_text = None
         if self.captured:
             # 吃子移动：使用 board_before() 的副本生成走子后的 FEN
             temp_board = self.board_before().copy()
 
             # 应用移动
-            moving_fench = temp_board._board[self.pos_from[1]][self.pos_from[0]]
-            temp_board._board[self.pos_to[1]][self.pos_to[0]] = moving_fench
-            temp_board._board[self.pos_from[1]][self.pos_from[0]] = None
+            temp_board._move_piece(self.pos_from, self.pos_to)
             temp_board.set_move_side(move_side)
 
-            self.fen_for_engine = temp_board.to_fen()
-            self.move_list_for_engine = []
+            extra.fen_for_engine = temp_board.to_fen()
+            extra.engine_prev = None
+            extra.engine_self = False
         else:
             # 未吃子移动
+            extra.engine_self = True
             if not history:
                 # 历史为空
-                self.fen_for_engine = self.board_before().to_fen()
-                self.move_list_for_engine = [self.to_iccs()]
+                extra.fen_for_engine = self.board_before().to_fen()
+                extra.engine_prev = None
             else:
-                # 历史不为空，向后追加
+                # 历史不为空，接在最后一步之后
                 last_move = history[-1]
-                self.fen_for_engine = last_move.fen_for_engine
-                self.move_list_for_engine = last_move.move_list_for_engine[:]
-                self.move_list_for_engine.append(self.to_iccs())
+                extra.fen_for_engine = last_move.fen_for_engine
+                extra.engine_prev = last_move if last_move._extra is not None else None
 
     def to_engine_fen(self):
         """返回用于引擎的输入字符串：基础 FEN（可选加 moves）。
 
-        若 `move_list_for_engine` 为空，直接返回 `fen_for_engine`；
-        否则返回形如 '<fen> moves <m1> <m2> ...' 的字符串。
+        若 moves 列表为空，直接返回 `fen_for_engine`；否则返回形如
+        '<fen> moves <m1> <m2> ...' 的字符串。结果会被缓存，并尽量复用
+        历史中上一步已生成的字符串。
         """
-        if len(self.move_list_for_engine) == 0:
-            return self.fen_for_engine
+        extra = self._extra
+        if extra is None:
+            return None
+        if extra.engine_text is not None:
+            return extra.engine_text
+
+        # 沿历史链向前收集走法，遇到已缓存字符串的一步即停止
+        tail = []
+        prefix = None
+        prefix_has_moves = False
+        move = self
+        while move is not None:
+            move_extra = move._extra
+            if (
+                move is not self
+                and move_extra.engine_text is not None
+                and move_extra.fen_for_engine == extra.fen_for_engine
+            ):
+                prefix = move_extra.engine_text
+                prefix_has_moves = prefix != move_extra.fen_for_engine
+                break
+            if move_extra.engine_moves is not None:
+                tail.extend(reversed(move_extra.engine_moves))
+                break
+            if move_extra.engine_self:
+                tail.append(move.to_iccs())
+            move = move_extra.engine_prev
+        tail.reverse()
+
+        if prefix is None:
+            text = self.fen_for_engine
+            if tail:
+                text = " ".join([text, "moves", " ".join(tail)])
+        elif not tail:
+            text = prefix
+        elif prefix_has_moves:
+            text = " ".join([prefix] + tail)
+        else:
+            text = " ".join([prefix, "moves"] + tail)
 
-        move_str = " ".join(self.move_list_for_engine)
-        return " ".join([self.fen_for_engine, "moves", move_str])
+        extra.engine_text = text
+        return text
 
     def to_iccs(self):
         """返回此走子的 ICCS（引擎）走法字符串。
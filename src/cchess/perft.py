@@ -0,0 +1,77 @@
+"""Copyright (C) 2024  walker li <walker8088@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import time
+from typing import Callable, Optional, Tuple, Type
+
+from .board import ChessBoard
+from .common import FULL_INIT_FEN
+from .ttable import TranspositionTable
+
+# -----------------------------------------------------#
+# perft 参考局面：(名称, FEN, 深度 1 起的节点数)
+# 开局局面与常用象棋 perft 测试局面，节点数与公开结果一致
+PERFT_POSITIONS = (
+    ("startpos", FULL_INIT_FEN, (44, 1920, 79666, 3290240, 133312995)),
+    (
+        "middlegame",
+        "r1ba1a3/4kn3/2n1b4/pNp1p1p1p/4c4/6P2/P1P2R2P/1CcC5/9/2BAKAB2 w",
+        (38, 1128, 43929, 1339047),
+    ),
+    (
+        "knights",
+        "1cbak4/9/n2a5/2p1p3p/5cp2/2n2N3/6PCP/3AB4/2C6/3A1K1N1 w",
+        (7, 281, 8620, 326201),
+    ),
+    (
+        "rook_ending",
+        "5a3/3k5/3aR4/9/5r3/5n3/9/3A1A3/5K3/2BC2B2 w",
+        (25, 424, 9850, 202884),
+    ),
+    (
+        "checks",
+        "CRN1k1b2/3ca4/4ba3/9/2nr5/9/9/4B4/4A4/4KA3 w",
+        (28, 516, 14808, 395483),
+    ),
+)
+
+
+# -----------------------------------------------------#
+def run_perft(
+    fen: str,
+    depth: int,
+    divide: bool = False,
+    board_class: Type[ChessBoard] = ChessBoard,
+    output: Optional[Callable[[str], None]] = None,
+    hash_mb: float = 0,
+) -> Tuple[int, float]:
+    """对给定局面执行 perft，返回 (节点数, 耗时秒数)。
+
+    divide 为 True 时按第一步走法分别输出节点数（通过 output 回调）；
+    hash_mb 大于 0 时使用该大小的置换表缓存子树节点数。
+    """
+    board = board_class(fen)
+    table = TranspositionTable(hash_mb) if hash_mb > 0 else None
+    start = time.perf_counter()
+    if divide:
+        result = board.perft_divide(depth, table)
+        nodes = sum(result.values())
+        if output:
+            for iccs in sorted(result):
+                output(f"{iccs}: {result[iccs]}")
+    else:
+        nodes = board.perft(depth, table)
+    return nodes, time.perf_counter() - start
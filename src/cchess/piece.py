@@ -59,6 +59,106 @@ _KNIGHT_BLOCKS = (
 )
 
 
+# -----------------------------------------------------#
+# 预计算走法表：表[颜色][y][x] 或 表[y][x] 为该格出发的全部
+# (目标位置, 阻挡位置) 元组，阻挡位置为 None 表示不会被阻挡。
+# 只包含棋盘内且满足九宫、河界等位置规则的目标，生成走法时只需检查
+# 阻挡格是否为空以及目标格是否为己方棋子。
+def _build_table(targets_of):
+    """对棋盘上每个格子调用 targets_of(x, y)，生成 [y][x] 索引的走法表。"""
+    return tuple(tuple(tuple(targets_of(x, y)) for x in range(9)) for y in range(10))
+
+
+def _on_board(x, y):
+    return 0 <= x <= 8 and 0 <= y <= 9
+
+
+def _knight_targets(x, y):
+    for (dx, dy), (bx, by) in zip(_KNIGHT_OFFSETS, _KNIGHT_BLOCKS):
+        if _on_board(x + dx, y + dy):
+            yield ((x + dx, y + dy), (x + bx, y + by))
+
+
+def _bishop_targets(color):
+    def targets(x, y):
+        for dx in (2, -2):
+            for dy in (2, -2):
+                tx, ty = x + dx, y + dy
+                if not _on_board(tx, ty):
+                    continue
+                # 象不能过河
+                if (color == RED and ty > 4) or (color == BLACK and ty < 5):
+                    continue
+                yield ((tx, ty), (x + dx // 2, y + dy // 2))
+
+    return targets
+
+
+def _advisor_targets(color):
+    def targets(x, y):
+        for dx in (1, -1):
+            for dy in (1, -1):
+                if (x + dx, y + dy) in _advisor_pos[color]:
+                    yield ((x + dx, y + dy), None)
+
+    return targets
+
+
+def _king_targets(color):
+    palace_y = ((), (0, 1, 2), (7, 8, 9))[color]
+
+    def targets(x, y):
+        for dx, dy in _SLIDING_DIRECTIONS:
+            tx, ty = x + dx, y + dy
+            if 3 <= tx <= 5 and ty in palace_y:
+                yield ((tx, ty), None)
+
+    return targets
+
+
+def _pawn_targets(color):
+    forward = 1 if color == RED else -1
+
+    def targets(x, y):
+        if _on_board(x, y + forward):
+            yield ((x, y + forward), None)
+        # 过河后可左右移动
+        if (color == RED and y > 4) or (color == BLACK and y < 5):
+            for tx in (x - 1, x + 1):
+                if _on_board(tx, y):
+                    yield ((tx, y), None)
+
+    return targets
+
+
+_KNIGHT_TABLE = _build_table(_knight_targets)
+_BISHOP_TABLE = ((),) + tuple(_build_table(_bishop_targets(c)) for c in (RED, BLACK))
+_ADVISOR_TABLE = ((),) + tuple(_build_table(_advisor_targets(c)) for c in (RED, BLACK))
+_KING_TABLE = ((),) + tuple(_build_table(_king_targets(c)) for c in (RED, BLACK))
+_PAWN_TABLE = ((),) + tuple(_build_table(_pawn_targets(c)) for c in (RED, BLACK))
+
+
+def _reverse_table(table):
+    """把 [y][x] 走法表反转为 [y][x] -> ((出发位置, 阻挡位置), ...)，用于反查攻击者。"""
+    sources = [[[] for _ in range(9)] for _ in range(10)]
+    for y in range(10):
+        for x in range(9):
+            for (tx, ty), block in table[y][x]:
+                sources[ty][tx].append(((x, y), block))
+    return tuple(tuple(tuple(cell) for cell in row) for row in sources)
+
+
+# 反向走法表：_ATTACK_FROM_TABLE[种类][颜色][y][x] 为能走到 (x, y) 的该颜色棋子
+# 所在位置及其马腿/象眼。车、炮沿直线反向扫描，不在此表中。
+_ATTACK_FROM_TABLE = {
+    "n": ((),) + (_reverse_table(_KNIGHT_TABLE),) * 2,
+    "b": ((),) + tuple(_reverse_table(_BISHOP_TABLE[c]) for c in (RED, BLACK)),
+    "a": ((),) + tuple(_reverse_table(_ADVISOR_TABLE[c]) for c in (RED, BLACK)),
+    "k": ((),) + tuple(_reverse_table(_KING_TABLE[c]) for c in (RED, BLACK)),
+    "p": ((),) + tuple(_reverse_table(_PAWN_TABLE[c]) for c in (RED, BLACK)),
+}
+
+
 # -----------------------------------------------------#
 def abs_diff(x, y):
     """返回两点坐标在各维度上的绝对差值元组。"""
@@ -112,29 +212,52 @@ class Piece:
             target_fench.islower() and self.color == RED
         )
 
-    def _create_moves_from_offsets(self, offsets):
-        """从偏移量列表生成候选走子。
+    def create_moves(self, captures=None):
+        """生成该棋子的走法（基类没有走法，返回空列表）。
+
+        captures 为 True 时只生成吃子，为 False 时只生成不吃子，None 生成全部。
+        """
+        return []
+
+    def create_captures(self):
+        """生成该棋子的吃子走法（目标格为敌方棋子）。"""
+        return self.create_moves(True)
+
+    def create_quiet_moves(self):
+        """生成该棋子的不吃子走法（目标格为空）。"""
+        return self.create_moves(False)
+
+    def _create_moves_from_table(self, table, captures=None):
+        """按预计算走法表生成走法：阻挡格须为空，目标格不能是己方棋子。
 
         参数:
-            offsets: 相对当前位置的偏移量列表，如 [(1, 1), (-1, -1)]
+            table: [y][x] 索引的走法表，元素为 (目标位置, 阻挡位置或 None)
+            captures: None 生成全部走法，True 只生成吃子，False 只生成不吃子
 
         返回:
-            过滤后的合法走子迭代器
+            走子列表
         """
         curr_pos = (self.x, self.y)
-        # 内联边界检查：0 <= x <= 8, 0 <= y <= 9
+        board = self.board._board
+        own = str.isupper if self.color == RED else str.islower
         moves = []
-        for dx, dy in offsets:
-            nx, ny = self.x + dx, self.y + dy
-            if 0 <= nx <= 8 and 0 <= ny <= 9:
-                moves.append((curr_pos, (nx, ny)))
-        return filter(self.board.is_valid_move_t, moves)
+        for to_pos, block in table[self.y][self.x]:
+            if block is not None and board[block[1]][block[0]] is not None:
+                continue
+            target = board[to_pos[1]][to_pos[0]]
+            if target is None:
+                if not captures:
+                    moves.append((curr_pos, to_pos))
+            elif captures is not False and not own(target):
+                moves.append((curr_pos, to_pos))
+        return moves
 
-    def _create_sliding_moves(self, directions):
+    def _create_sliding_moves(self, directions, captures=None):
         """生成滑走棋子（车/炮不吃子时）的走法，沿方向扫描直到遇到棋子或边界。
 
         参数:
             directions: 方向列表，如 [(0,1), (0,-1), (1,0), (-1,0)]
+            captures: None 生成全部走法，True 只生成吃子，False 只生成不吃子
 
         返回:
             合法走子列表
@@ -142,6 +265,7 @@ class Piece:
         moves = []
         curr_x, curr_y = self.x, self.y
         board = self.board._board
+        quiet = not captures
 
         for dx, dy in directions:
             x, y = curr_x + dx, curr_y + dy
@@ -151,9 +275,10 @@ class Piece:
                 target = board[y][x]
 
                 if target is None:
-                    moves.append(((curr_x, curr_y), (x, y)))
+                    if quiet:
+                        moves.append(((curr_x, curr_y), (x, y)))
                 else:
-                    if self.is_enemy_piece(target):
+                    if captures is not False and self.is_enemy_piece(target):
                         moves.append(((curr_x, curr_y), (x, y)))
                     break
 
@@ -224,25 +349,23 @@ class King(Piece):
 
         return (diff[0] + diff[1]) == 1
 
-    def create_moves(self):
-        """生成将/帅所有可能的合法走子。"""
-        positions = [
-            (self.x + 1, self.y),
-            (self.x - 1, self.y),
-            (self.x, self.y + 1),
-            (self.x, self.y - 1),
-        ]
+    def create_moves(self, captures=None):
+        """生成将/帅所有可能的合法走子（九宫内一步，以及白脸将吃将）。
 
-        k2 = self.board.get_king(next_color(self.color))
-        if k2 is not None:
-            positions.append((k2.x, k2.y))
+        captures 为 True 时只生成吃子，为 False 时只生成不吃子。
+        """
+        moves = self._create_moves_from_table(_KING_TABLE[self.color], captures)
+        if captures is False:
+            return moves
 
-        curr_pos = (self.x, self.y)
-        return (
-            (curr_pos, to_pos)
-            for to_pos in positions
-            if self.board.is_valid_move_t((curr_pos, to_pos))
-        )
+        k2 = self.board.get_king(next_color(self.color))
+        if (
+            k2 is not None
+            and k2.x == self.x
+            and self.board.count_y_line_in(self.x, self.y, k2.y) == 0
+        ):
+            moves.append(((self.x, self.y), (k2.x, k2.y)))
+        return moves
 
 
 # -----------------------------------------------------#
@@ -268,9 +391,9 @@ class Advisor(Piece):
 
         return False
 
-    def create_moves(self):
+    def create_moves(self, captures=None):
         """生成士/仕所有可能的合法走子。"""
-        return self._create_moves_from_offsets([(1, 1), (1, -1), (-1, 1), (-1, -1)])
+        return self._create_moves_from_table(_ADVISOR_TABLE[self.color], captures)
 
 
 # -----------------------------------------------------#
@@ -302,9 +425,9 @@ class Bishop(Piece):
 
         return True
 
-    def create_moves(self):
-        """生成象/相所有可能的合法走子。"""
-        return self._create_moves_from_offsets([(2, 2), (2, -2), (-2, 2), (-2, -2)])
+    def create_moves(self, captures=None):
+        """生成象/相所有可能的合法走子（含塞象眼和过河检查）。"""
+        return self._create_moves_from_table(_BISHOP_TABLE[self.color], captures)
 
 
 # -----------------------------------------------------#
@@ -331,41 +454,9 @@ class Knight(Piece):
 
         return False
 
-    def create_moves(self):
-        """生成马所有可能的合法走子。
-
-        使用预计算的偏移量，减少运行时计算。
-        """
-
-        curr_pos = (self.x, self.y)
-        board = self.board._board  # 直接访问棋盘数组
-        moves = []
-
-        for i, (dx, dy) in enumerate(_KNIGHT_OFFSETS):
-            nx, ny = self.x + dx, self.y + dy
-
-            # 快速边界检查
-            if not (0 <= nx <= 8 and 0 <= ny <= 9):
-                continue
-
-            # 检查蹩马腿
-            bx, by = self.x + _KNIGHT_BLOCKS[i][0], self.y + _KNIGHT_BLOCKS[i][1]
-            if board[by][bx] is not None:
-                continue
-
-            # 检查目标位置
-            target_fench = board[ny][nx]
-            if target_fench is not None:
-                # 快速颜色判断：大写=红方，小写=黑方
-                is_red = target_fench.isupper()
-                if (is_red and self.color == RED) or (
-                    not is_red and self.color == BLACK
-                ):
-                    continue
-
-            moves.append((curr_pos, (nx, ny)))
-
-        return moves
+    def create_moves(self, captures=None):
+        """生成马所有可能的合法走子（含蹩马腿检查）。"""
+        return self._create_moves_from_table(_KNIGHT_TABLE, captures)
 
 
 # -----------------------------------------------------#
@@ -386,9 +477,9 @@ class Rook(Piece):
             return self.board.count_x_line_in(self.y, self.x, pos_to[0]) == 0
         return self.board.count_y_line_in(self.x, self.y, pos_to[1]) == 0
 
-    def create_moves(self):
+    def create_moves(self, captures=None):
         """生成车所有可能的合法走子。"""
-        return self._create_sliding_moves(_SLIDING_DIRECTIONS)
+        return self._create_sliding_moves(_SLIDING_DIRECTIONS, captures)
 
 
 # -----------------------------------------------------#
@@ -420,15 +511,19 @@ class Cannon(Piece):
 
         return False
 
-    def create_moves(self):
+    def create_moves(self, captures=None):
         """生成炮所有可能的合法走子。
 
         炮的走法规则：
         1. 不吃子时：沿直线行走，不能越子（同车）
         2. 吃子时：必须隔一个棋子（炮架）才能吃
+
+        captures 为 True 时只生成吃子（跳过炮架前的空格），为 False 时
+        只生成不吃子（遇到炮架即停止）。
         """
         moves = []
         curr_x, curr_y = self.x, self.y
+        quiet = not captures
 
         for dx, dy in _SLIDING_DIRECTIONS:
             x, y = curr_x + dx, curr_y + dy
@@ -441,7 +536,10 @@ class Cannon(Piece):
                     # 寻找炮架阶段
                     if target is None:
                         # 空位，可以移动
-                        moves.append(((curr_x, curr_y), (x, y)))
+                        if quiet:
+                            moves.append(((curr_x, curr_y), (x, y)))
+                    elif captures is False:
+                        break
                     else:
                         # 遇到第一个棋子，作为炮架
                         screen_found = True
@@ -506,25 +604,6 @@ class Pawn(Piece):
 
         return False
 
-    def create_moves(self):
-        """生成兵/卒所有可能的合法走子。"""
-        curr_pos = (self.x, self.y)
-        moves = []
-        # 前进方向：红方+1，黑方-1
-        dy = 1 if self.color == RED else -1
-        forward = (self.x, self.y + dy)
-        # 快速边界检查（y 范围 0-9）
-        if 0 <= forward[1] <= 9:
-            moves.append((curr_pos, forward))
-
-        # 过河后可左右移动：红方 y>=5，黑方 y<=4
-        crossed = (self.y >= 5) if self.color == RED else (self.y <= 4)
-        if crossed:
-            # 左右移动，x 范围 0-8
-            lx, rx = self.x - 1, self.x + 1
-            if lx >= 0:
-                moves.append((curr_pos, (lx, self.y)))
-            if rx <= 8:
-                moves.append((curr_pos, (rx, self.y)))
-
-        return filter(self.board.is_valid_move_t, moves)
+    def create_moves(self, captures=None):
+        """生成兵/卒所有可能的合法走子（过河后可左右移动）。"""
+        return self._create_moves_from_table(_PAWN_TABLE[self.color], captures)
@@ -0,0 +1,429 @@
+"""Copyright (C) 2024  walker li <walker8088@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import time
+from typing import Callable, Dict, List, Optional
+
+from .board import ChessBoard
+from .common import BLACK, pack_move, pos2iccs, unpack_move
+from .ttable import EXACT, LOWER, UPPER, TranspositionTable
+
+# -----------------------------------------------------#
+# 评分常量（与 engine 中的将杀评分一致）
+MATE_SCORE = 30000
+# 超过该值的评分视为将杀评分
+MATE_BOUND = MATE_SCORE - 1000
+INFINITE = MATE_SCORE + 1
+
+# 子力价值（按 fench 小写）
+PIECE_VALUES = {
+    "k": 0,
+    "a": 120,
+    "b": 120,
+    "n": 270,
+    "r": 600,
+    "c": 285,
+    "p": 30,
+}
+# 过河兵额外加分，越靠近九宫越高（按已过河的步数索引）
+_PAWN_CROSSED_BONUS = (40, 50, 60, 70, 50)
+
+# MVV-LVA 排序用的攻击子价值，吃同一子时价值低的攻击子优先
+_ATTACKER_ORDER = {"p": 1, "a": 2, "b": 2, "n": 3, "c": 3, "r": 4, "k": 5}
+
+# 参与评估的全部棋子字符（红方大写、黑方小写）
+_EVAL_FENCHS = "KABNRCPkabnrcp"
+
+_MAX_PLY = 64
+# 静态搜索中只在前几层对被将军的局面展开全部应将走法
+_QUIESCE_CHECK_PLIES = 4
+
+
+class _SearchAbort(Exception):
+    """搜索超出时间或节点预算时内部抛出，用于退出递归。"""
+
+
+# -----------------------------------------------------#
+def evaluate(board: ChessBoard) -> int:
+    """静态评估：子力价值加过河兵加分，返回走子方视角的分数。"""
+    score = 0
+    count_fench = board.count_fench
+    for fench in _EVAL_FENCHS:
+        count = count_fench(fench)
+        if not count:
+            continue
+        species = fench.lower()
+        value = PIECE_VALUES[species] * count
+        if species == "p":
+            for _x, y in board.get_fench_positions(fench):
+                crossed = y - 5 if fench == "P" else 4 - y
+                if crossed >= 0:
+                    value += _PAWN_CROSSED_BONUS[min(crossed, 4)]
+        score += value if fench.isupper() else -value
+    return score if board.move_side() != BLACK else -score
+
+
+# -----------------------------------------------------#
+class Searcher:
+    """进程内的 alpha-beta 搜索器，用于浅层战术分析，不需要外部引擎。
+
+    迭代加深 + alpha-beta（PVS），固定大小的 Zobrist 置换表（`TranspositionTable`），
+    走法按置换表走法、MVV-LVA 吃子、杀手走法排序，叶子节点做吃子静态搜索。
+    `run_engine()` 返回与 `EngineManager.run_engine()` 相同结构的动作字典。
+    """
+
+    def __init__(
+        self,
+        go_params: Optional[Dict] = None,
+        hash_mb: float = 16,
+        table: Optional[TranspositionTable] = None,
+    ):
+        """初始化搜索器。
+
+        参数:
+            go_params: 默认搜索预算，键为 depth/movetime(毫秒)/nodes
+            hash_mb: 置换表大小（MB），传入 table 时忽略
+            table: 共享的置换表，默认新建一个
+        """
+        self.go_params = go_params if go_params is not None else {"depth": 4}
+        self.table = table if table is not None else TranspositionTable(hash_mb)
+        self._killers: List[List] = [[None, None] for _ in range(_MAX_PLY)]
+        self._pv: List[List] = [[] for _ in range(_MAX_PLY + 1)]
+        self.nodes = 0
+        self.seldepth = 0
+        self._deadline = None
+        self._node_limit = None
+        self._stopped = False
+
+    def clear(self) -> None:
+        """清空置换表与杀手走法。"""
+        self.table.clear()
+        self._killers = [[None, None] for _ in range(_MAX_PLY)]
+
+    def stop(self) -> None:
+        """请求停止当前搜索（可从其他线程调用），返回已完成的最深一层的结果。"""
+        self._stopped = True
+
+    # -------------------------------------------------#
+    def run_engine(
+        self, fen: str, on_info: Optional[Callable[[Dict], None]] = None
+    ) -> Dict:
+        """按 `go_params` 搜索给定 FEN，返回最终动作字典。"""
+        return self.search(fen, on_info=on_info, **self.go_params)
+
+    def search(
+        self,
+        fen: str,
+        depth: Optional[int] = None,
+        movetime: Optional[int] = None,
+        nodes: Optional[int] = None,
+        on_info: Optional[Callable[[Dict], None]] = None,
+    ) -> Dict:
+        """迭代加深搜索，返回与 `EngineManager.run_engine()` 同结构的动作字典。
+
+        参数:
+            fen: 局面 FEN
+            depth: 最大深度；与 movetime/nodes 都未给出时默认 4
+            movetime: 时间预算（毫秒）
+            nodes: 节点数预算
+            on_info: 每完成一层时以 "info_move" 动作字典回调
+
+        返回:
+            {"action": "bestmove", "move", "ponder", "score", "depth", ...}；
+            无合法走法时返回 {"action": "dead", "score", "mate": 0, ...}。
+            与 `run_engine()` 一致，score/mate 取走子后一方的视角（搜索分数取负）。
+        """
+        board = ChessBoard(fen)
+        if depth is None:
+            depth = _MAX_PLY if (movetime or nodes) else 4
+        depth = min(depth, _MAX_PLY - 1)
+
+        start = time.perf_counter()
+        self._deadline = start + movetime / 1000.0 if movetime else None
+        self._node_limit = nodes
+        self._stopped = False
+        self.nodes = 0
+        self.seldepth = 0
+        self._killers = [[None, None] for _ in range(_MAX_PLY)]
+        self.table.new_search()
+
+        root_moves = list(board.legal_moves())
+        if not root_moves:
+            return {
+                "fen_engine": fen,
+                "raw_msg": "nobestmove",
+                "action": "dead",
+                "score": MATE_SCORE,
+                "mate": 0,
+            }
+
+        best = None
+        for curr_depth in range(1, depth + 1):
+            try:
+                score = self._search_root(board, root_moves, curr_depth)
+            except _SearchAbort:
+                break
+            pv = [pos2iccs(*m) for m in self._pv[0]]
+            best = self._make_info(fen, curr_depth, score, pv, start)
+            if on_info is not None:
+                on_info(dict(best))
+            # 已找到将杀时不再加深
+            if abs(score) >= MATE_BOUND:
+                break
+
+        if best is None:
+            # 第一层都未完成：退回到排序后的第一个合法走法
+            best = self._make_info(fen, 0, 0, [pos2iccs(*root_moves[0])], start)
+
+        return self._make_bestmove(best)
+
+    # -------------------------------------------------#
+    def _make_info(self, fen, depth, score, pv, start) -> Dict:
+        """构造一层搜索结束时的 info_move 动作字典（搜索分数为走子方视角）。"""
+        elapsed = int((time.perf_counter() - start) * 1000)
+        info = {
+            "fen_engine": fen,
+            "action": "info_move",
+            "depth": depth,
+            "seldepth": self.seldepth,
+            "score": score,
+            "nodes": self.nodes,
+            "time": elapsed,
+            "moves": pv,
+        }
+        if abs(score) >= MATE_BOUND:
+            plies = MATE_SCORE - abs(score)
+            info["mate"] = (plies + 1) // 2 if score > 0 else -((plies + 1) // 2)
+        info["raw_msg"] = (
+            f"info depth {depth} seldepth {self.seldepth} score {score} "
+            f"nodes {self.nodes} time {elapsed} pv {' '.join(pv)}"
+        )
+        return info
+
+    @staticmethod
+    def _make_bestmove(info: Dict) -> Dict:
+        """把最后一层的 info 转为 bestmove 动作，评分按 run_engine 的约定取负。"""
+        action = dict(info)
+        pv = action["moves"]
+        action["action"] = "bestmove"
+        action["move"] = pv[0]
+        raw_msg = f"bestmove {pv[0]}"
+        if len(pv) > 1:
+            action["ponder"] = pv[1]
+            raw_msg += f" ponder {pv[1]}"
+        action["raw_msg"] = raw_msg
+        for key in ["score", "mate"]:
+            if key in action:
+                action[key] = -action[key]
+        return action
+
+    def _check_budget(self) -> None:
+        """每 1024 个节点检查一次时间、节点预算与停止请求。"""
+        if self._stopped:
+            raise _SearchAbort()
+        if self._node_limit is not None and self.nodes >= self._node_limit:
+            raise _SearchAbort()
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            raise _SearchAbort()
+
+    # -------------------------------------------------#
+    # -------------------------------------------------#
+    def _order_moves(self, board: ChessBoard, moves, tt_move, ply: int):
+        """按 置换表走法 > 吃子(MVV-LVA) > 杀手走法 > 其他 排序。"""
+        get_fench = board.get_fench
+        killers = self._killers[ply]
+
+        def move_key(move):
+            if move == tt_move:
+                return -100000
+            pos_from, pos_to = move
+            victim = get_fench(pos_to)
+            if victim:
+                return -(
+                    PIECE_VALUES[victim.lower()] * 10
+                    - _ATTACKER_ORDER[get_fench(pos_from).lower()]
+                    + 10000
+                )
+            if move == killers[0]:
+                return -5000
+            if move == killers[1]:
+                return -4000
+            return 0
+
+        moves.sort(key=move_key)
+        return moves
+
+    def _search_root(self, board: ChessBoard, root_moves, depth: int) -> int:
+        """搜索根节点，把最佳走法移到 root_moves 首位（供下一层优先搜索）。"""
+        alpha, beta = -INFINITE, INFINITE
+        best_move = None
+        for index, move in enumerate(root_moves):
+            board.push(*move)
+            if index == 0:
+                score = -self._alpha_beta(board, depth - 1, -beta, -alpha, 1)
+            else:
+                score = -self._alpha_beta(board, depth - 1, -alpha - 1, -alpha, 1)
+                if alpha < score < beta:
+                    score = -self._alpha_beta(board, depth - 1, -beta, -alpha, 1)
+            board.pop()
+            if score > alpha:
+                alpha = score
+                best_move = move
+                self._pv[0] = [move] + self._pv[1]
+        root_moves.remove(best_move)
+        root_moves.insert(0, best_move)
+        self.table.store(board.zhash(), depth, EXACT, alpha, pack_move(*best_move))
+        return alpha
+
+    def _alpha_beta(
+        self, board: ChessBoard, depth: int, alpha: int, beta: int, ply: int
+    ) -> int:
+        """负极大值形式的 alpha-beta（PVS）搜索，返回走子方视角的分数。"""
+        self._pv[ply] = []
+        if depth <= 0:
+            return self._quiesce(board, alpha, beta, ply, 0)
+
+        self.nodes += 1
+        if self.nodes & 1023 == 0:
+            self._check_budget()
+
+        # 路径上的重复局面按和棋处理
+        if board.repetition_count() > 1:
+            return 0
+
+        key = board.zhash()
+        tt_score, tt_move = self._probe(key, depth, alpha, beta, ply)
+        if tt_score is not None:
+            return tt_score
+
+        moves = list(board.legal_moves())
+        if not moves:
+            # 象棋中无子可走即判负（含困毙）
+            return -MATE_SCORE + ply
+
+        self._order_moves(board, moves, tt_move, ply)
+        alpha_orig = alpha
+        best_score = -INFINITE
+        best_move = None
+        for index, move in enumerate(moves):
+            board.push(*move)
+            if index == 0:
+                score = -self._alpha_beta(board, depth - 1, -beta, -alpha, ply + 1)
+            else:
+                score = -self._alpha_beta(board, depth - 1, -alpha - 1, -alpha, ply + 1)
+                if alpha < score < beta:
+                    score = -self._alpha_beta(board, depth - 1, -beta, -alpha, ply + 1)
+            move_info = board.pop()
+
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    self._pv[ply] = [move] + self._pv[ply + 1]
+                    if alpha >= beta:
+                        if move_info.captured_fench is None:
+                            self._add_killer(ply, move)
+                        break
+
+        if best_score >= beta:
+            flag = LOWER
+        elif best_score > alpha_orig:
+            flag = EXACT
+        else:
+            flag = UPPER
+        self._store(key, depth, flag, best_score, best_move, ply)
+        return best_score
+
+    def _probe(self, key: int, depth: int, alpha: int, beta: int, ply: int):
+        """查询置换表，返回 (可直接返回的分数或 None, 表中的最佳走法或 None)。"""
+        entry = self.table.probe(key)
+        if entry is None:
+            return None, None
+        tt_depth, flag, tt_score, packed = entry
+        tt_move = unpack_move(packed) if packed else None
+        if tt_depth < depth:
+            return None, tt_move
+        # 将杀分数在表中按“距当前节点”的步数保存
+        if tt_score >= MATE_BOUND:
+            tt_score -= ply
+        elif tt_score <= -MATE_BOUND:
+            tt_score += ply
+        if (
+            flag == EXACT
+            or (flag == LOWER and tt_score >= beta)
+            or (flag == UPPER and tt_score <= alpha)
+        ):
+            return tt_score, tt_move
+        return None, tt_move
+
+    def _store(
+        self, key: int, depth: int, flag: int, score: int, move, ply: int
+    ) -> None:
+        """把节点的搜索结果存入置换表（将杀分数换算为距当前节点的步数）。"""
+        if score >= MATE_BOUND:
+            score += ply
+        elif score <= -MATE_BOUND:
+            score -= ply
+        self.table.store(key, depth, flag, score, pack_move(*move))
+
+    def _add_killer(self, ply: int, move) -> None:
+        """记录在 ply 层产生截断的不吃子走法，供同层其他节点优先尝试。"""
+        if ply >= _MAX_PLY:
+            return
+        killers = self._killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+
+    def _quiesce(
+        self, board: ChessBoard, alpha: int, beta: int, ply: int, qply: int
+    ) -> int:
+        """静态搜索：只搜索吃子（前几层被将军时搜索全部应将），直到局面平静。"""
+        self.nodes += 1
+        if self.nodes & 1023 == 0:
+            self._check_budget()
+        self.seldepth = max(self.seldepth, ply)
+
+        color = board.move_side()
+        if qply < _QUIESCE_CHECK_PLIES and board.is_king_attacked(color):
+            # 被将军：展开全部应将走法，无路可走即被将死
+            moves = list(board.legal_moves())
+            if not moves:
+                return -MATE_SCORE + ply
+            if ply >= _MAX_PLY:
+                return evaluate(board)
+            self._order_moves(board, moves, None, ply)
+        else:
+            stand_pat = evaluate(board)
+            if stand_pat >= beta or ply >= _MAX_PLY:
+                return stand_pat
+            alpha = max(alpha, stand_pat)
+            # 静态交换评估为负的吃子不搜索
+            moves = [m for m in board.create_captures(sort=True) if board.see(m) >= 0]
+
+        for move in moves:
+            board.push(*move)
+            if board.is_king_attacked(color):
+                # 吃子候选走法走后己方被将军，不合法
+                board.pop()
+                continue
+            score = -self._quiesce(board, -beta, -alpha, ply + 1, qply + 1)
+            board.pop()
+            if score >= beta:
+                return score
+            alpha = max(alpha, score)
+        return alpha
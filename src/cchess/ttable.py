@@ -0,0 +1,166 @@
+"""Copyright (C) 2024  walker li <walker8088@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from array import array
+from typing import Dict, Optional, Tuple
+
+# -----------------------------------------------------#
+# 节点类型：精确值、下界（fail-high）、上界（fail-low）
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# 每项占用的字节数：8 字节键 + 8 字节打包数据
+ENTRY_BYTES = 16
+
+# 打包数据布局（64 位）：
+#   0-13  最佳走法（紧凑整数编码 from_sq | to_sq << 7，0 表示无）
+#   14-21 深度（0..255）
+#   22-23 节点类型
+#   24-31 写入时的搜索代数（age）
+#   32-63 数值（带符号 32 位，偏移 2**31 保存），可存评分或 perft 节点数
+_MOVE_MASK = (1 << 14) - 1
+_DEPTH_SHIFT = 14
+_BOUND_SHIFT = 22
+_AGE_SHIFT = 24
+_VALUE_SHIFT = 32
+_VALUE_OFFSET = 1 << 31
+
+
+# -----------------------------------------------------#
+class TranspositionTable:
+    """以 `zhash()` 为键、大小固定的局面缓存（置换表）。
+
+    键与打包后的数据分别存放在预分配的 array 中，不随局面数增长。
+    每两项组成一个桶：命中同一局面时原地更新，否则优先替换旧代数或
+    深度不更深的一项，再退而替换桶中的第二项。可用于搜索、perft 计数缓存
+    以及批量分析时的局面去重。
+    """
+
+    def __init__(self, size_mb: float = 16):
+        """按内存大小（MB）分配表，项数向下取整为 2 的幂（至少 2 项）。"""
+        count = max(2, int(size_mb * 1024 * 1024) // ENTRY_BYTES)
+        count = 1 << (count.bit_length() - 1)
+        self._mask = (count - 1) & ~1
+        self._keys = array("q", bytes(8 * count))
+        self._data = array("Q", bytes(8 * count))
+        self._age = 0
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.stores = 0
+
+    def __len__(self) -> int:
+        """返回表的总项数（容量）。"""
+        return len(self._keys)
+
+    @property
+    def size_mb(self) -> float:
+        """实际占用的内存大小（MB）。"""
+        return len(self._keys) * ENTRY_BYTES / (1024 * 1024)
+
+    def clear(self) -> None:
+        """清空所有项与统计计数。"""
+        count = len(self._keys)
+        self._keys = array("q", bytes(8 * count))
+        self._data = array("Q", bytes(8 * count))
+        self._age = 0
+        self.hits = self.misses = self.collisions = self.stores = 0
+
+    def new_search(self) -> None:
+        """开始新一次搜索：代数加一，旧代数的项在替换时优先被覆盖。"""
+        self._age = (self._age + 1) & 0xFF
+
+    # -------------------------------------------------#
+    def probe(self, key: int) -> Optional[Tuple[int, int, int, int]]:
+        """查询局面，命中返回 (深度, 节点类型, 数值, 走法)，否则返回 None。
+
+        走法为紧凑整数编码（见 `cchess.common.unpack_move`），0 表示没有记录。
+        """
+        index = key & self._mask
+        keys = self._keys
+        data = self._data
+        for slot in (index, index + 1):
+            if keys[slot] == key and data[slot]:
+                self.hits += 1
+                packed = data[slot]
+                return (
+                    (packed >> _DEPTH_SHIFT) & 0xFF,
+                    (packed >> _BOUND_SHIFT) & 0x3,
+                    (packed >> _VALUE_SHIFT) - _VALUE_OFFSET,
+                    packed & _MOVE_MASK,
+                )
+        if data[index] or data[index + 1]:
+            # 桶中存有其他局面
+            self.collisions += 1
+        self.misses += 1
+        return None
+
+    def store(
+        self, key: int, depth: int, bound: int, value: int, move: int = 0
+    ) -> None:
+        """写入一项。
+
+        参数:
+            key: 局面哈希（`ChessBoard.zhash()`）
+            depth: 剩余深度（0..255）
+            bound: EXACT/LOWER/UPPER
+            value: 评分或计数（带符号 32 位）
+            move: 紧凑整数编码的最佳走法，0 表示无
+        """
+        index = key & self._mask
+        keys = self._keys
+        data = self._data
+        age = self._age
+
+        if keys[index + 1] == key and data[index + 1]:
+            slot = index + 1
+        elif keys[index] == key or not data[index]:
+            slot = index
+        else:
+            old = data[index]
+            old_age = (old >> _AGE_SHIFT) & 0xFF
+            old_depth = (old >> _DEPTH_SHIFT) & 0xFF
+            # 第一项按深度/代数替换，否则写入第二项（总是替换）
+            slot = index if old_age != age or depth >= old_depth else index + 1
+
+        if keys[slot] == key and data[slot] and not move:
+            # 同一局面没有新走法时保留原来的走法
+            move = data[slot] & _MOVE_MASK
+
+        keys[slot] = key
+        data[slot] = (
+            (move & _MOVE_MASK)
+            | min(max(depth, 0), 0xFF) << _DEPTH_SHIFT
+            | (bound & 0x3) << _BOUND_SHIFT
+            | age << _AGE_SHIFT
+            | (value + _VALUE_OFFSET) << _VALUE_SHIFT
+        )
+        self.stores += 1
+
+    def hashfull(self) -> int:
+        """估算表的占用率（千分比），与 UCI 的 hashfull 含义相同。"""
+        sample = min(len(self._data), 1000)
+        used = sum(1 for i in range(sample) if self._data[i])
+        return used * 1000 // sample
+
+    def stats(self) -> Dict[str, int]:
+        """返回命中、未命中、冲突与写入次数。"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "collisions": self.collisions,
+            "stores": self.stores,
+            "hashfull": self.hashfull(),
+        }
@@ -5,13 +5,17 @@ CChess 性能基准测试套件
 提供可重复的性能测试，自动检测性能回归。
 """
 
+import gc
+import os
 import statistics
 import time
+import tracemalloc
 from dataclasses import dataclass
 from typing import Dict, List, Optional
 
-from cchess import BLACK, FULL_INIT_FEN, RED, ChessBoard
+from cchess import BLACK, FULL_INIT_FEN, RED, ChessBoard, ChessBoardArray, Game, Searcher
 from cchess.common import fench_to_species
+from cchess.read_cbr import read_from_cbl
 from cchess.piece import Piece
 
 
@@ -118,6 +122,48 @@ def benchmark_create_moves():
     return bench.run(lambda: list(board.create_moves()))
 
 
+def benchmark_create_moves_array():
+    """测试 ChessBoardArray.create_moves() 性能"""
+    board = ChessBoardArray(FULL_INIT_FEN)
+    bench = Benchmark("create_moves_array", iterations=100)
+    return bench.run(lambda: list(board.create_moves()))
+
+
+def benchmark_create_moves_packed():
+    """测试 create_moves_packed() 性能"""
+    board = ChessBoardArray(FULL_INIT_FEN)
+    bench = Benchmark("create_moves_packed", iterations=100)
+    return bench.run(lambda: board.create_moves_packed())
+
+
+def benchmark_legal_moves():
+    """测试 legal_moves() 性能"""
+    board = ChessBoard(FULL_INIT_FEN)
+    bench = Benchmark("legal_moves", iterations=100)
+    return bench.run(lambda: list(board.legal_moves()))
+
+
+def benchmark_perft():
+    """测试 perft(2) 性能（1920 个节点，可换算为每秒节点数）"""
+    board = ChessBoard(FULL_INIT_FEN)
+    bench = Benchmark("perft(2)", iterations=10)
+    return bench.run(lambda: board.perft(2))
+
+
+def benchmark_perft_array():
+    """测试 ChessBoardArray.perft(2) 性能"""
+    board = ChessBoardArray(FULL_INIT_FEN)
+    bench = Benchmark("perft(2)_array", iterations=10)
+    return bench.run(lambda: board.perft(2))
+
+
+def benchmark_search():
+    """测试内置搜索器 depth=3 的性能"""
+    searcher = Searcher()
+    bench = Benchmark("search(depth=3)", iterations=3)
+    return bench.run(lambda: searcher.search(FULL_INIT_FEN, depth=3))
+
+
 def benchmark_is_valid_move():
     """测试 is_valid_move() 性能"""
     board = ChessBoard(FULL_INIT_FEN)
@@ -178,6 +224,36 @@ def benchmark_normalized():
     return bench.run(lambda: board.normalized())
 
 
+def benchmark_game_memory(file_name=None):
+    """测试载入棋谱库后常驻内存，返回 (对局数, 走子数, 每步字节数)。
+
+    参数:
+        file_name: .cbl 棋谱库或单个棋谱文件，默认使用 tests/data 中的 93 局 CBL
+    """
+    if file_name is None:
+        file_name = os.path.join(
+            os.path.dirname(__file__), "data", "1956年全国象棋锦标赛93局.CBL"
+        )
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        if file_name.lower().endswith(".cbl"):
+            games = read_from_cbl(file_name, Game)["games"]
+        else:
+            games = [Game.read_from(file_name)]
+        gc.collect()
+        used = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    move_count = 0
+    for game in games:
+        lines = game.dump_moves(is_tree_mode=True) if game.first_move else []
+        move_count += sum(len(line["moves"]) for line in lines)
+    return len(games), move_count, used / max(move_count, 1)
+
+
 def run_all_benchmarks():
     """运行所有基准测试"""
     print("\n" + "=" * 60)
@@ -187,6 +263,12 @@ def run_all_benchmarks():
     benchmarks = [
         ("get_pieces", benchmark_get_pieces),
         ("create_moves", benchmark_create_moves),
+        ("create_moves_array", benchmark_create_moves_array),
+        ("create_moves_packed", benchmark_create_moves_packed),
+        ("legal_moves", benchmark_legal_moves),
+        ("perft", benchmark_perft),
+        ("perft_array", benchmark_perft_array),
+        ("search", benchmark_search),
         ("is_valid_move", benchmark_is_valid_move),
         ("fench_to_species", benchmark_fench_to_species),
         ("Rook moves", benchmark_rook_moves),
@@ -218,6 +300,9 @@ def run_all_benchmarks():
             f"{result.name:<20} {result.avg_time_ms:<15.3f} {result.ops_per_sec:<15.1f}"
         )
 
+    game_count, move_count, per_move = benchmark_game_memory()
+    print(f"\n棋谱库内存: {game_count} 局 {move_count} 步, 每步约 {per_move:.0f} 字节")
+
     return results
 
 
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Copyright (C) 2024  walker li <walker8088@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+测试用的简易 UCI/UCCI 引擎，不依赖 cchess，也不做真正的搜索。
+
+红方走子时总是返回 h2e2，黑方走子时返回 h7e7（开局局面下均合法）；
+评分取 FEN 的回合数字段（没有时为 0），便于测试按局面核对结果。
+支持 go depth N / go movetime MS / go infinite 以及 stop、isready、quit；
+设置 MultiPV 选项后每层输出对应条数的 info（带 multipv 字段）。
+"""
+
+import sys
+import threading
+
+_print_lock = threading.Lock()
+
+
+def _send(line):
+    with _print_lock:
+        sys.stdout.write(line + "\n")
+        sys.stdout.flush()
+
+
+def _search(fen, params, stop, multipv):
+    fields = fen.split()
+    move = "h7e7" if len(fields) > 1 and fields[1] == "b" else "h2e2"
+    score = int(fields[5]) if len(fields) > 5 and fields[5].isdigit() else 0
+
+    depth = 3
+    movetime = 0
+    infinite = False
+    for key, value in zip(params, params[1:] + [""]):
+        if key == "depth":
+            depth = int(value)
+        elif key == "movetime":
+            movetime = int(value)
+        elif key == "infinite":
+            infinite = True
+
+    d = 0
+    while infinite or d < depth:
+        d += 1
+        if multipv == 1:
+            _send(f"info depth {d} score cp {score} nodes {d * 100} time {d} pv {move}")
+        else:
+            for k in range(1, multipv + 1):
+                _send(f"info depth {d} multipv {k} score cp {score - k + 1} pv {move}")
+        delay = 0.01 if infinite else movetime / 1000 / depth
+        if stop.wait(delay):
+            break
+    _send(f"bestmove {move}")
+
+
+def main():
+    fen = ""
+    stop = threading.Event()
+    worker = None
+    multipv = 1
+    for line in sys.stdin:
+        cmd = line.strip()
+        if cmd in ("uci", "ucci"):
+            _send("id name FakeEngine")
+            _send("option name Hash type spin default 16 min 1 max 1024")
+            _send(f"{cmd}ok")
+        elif cmd == "isready":
+            _send("readyok")
+        elif cmd.startswith("setoption name MultiPV value "):
+            multipv = int(cmd.split()[-1])
+        elif cmd.startswith("position fen "):
+            fen = cmd[len("position fen ") :]
+        elif cmd.startswith("go"):
+            stop.clear()
+            worker = threading.Thread(target=_search, args=(fen, cmd.split()[1:], stop, multipv))
+            worker.start()
+        elif cmd in ("stop", "quit"):
+            stop.set()
+            if worker is not None:
+                worker.join()
+                worker = None
+            if cmd == "quit":
+                break
+
+
+if __name__ == "__main__":
+    main()
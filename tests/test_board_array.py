@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (C) 2024  walker li <walker8088@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import random
+
+from cchess import BLACK, FULL_INIT_FEN, RED, ChessBoard, ChessBoardArray
+from cchess.common import packed_captured, unpack_move
+
+
+def _random_positions(count=8, plies=40, seed=7):
+    """用固定种子随机走子，产出一系列局面的 FEN。"""
+    rnd = random.Random(seed)
+    fens = []
+    for _ in range(count):
+        board = ChessBoard(FULL_INIT_FEN)
+        for _ in range(plies):
+            moves = list(board.create_moves())
+            if not moves:
+                break
+            board.move(*rnd.choice(moves), check=False)
+            fens.append(board.to_fen())
+            if board.get_king(RED) is None or board.get_king(BLACK) is None:
+                break
+    return fens
+
+
+class TestChessBoardArray:
+    def test_fen_round_trip(self):
+        board = ChessBoardArray(FULL_INIT_FEN)
+        assert board.to_fen() == FULL_INIT_FEN
+        assert board == ChessBoard(FULL_INIT_FEN)
+
+    def test_put_pop_fench(self):
+        board = ChessBoardArray()
+        board.put_fench("K", (4, 0)).put_fench("r", (4, 5))
+        assert board.get_fench((4, 5)) == "r"
+        assert board.occupied((4, 5)) == BLACK
+        assert board.get_fench_positions("r") == [(4, 5)]
+        assert board.pop_fench((4, 5)) == "r"
+        assert board.occupied((4, 5)) is None
+        assert board.to_fen() == "9/9/9/9/9/9/9/9/9/4K4 w"
+
+    def test_copy_is_independent(self):
+        board = ChessBoardArray(FULL_INIT_FEN)
+        other = board.copy()
+        other.move((7, 2), (4, 2))
+        assert board.to_fen() == FULL_INIT_FEN
+        assert other.get_fench((4, 2)) == "C"
+
+    def test_from_board_is_independent(self):
+        src = ChessBoard(FULL_INIT_FEN)
+        board = ChessBoardArray().from_board(src)
+        src.move((7, 2), (4, 2))
+        assert board.to_fen() == FULL_INIT_FEN
+        assert board.get_fench((4, 2)) is None
+        assert board.get_fench((7, 2)) == "C"
+
+    def test_make_unmake(self):
+        board = ChessBoardArray("4k4/9/9/9/9/9/9/9/4r4/4K4 w")
+        move_info = board.make_move((4, 0), (4, 1))
+        assert board.to_fen() == "4k4/9/9/9/9/9/9/9/4K4/9 w"
+        board.unmake_move(move_info)
+        assert board.to_fen() == "4k4/9/9/9/9/9/9/9/4r4/4K4 w"
+
+    def test_transforms(self):
+        fen = "rnbakab1r/9/1c4nc1/p1p1p1p1p/9/9/P1P1P1P1P/1C2C1N2/9/RNBAKAB1R b"
+        board = ChessBoardArray(fen)
+        for name in ("mirror", "flip", "swap", "normalized"):
+            assert getattr(board, name)().to_fen() == getattr(ChessBoard(fen), name)().to_fen()
+
+    def test_moves_match_chessboard(self):
+        for fen in _random_positions():
+            board = ChessBoard(fen)
+            array_board = ChessBoardArray(fen)
+            moves = sorted(board.create_moves())
+            assert sorted(array_board.create_moves()) == moves, fen
+            assert array_board.to_fen() == fen
+            for piece in board.get_all_pieces(board.move_side()):
+                pos = (piece.x, piece.y)
+                assert sorted(array_board.create_piece_moves(pos)) == sorted(
+                    board.create_piece_moves(pos)
+                )
+
+    def test_is_valid_move_match_chessboard(self):
+        for fen in _random_positions(count=2, plies=20):
+            board = ChessBoard(fen)
+            array_board = ChessBoardArray(fen)
+            for piece in board.get_all_pieces(board.move_side()):
+                if piece.species == "k":
+                    # ChessBoard 的白脸将判断只比较行号，这里不做对比
+                    continue
+                for x in range(9):
+                    for y in range(10):
+                        pos_from, pos_to = (piece.x, piece.y), (x, y)
+                        assert array_board.is_valid_move(
+                            pos_from, pos_to
+                        ) == board.is_valid_move(pos_from, pos_to)
+
+    def test_king_face_to_face(self):
+        board = ChessBoardArray("4k4/9/9/9/9/9/9/9/9/4K4 w")
+        assert ((4, 0), (4, 9)) in list(board.create_moves())
+        assert board.get_king(RED).x == 4
+        move = board.move((4, 0), (4, 9))
+        assert move.is_king_killed()
+        assert board.to_fen() == "4K4/9/9/9/9/9/9/9/9/9 w"
+
+    def test_moves_packed_match_chessboard(self):
+        for fen in _random_positions(count=3):
+            board = ChessBoard(fen)
+            array_board = ChessBoardArray(fen)
+            for with_captured in (False, True):
+                packed = board.create_moves_packed(with_captured)
+                assert packed.typecode == ("I" if with_captured else "H")
+                assert sorted(array_board.create_moves_packed(with_captured)) == sorted(packed)
+            assert [unpack_move(m) for m in packed] == list(board.create_moves())
+            for m in packed:
+                (tx, ty) = unpack_move(m)[1]
+                assert packed_captured(m) == board.get_fench((tx, ty))
@@ -16,7 +16,10 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import random
+
 from cchess import ANY_COLOR, BLACK, FULL_INIT_FEN, RED, ChessBoard
+from cchess.perft import PERFT_POSITIONS
 
 
 class TestBoardExtended:
@@ -182,6 +185,18 @@ class TestBoardExtended:
         empty = board.get_fench_positions_x("X", 4)
         assert len(empty) == 0
 
+    def test_count_fench(self):
+        """测试 count_fench 方法"""
+        board = ChessBoard(FULL_INIT_FEN)
+        assert board.count_fench("P") == 5
+        assert board.count_fench("k") == 1
+        assert board.count_fench("X") == 0
+        # 炮二进七吃马
+        board.push((1, 2), (1, 9))
+        assert board.count_fench("n") == 1
+        board.pop()
+        assert board.count_fench("n") == 2
+
     def test_get_fench_positions(self):
         """测试 get_fench_positions 方法"""
         board = ChessBoard(FULL_INIT_FEN)
@@ -323,3 +338,74 @@ class TestBoardExtended:
         center_board = ChessBoard()
         center_board.put_fench("K", (4, 0))  # 中间列
         assert center_board.is_mirror() is True, "中间列单个棋子应该对称"
+
+
+class TestSee:
+    def test_attackers_of(self):
+        board = ChessBoard("3k5/3n5/9/4p4/9/9/9/4R4/4C4/5K3 w")
+        # 车直接攻击，炮以车为炮架，按子力价值从低到高排列
+        assert board.attackers_of((4, 6), RED) == [(4, 1), (4, 2)]
+        # 黑马从 (3, 8) 保护 (4, 6)
+        assert board.attackers_of((4, 6), BLACK) == [(3, 8)]
+        # 黑卒堵住马腿
+        board.put_fench("p", (3, 7))
+        assert board.attackers_of((4, 6), BLACK) == []
+        # 对脸将只在目标格是对方将时计入
+        board = ChessBoard("4k4/9/9/9/9/9/9/9/9/4K4 w")
+        assert board.attackers_of((4, 9), RED) == [(4, 0)]
+        assert board.attackers_of((4, 8), RED) == []
+
+    def test_attackers_match_moves(self):
+        rnd = random.Random(2)
+        for _name, fen, _counts in PERFT_POSITIONS:
+            board = ChessBoard(fen)
+            for _ in range(20):
+                for color in (RED, BLACK):
+                    side = board.move_side()
+                    board.set_move_side(color)
+                    expected = {}
+                    for pos_from, pos_to in board.create_captures():
+                        expected.setdefault(pos_to, set()).add(pos_from)
+                    board.set_move_side(side)
+                    for pos_to, sources in expected.items():
+                        assert set(board.attackers_of(pos_to, color)) == sources
+                moves = list(board.legal_moves())
+                if not moves:
+                    break
+                board.push(*rnd.choice(moves))
+
+    def test_see_rook_xray(self):
+        board = ChessBoard("r2k5/9/9/p8/9/9/9/9/R8/R4K3 w")
+        assert board.see(((0, 1), (0, 6))) == 30
+        board.pop_fench((0, 0))
+        assert board.see(((0, 1), (0, 6))) == -570
+
+    def test_see_cannon_screen(self):
+        fen = "3kc4/4a4/9/4p4/9/9/9/9/4R4/5K3 w"
+        board = ChessBoard(fen)
+        assert board.see(((4, 1), (4, 6))) == -570
+        assert board.to_fen() == fen
+        # 没有炮架时黑炮无法吃回
+        board.pop_fench((4, 8))
+        assert board.see(((4, 1), (4, 6))) == 30
+
+    def test_see_knight_and_bishop_blocks(self):
+        board = ChessBoard("3k5/3n5/9/4p4/9/9/9/9/4R4/5K3 w")
+        assert board.see(((4, 1), (4, 6))) == -570
+        board.put_fench("p", (3, 7))
+        assert board.see(((4, 1), (4, 6))) == 30
+
+        board = ChessBoard("2bk5/9/4p4/9/9/9/9/9/4R4/5K3 w")
+        assert board.see(((4, 1), (4, 7))) == -570
+        board.put_fench("p", (3, 8))
+        assert board.see(((4, 1), (4, 7))) == 30
+
+    def test_see_king_recapture(self):
+        # 黑将吃回后让开的直线上，红车可以再吃将，因此黑将不能吃回
+        board = ChessBoard("9/R2nk3R/9/9/9/9/9/9/9/5K3 w")
+        assert board.see(((0, 8), (3, 8))) == 270
+        board.pop_fench((8, 8))
+        assert board.see(((0, 8), (3, 8))) == -330
+        # 以黑将为炮架的红炮，黑将吃回后失去炮架
+        board.put_fench("C", (8, 8))
+        assert board.see(((0, 8), (3, 8))) == -330
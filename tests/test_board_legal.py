@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (C) 2024  walker li <walker8088@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import random
+
+import pytest
+
+from cchess import BLACK, FULL_INIT_FEN, RED, ChessBoard, ChessBoardArray
+from cchess.perft import PERFT_POSITIONS
+
+
+def _brute_force_legal(board):
+    """逐个试走候选走法并检查是否被将军，作为 legal_moves 的对照。"""
+    return sorted(m for m in board.create_moves() if not board.is_checked_move(*m))
+
+
+class TestLegalMoves:
+    def test_init_board(self):
+        board = ChessBoard(FULL_INIT_FEN)
+        assert sorted(board.legal_moves()) == sorted(board.create_moves())
+        assert len(list(board.legal_moves())) == 44
+
+    def test_rook_pin(self):
+        board = ChessBoard("3k5/9/9/9/4r4/9/9/9/4R4/4K4 w")
+        rook_moves = [m for m in board.legal_moves() if m[0] == (4, 1)]
+        assert sorted(m[1] for m in rook_moves) == [(4, 2), (4, 3), (4, 4), (4, 5)]
+        assert sorted(board.legal_moves()) == _brute_force_legal(board)
+
+    def test_flying_general_pin(self):
+        board = ChessBoard("4k4/9/9/9/9/9/9/9/4N4/4K4 w")
+        assert [m for m in board.legal_moves() if m[0] == (4, 1)] == []
+        assert sorted(board.legal_moves()) == _brute_force_legal(board)
+
+    def test_cannon_screen(self):
+        # 王与炮之间无子时，走到中间的格子会形成炮架
+        board = ChessBoard("3k5/9/9/9/4c4/9/9/R8/9/4K4 w")
+        assert ((0, 2), (4, 2)) not in list(board.legal_moves())
+        assert ((0, 2), (3, 2)) in list(board.legal_moves())
+        # 炮线上有两个阻挡子时，任一阻挡子离开都会形成将军
+        board = ChessBoard("3k5/9/9/9/4c4/9/4N4/4B4/9/4K4 w")
+        assert [m for m in board.legal_moves() if m[0] in ((4, 2), (4, 3))] == []
+        assert sorted(board.legal_moves()) == _brute_force_legal(board)
+
+    def test_knight_leg(self):
+        board = ChessBoard("3k5/9/9/9/9/9/9/5n3/5A3/4K4 w")
+        assert [m for m in board.legal_moves() if m[0] == (5, 1)] == []
+        assert sorted(board.legal_moves()) == _brute_force_legal(board)
+
+    def test_random_positions(self):
+        rnd = random.Random(5)
+        for _ in range(3):
+            board = ChessBoard(FULL_INIT_FEN)
+            array_board = ChessBoardArray(FULL_INIT_FEN)
+            for _ in range(40):
+                legal = sorted(board.legal_moves())
+                assert legal == _brute_force_legal(board), board.to_fen()
+                assert sorted(array_board.legal_moves()) == legal
+                if not legal:
+                    assert board.has_no_legal_moves()
+                    break
+                move = rnd.choice(legal)
+                board.move(*move, check=False)
+                array_board.move(*move, check=False)
+
+    def test_no_king(self):
+        board = ChessBoard("4k4/9/9/9/9/9/9/9/9/R8 w")
+        assert sorted(board.legal_moves()) == sorted(board.create_moves())
+        assert board.has_no_legal_moves() is True
+        assert board.move_side() == RED
+        board.set_move_side(BLACK)
+        assert board.has_no_legal_moves() is False
+
+
+class TestStagedMoves:
+    def test_split_matches_create_moves(self):
+        rnd = random.Random(7)
+        for _name, fen, _counts in PERFT_POSITIONS:
+            board = ChessBoard(fen)
+            for _ in range(30):
+                moves = list(board.create_moves())
+                cells = board._board
+                captures = [m for m in moves if cells[m[1][1]][m[1][0]]]
+                quiet = [m for m in moves if not cells[m[1][1]][m[1][0]]]
+                assert sorted(board.create_captures()) == sorted(captures)
+                assert sorted(board.create_captures(sort=True)) == sorted(captures)
+                assert sorted(board.create_quiet_moves()) == sorted(quiet)
+                checking = [m for m in moves if board.is_checking_move(*m)]
+                assert sorted(board.create_checking_moves()) == sorted(checking)
+                legal = list(board.legal_moves())
+                if not legal:
+                    break
+                board.push(*rnd.choice(legal))
+
+    def test_captures_mvv_lva(self):
+        # 红兵、红车都能吃黑车，红车还能吃黑卒
+        board = ChessBoard("3k5/9/9/9/9/p3r4/4P4/9/9/R3K4 w")
+        assert list(board.create_captures(sort=True)) == [
+            ((4, 3), (4, 4)),
+            ((0, 0), (0, 4)),
+        ]
+        board = ChessBoard("3k5/9/9/9/9/2r1r4/4P4/9/9/2R1K4 w")
+        assert list(board.create_captures(sort=True))[0] == ((4, 3), (4, 4))
+
+    def test_checking_moves(self):
+        # 车直接将军、炮架将军以及闪开马腿后的马将军
+        board = ChessBoard("3k5/9/9/9/9/9/9/9/3R5/4K4 w")
+        assert ((3, 1), (3, 8)) in list(board.create_checking_moves())
+        board = ChessBoard("3k5/9/9/9/9/9/9/3C5/9/4K1N2 w")
+        checking = list(board.create_checking_moves())
+        assert ((3, 2), (3, 1)) not in checking
+        assert all(board.is_checking_move(*m) for m in checking)
+        board = ChessBoard("4k4/9/9/9/8R/9/9/4C4/9/3K5 w")
+        checking = list(board.create_checking_moves())
+        assert ((8, 5), (4, 5)) in checking
+        assert ((8, 5), (3, 5)) not in checking
+
+
+class TestEvasions:
+    def test_random_checks(self):
+        rnd = random.Random(13)
+        checks = 0
+        for _ in range(20):
+            board = ChessBoard(FULL_INIT_FEN)
+            for _ in range(60):
+                legal = _brute_force_legal(board)
+                if board.is_king_attacked(board.move_side()):
+                    checks += 1
+                    assert sorted(board.evasions()) == legal, board.to_fen()
+                assert board.has_no_legal_moves() == (not legal), board.to_fen()
+                if not legal:
+                    break
+                # 优先走将军的走法，多覆盖被将军的局面
+                checking = [m for m in legal if board.is_checking_move(*m)]
+                board.push(*rnd.choice(checking or legal))
+        assert checks > 50
+
+    def test_cannon_screen_escape(self):
+        # 黑炮以红马为炮架将军：马跳开即解除将军
+        board = ChessBoard("3k5/9/9/9/4c4/9/9/4N4/9/4K4 w")
+        moves = sorted(board.evasions())
+        assert moves == _brute_force_legal(board)
+        assert ((4, 2), (2, 3)) in moves
+        assert ((4, 0), (4, 1)) not in moves
+
+    def test_knight_check(self):
+        board = ChessBoard("3k5/5N3/9/9/9/9/9/3C5/9/4K4 b")
+        assert board.is_king_attacked(BLACK)
+        assert sorted(board.evasions()) == _brute_force_legal(board)
+
+    def test_checkmate(self):
+        # 双车：黑将无路可走
+        board = ChessBoard("3k5/R8/9/9/9/9/9/9/9/3RK4 b")
+        assert board.has_no_legal_moves() is True
+        assert list(board.evasions()) == []
+        move = ChessBoard("3k5/9/R8/9/9/9/9/9/9/3RK4 w").move((0, 7), (0, 8))
+        assert move.is_checking is True
+        assert move.is_checkmate is True
+
+
+class TestIsAttacked:
+    def test_matches_move_generation(self):
+        rnd = random.Random(11)
+        for _name, fen, _counts in PERFT_POSITIONS:
+            board = ChessBoard(fen)
+            for _ in range(30):
+                for color in (RED, BLACK):
+                    king = board.get_king(color)
+                    if king is not None:
+                        # 对方任一棋子能走到王的位置即为被攻击
+                        enemy = BLACK if color == RED else RED
+                        targets = {
+                            to_pos
+                            for piece in board.get_all_pieces(enemy)
+                            for _, to_pos in piece.create_moves()
+                        }
+                        assert board.is_king_attacked(color) == (
+                            (king.x, king.y) in targets
+                        )
+                    for y in range(10):
+                        for x in range(9):
+                            assert board.is_attacked((x, y), color) == bool(
+                                board.attackers_of((x, y), color)
+                            )
+                moves = list(board.legal_moves())
+                if not moves:
+                    break
+                board.push(*rnd.choice(moves))
+
+    def test_checking(self):
+        board = ChessBoard("3k5/9/9/9/9/9/9/9/4R4/4K4 w")
+        board.push((4, 1), (3, 1))
+        assert board.is_checking() is False
+        board.next_turn()
+        assert board.is_checking() is True
+        move = ChessBoard("3k5/9/9/9/9/9/9/9/4R4/4K4 w").move((4, 1), (3, 1))
+        assert move.is_checking is True
+
+
+class TestPerft:
+    @pytest.mark.parametrize("name,fen,expected", PERFT_POSITIONS)
+    def test_reference_positions(self, name, fen, expected):
+        max_depth = 3 if name != "middlegame" else 2
+        for depth in range(1, max_depth + 1):
+            assert ChessBoard(fen).perft(depth) == expected[depth - 1], name
+
+    def test_array_backend(self):
+        board = ChessBoardArray(FULL_INIT_FEN)
+        assert board.perft(2) == 1920
+        assert board.to_fen() == FULL_INIT_FEN
+
+    def test_divide(self):
+        board = ChessBoard(FULL_INIT_FEN)
+        result = board.perft_divide(2)
+        assert len(result) == 44
+        assert sum(result.values()) == 1920
+        after = board.copy()
+        after.move_iccs("h2e2")
+        assert result["h2e2"] == after.perft(1)
+        assert board.to_fen() == FULL_INIT_FEN
+        assert board.perft(0) == 1
@@ -16,10 +16,14 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import random
+
 import pytest
 
 from cchess.board import ChessBoard, MoveInfo
-from cchess.common import BLACK, RED
+from cchess.board_array import ChessBoardArray
+from cchess.common import BLACK, FULL_INIT_FEN, RED
+from cchess.exception import CChessError
 
 
 class TestMakeUnmake:
@@ -53,7 +57,6 @@ class TestMakeUnmake:
         # 检查恢复
         assert board._board == initial_board
         assert board.move_side() == RED
-        assert board._attack_matrix_dirty == True  # 脏标志应为 True，因为移动后设置
 
     def test_make_capture(self):
         """测试吃子移动"""
@@ -75,22 +78,25 @@ class TestMakeUnmake:
         assert board._board == initial_board
         assert board.get_fench((4, 1)) == "r"
 
-    def test_attack_matrix_dirty_flag(self):
-        """测试攻击矩阵脏标志处理"""
-        board = ChessBoard("4k4/9/9/9/9/9/9/9/9/4K4 w")
-        # 初始脏标志应为 True
-        assert board._attack_matrix_dirty == True
-        # 计算攻击矩阵后，脏标志变为 False
-        board.is_checking()  # 这会触发重新计算
-        assert board._attack_matrix_dirty == False
-        # 执行移动
-        move_info = board.make_move((4, 0), (4, 1))
-        # 移动后脏标志应为 True
-        assert board._attack_matrix_dirty == True
-        # 撤销移动
-        board.unmake_move(move_info)
-        # 脏标志应恢复为 False
-        assert board._attack_matrix_dirty == False
+    def test_random_make_unmake(self):
+        """随机走子后逐步撤销，棋盘、哈希与棋子位置表完全恢复"""
+        rnd = random.Random(1)
+        for board in (ChessBoard(FULL_INIT_FEN), ChessBoardArray(FULL_INIT_FEN)):
+            history = []
+            for _ in range(80):
+                moves = list(board.create_moves())
+                if not moves:
+                    break
+                history.append(board.make_move(*rnd.choice(moves)))
+                board.next_turn()
+                if board.get_king(RED) is None or board.get_king(BLACK) is None:
+                    break
+            while history:
+                board.unmake_move(history.pop())
+            fresh = board.__class__(FULL_INIT_FEN)
+            assert board._board == fresh._board
+            assert board.zhash() == fresh.zhash()
+            assert board._piece_pos == fresh._piece_pos
 
     def test_move_side_restoration(self):
         """测试走子方恢复"""
@@ -133,10 +139,74 @@ class TestMakeUnmake:
         assert hasattr(move_info, "to_pos")
         assert hasattr(move_info, "moving_fench")
         assert hasattr(move_info, "captured_fench")
-        assert hasattr(move_info, "prev_attack_matrix_dirty")
         assert hasattr(move_info, "prev_move_side")
         assert hasattr(move_info, "board_before")
 
+    def test_move_info_defaults(self):
+        """直接构造 MoveInfo 时快照字段默认为 None，并且没有实例字典"""
+        info = MoveInfo((4, 0), (4, 1), "K", None, RED, RED)
+        assert info.board_before is None
+        assert info.board_after is None
+        assert not hasattr(info, "__dict__")
+        assert info == MoveInfo((4, 0), (4, 1), "K", None, RED, RED, None, None)
+        assert "moving_fench='K'" in repr(info)
+
+    def test_make_move_without_snapshot(self):
+        """默认不保存棋盘快照，撤销仍然完整"""
+        board = ChessBoard("4k4/9/9/9/9/9/9/9/4r4/4K4 w")
+        initial_board = [row[:] for row in board._board]
+        move_info = board.make_move((4, 0), (4, 1))
+        assert move_info.board_before is None
+        assert move_info.board_after is None
+        assert move_info.captured_fench == "r"
+        board.unmake_move(move_info)
+        assert board._board == initial_board
+
+    def test_make_move_with_snapshot(self):
+        """snapshot=True 时保存移动前后的棋盘数组"""
+        board = ChessBoard("4k4/9/9/9/9/9/9/9/4r4/4K4 w")
+        initial_board = [row[:] for row in board._board]
+        move_info = board.make_move((4, 0), (4, 1), snapshot=True)
+        assert move_info.board_before == initial_board
+        assert move_info.board_after == board._board
+        assert move_info.board_after is not board._board
+        board.unmake_move(move_info)
+        assert board._board == initial_board
+
+    def test_piece_lists(self):
+        """测试棋子位置表随走子、撤销和摆子同步更新"""
+
+        def scan(board):
+            positions = {}
+            for y in range(10):
+                for x in range(9):
+                    fench = board.get_fench((x, y))
+                    if fench:
+                        positions.setdefault(fench, set()).add((x, y))
+            return positions
+
+        board = ChessBoard("4k4/9/9/9/9/9/9/9/4r4/3AK4 w")
+        assert board.get_fench_positions("A") == [(3, 0)]
+        move_info = board.make_move((4, 0), (4, 1))
+        assert {f: p for f, p in board._piece_pos.items() if p} == scan(board)
+        assert board.get_fench_positions("r") == []
+        assert board.get_king(RED).y == 1
+        board.unmake_move(move_info)
+        assert {f: p for f, p in board._piece_pos.items() if p} == scan(board)
+        assert board.get_fench_positions("r") == [(4, 1)]
+        board.put_fench("R", (0, 5)).put_fench("R", (0, 3))
+        assert board.get_fench_positions("R") == [(0, 3), (0, 5)]
+        assert board.get_fench_positions_x("R", 0) == [(0, 3), (0, 5)]
+        board.pop_fench((0, 3))
+        assert [(p.x, p.y) for p in board.get_all_pieces(RED)] == [
+            (0, 5),
+            (3, 0),
+            (4, 0),
+        ]
+        assert {f: p for f, p in board.mirror()._piece_pos.items() if p} == scan(
+            board.mirror()
+        )
+
     def test_make_move_invalid(self):
         """测试 make_move 不检查合法性"""
         board = ChessBoard("4k4/9/9/9/9/9/9/9/9/4K4 w")
@@ -147,5 +217,70 @@ class TestMakeUnmake:
         assert isinstance(move_info, MoveInfo)
 
 
+class TestPushPop:
+    """测试 push/pop 撤销栈"""
+
+    @pytest.mark.parametrize("board_class", [ChessBoard, ChessBoardArray])
+    def test_push_pop_round_trip(self, board_class):
+        rnd = random.Random(3)
+        board = board_class(FULL_INIT_FEN)
+        states = []
+        for _ in range(60):
+            moves = list(board.legal_moves())
+            if not moves:
+                break
+            states.append((board.to_fen(), board.zhash()))
+            side = board.move_side()
+            move_info = board.push(*rnd.choice(moves))
+            assert board.peek() is move_info
+            assert board.move_side() == (BLACK if side == RED else RED)
+            assert board._zkey == board._compute_zkey()
+        assert board.ply() == len(states)
+        while states:
+            fen, key = states.pop()
+            board.pop()
+            assert (board.to_fen(), board.zhash()) == (fen, key)
+        assert board.ply() == 0
+        assert board.peek() is None
+        with pytest.raises(CChessError):
+            board.pop()
+
+    def test_repetition_count(self):
+        board = ChessBoard("3k5/9/9/9/9/9/9/9/9/4K4 w")
+        assert board.repetition_count() == 1
+        for _ in range(2):
+            board.push((4, 0), (4, 1))
+            board.push((3, 9), (3, 8))
+            board.push((4, 1), (4, 0))
+            board.push((3, 8), (3, 9))
+        assert board.repetition_count() == 3
+        board.pop()
+        assert board.repetition_count() == 2
+
+    def test_push_history_reset(self):
+        board = ChessBoard(FULL_INIT_FEN)
+        board.push((7, 2), (4, 2))
+        # 默认的快照不复制走子历史
+        assert board.copy().ply() == 0
+        other = board.copy(history=True)
+        assert other.ply() == 1
+        other.pop()
+        assert other.to_fen() == FULL_INIT_FEN
+        assert board.ply() == 1
+        # 加载新局面或镜像后撤销栈清空
+        assert board.mirror().ply() == 0
+        board.from_fen(FULL_INIT_FEN)
+        assert board.ply() == 0
+
+    def test_move_snapshot_without_history(self):
+        """move() 记录的走子前棋盘不复制 push 历史"""
+        board = ChessBoard(FULL_INIT_FEN)
+        board.push((7, 2), (4, 2))
+        board.push((7, 7), (4, 7))
+        move = board.move((1, 0), (2, 2))
+        assert board.ply() == 2
+        assert move.board_before().ply() == 0
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
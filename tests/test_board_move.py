@@ -16,6 +16,8 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import random
+
 import pytest
 
 from cchess import (
@@ -534,3 +536,60 @@ class TestBoard:
         assert board.zhash(FULL_INIT_FEN) == 7101337512282506414
         b = board.mirror()
         assert b.zhash() == 7101337512282506414
+
+    def test_hash_incremental(self):
+        rnd = random.Random(11)
+        board = ChessBoard(FULL_INIT_FEN)
+        history = []
+        for _ in range(60):
+            moves = list(board.create_moves())
+            if not moves:
+                break
+            pos_from, pos_to = rnd.choice(moves)
+            history.append((board.zhash(), board.make_move(pos_from, pos_to)))
+            board.next_turn()
+            assert board.zhash() == ChessBoard(board.to_fen()).zhash()
+            if board.get_king(RED) is None or board.get_king(BLACK) is None:
+                break
+        while history:
+            key, move_info = history.pop()
+            board.unmake_move(move_info)
+            assert board.zhash() == key
+        assert board.zhash() == 7101337512282506414
+
+        board.put_fench("R", (4, 4))
+        assert board.zhash() == ChessBoard(board.to_fen()).zhash()
+        board.put_fench("n", (4, 4))
+        assert board.zhash() == ChessBoard(board.to_fen()).zhash()
+        board.pop_fench((4, 4))
+        assert board.zhash() == 7101337512282506414
+        assert board.swap().zhash() == ChessBoard(board.swap().to_fen()).zhash()
+
+    def test_from_board_is_independent(self):
+        src = ChessBoard(FULL_INIT_FEN)
+        board = ChessBoard().from_board(src)
+        src.move((7, 2), (4, 2))
+        # 源棋盘走子后，复制出的棋盘的格子、哈希与棋子位置都不变
+        assert board.to_fen() == FULL_INIT_FEN
+        assert board.zhash() == 7101337512282506414
+        assert board.get_fench_positions("C") == [(1, 2), (7, 2)]
+        board.move((1, 2), (4, 2))
+        assert src.get_fench((1, 2)) == "C"
+        assert board.zhash() == ChessBoard(board.to_fen()).zhash()
+
+    def test_black_moves_match_normalized(self):
+        rnd = random.Random(3)
+        board = ChessBoard(FULL_INIT_FEN)
+        for _ in range(40):
+            moves = list(board.create_moves())
+            if not moves:
+                break
+            normalized = board.normalized()
+            expected = [
+                (board.denormalize_pos(p_from), board.denormalize_pos(p_to))
+                for p_from, p_to in normalized.create_moves()
+            ]
+            assert sorted(moves) == sorted(expected), board.to_fen()
+            board.move(*rnd.choice(moves), check=False)
+            if board.get_king(RED) is None or board.get_king(BLACK) is None:
+                break
@@ -18,6 +18,7 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from cchess import RED, BLACK, FULL_INIT_FEN
 from cchess.common import fench_to_txt_name, text_to_fench, get_fen_pieces, get_fen_type, get_fen_type_detail
+from cchess.common import pack_move, unpack_move, packed_captured, packed2iccs, iccs2packed
 
 
 class TestCommon():
@@ -126,3 +127,18 @@ class TestCommon():
         double_rook_fen = '4k4/9/9/9/9/9/9/9/9/3K1R1R3 w'
         red_title, black_title = get_fen_type_detail(double_rook_fen)
         assert '双车' in red_title or '车' in red_title
+
+    def test_packed_move(self):
+        for fx in range(9):
+            for fy in range(10):
+                for tx, ty in ((0, 0), (8, 9), (fx, 9 - fy)):
+                    move = pack_move((fx, fy), (tx, ty))
+                    assert move < 1 << 14
+                    assert unpack_move(move) == ((fx, fy), (tx, ty))
+                    assert packed_captured(move) is None
+        move = pack_move((7, 2), (7, 9), "n")
+        assert unpack_move(move) == ((7, 2), (7, 9))
+        assert packed_captured(move) == "n"
+        assert packed2iccs(move) == "h2h9"
+        assert iccs2packed("h2e2") == pack_move((7, 2), (4, 2))
+        assert packed2iccs(iccs2packed("a0i9")) == "a0i9"
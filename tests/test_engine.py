@@ -17,6 +17,7 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 import os
+import signal
 import time
 from pathlib import Path
 
@@ -37,6 +38,9 @@ result_dict = {"红胜": "1-0", "黑胜": "0-1", "和棋": "1/2-1/2"}
 S_RED_WIN = "1-0"
 S_BLACK_WIN = "0-1"
 
+# 不做搜索的测试引擎（见 tests/fake_engine.py）
+FAKE_ENGINE = str(Path(__file__).parent / "fake_engine.py")
+
 
 def load_move_txt(txt_file):
     with open(txt_file, "rb") as f:
@@ -360,3 +364,88 @@ class TestEngineManager:
         # self.cache.save()
         # self.mgr.get_game_file_score(Path('data', '030-黄松轩先胜冯敬如.XQF'))
 """
+
+
+@pytest.mark.skipif(os.name == "nt", reason="需要可直接执行的脚本")
+class TestEngineEvents:
+    """引擎应答到达时立即唤醒等待者，不再按固定间隔轮询。"""
+
+    def test_run_engine(self):
+        mgr = EngineManager()
+        assert mgr.load_uci(FAKE_ENGINE, {"Hash": 16}, {"movetime": 50})
+        for _ in range(3):
+            action = mgr.run_engine(cchess.FULL_INIT_FEN)
+            assert action["move"] == "h2e2"
+        mgr.quit()
+        assert mgr.engine.process.poll() is not None
+
+    def test_wakes_on_action(self):
+        engine = UciEngine()
+        assert engine.load(FAKE_ENGINE)[0] is True
+        assert engine.wait_for_ready(timeout=5) is True
+        while engine.get_action() is not None:
+            pass
+        engine.go_from(cchess.FULL_INIT_FEN, {"depth": 1})
+        assert engine._idle_event.is_set() is False
+        # 超时设得很长：动作到达时立即返回，而不是等到超时
+        start = time.perf_counter()
+        action = engine.get_action(timeout=30)
+        while action["action"] != "bestmove":
+            action = engine.get_action(timeout=30)
+        assert time.perf_counter() - start < 10
+        # 读线程收到 bestmove 时置位空闲事件
+        assert engine._idle_event.is_set() is True
+        engine.quit()
+
+    def test_stop_and_wait(self):
+        engine = UcciEngine()
+        assert engine.load(FAKE_ENGINE)[0] is True
+        assert engine.wait_for_ready(timeout=5) is True
+        assert engine.is_ready() is True
+        engine.go_from(cchess.FULL_INIT_FEN, {"infinite": ""})
+        # 队列中先是启动时的 ready 与 readyok，随后是搜索信息
+        action = engine.get_action(timeout=5)
+        while action["action"] != "info_move":
+            action = engine.get_action(timeout=5)
+        assert engine._idle_event.is_set() is False
+        # 读线程收到 bestmove 即唤醒，超时只是兜底
+        engine.stop_thinking(timeout=30)
+        assert engine._idle_event.is_set() is True
+        assert engine.get_action() is None
+        # 没有搜索时 stop 立即返回
+        engine.stop_thinking()
+        engine.quit()
+        assert engine.process.poll() is not None
+
+    def test_engine_exit(self):
+        engine = UciEngine()
+        assert engine.load(FAKE_ENGINE)[0] is True
+        assert engine.wait_for_ready(timeout=5) is True
+        engine.pin.write("quit\n")
+        engine.pin.flush()
+        engine.join(timeout=5)
+        assert engine.running is False
+        # 就绪后退出的引擎记为 DEAD，等待者不会把它当作就绪
+        assert engine.engine_status == EngineStatus.DEAD
+        assert engine.wait_for_ready(timeout=0) is False
+        assert engine.wait_for_ready(timeout=5) is False
+        # 进程已退出时 quit 直接返回
+        engine.quit()
+
+    def test_quit_kills_stuck_engine(self, tmp_path):
+        # 不理会 quit 与 SIGTERM 的引擎
+        script = tmp_path / "stuck_engine.py"
+        script.write_text(
+            "#!/usr/bin/env python3\n"
+            "import signal, sys\n"
+            "signal.signal(signal.SIGTERM, signal.SIG_IGN)\n"
+            "for line in sys.stdin:\n"
+            "    if line.strip() == 'uci':\n"
+            "        print('uciok', flush=True)\n"
+        )
+        script.chmod(0o755)
+        engine = UciEngine()
+        assert engine.load(str(script))[0] is True
+        assert engine.wait_for_ready(timeout=5) is True
+        engine.quit(timeout=0.5)
+        assert engine.process.returncode == -signal.SIGKILL
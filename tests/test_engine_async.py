@@ -1,8 +1,12 @@
 # -*- coding: utf-8 -*-
 """测试异步引擎功能"""
 
+import asyncio
+import os
+from pathlib import Path
+
 import pytest
-from cchess import ChessBoard, AsyncEngine
+from cchess import FULL_INIT_FEN, AsyncEngine, AsyncEnginePool, ChessBoard, EngineError
 from cchess.engine_async import play_move, analyse_position
 
 
@@ -59,3 +63,200 @@ class TestAsyncEngineIntegration:
         
         # 测试 analyse 方法签名
         assert hasattr(engine, 'analyse')
+
+
+# 不做搜索的测试引擎（见 tests/fake_engine.py），只能在 POSIX 上直接执行
+FAKE_ENGINE = str(Path(__file__).parent / "fake_engine.py")
+
+
+@pytest.mark.skipif(os.name == "nt", reason="需要可直接执行的脚本")
+class TestAsyncEnginePool:
+    """测试 AsyncEnginePool 类"""
+
+    def test_concurrent_analyse(self):
+        """并发请求数超过引擎数时排队，每个引擎同一时间只处理一个请求"""
+
+        async def run():
+            async with AsyncEnginePool(FAKE_ENGINE, size=2, options={"Hash": 16}) as pool:
+                assert len(pool.engines) == 2
+                peak = 0
+
+                async def one(board):
+                    nonlocal peak
+                    async with pool.acquire() as engine:
+                        peak = max(peak, pool.busy)
+                        return await engine.analyse(board, depth=3, time_limit=0.03)
+
+                boards = [ChessBoard(), ChessBoard(FULL_INIT_FEN.replace(" w", " b"))] * 4
+                results = await asyncio.gather(*(one(board) for board in boards))
+                assert peak == 2
+                assert pool.busy == 0
+                assert pool.waiting == 0
+                assert [r[0]["pv"][0] for r in results] == ["h2e2", "h7e7"] * 4
+                assert all(r[0]["depth"] == 3 for r in results)
+
+                play = await pool.play(ChessBoard(), depth=1)
+                assert play["move"] == "h2e2"
+                assert (await pool.analyse(ChessBoard(), depth=2))[0]["depth"] == 2
+            assert pool.engines == []
+
+        asyncio.run(run())
+
+    def test_backpressure(self):
+        """排队请求超过 max_waiting 时新请求直接失败"""
+
+        async def run():
+            async with AsyncEnginePool(FAKE_ENGINE, size=1, max_waiting=1) as pool:
+                first = asyncio.ensure_future(pool.analyse(ChessBoard(), time_limit=0.3))
+                await asyncio.sleep(0.05)
+                second = asyncio.ensure_future(pool.analyse(ChessBoard(), depth=1))
+                await asyncio.sleep(0.05)
+                assert pool.busy == 1
+                assert pool.waiting == 1
+                with pytest.raises(EngineError):
+                    await pool.analyse(ChessBoard(), depth=1)
+                assert (await first)[0]["depth"] == 3
+                assert (await second)[0]["depth"] == 1
+
+        asyncio.run(run())
+
+    def test_cancel_and_restart(self):
+        """取消的请求会停止引擎的搜索；引擎退出后换新引擎"""
+
+        async def run():
+            async with AsyncEnginePool(FAKE_ENGINE, size=1) as pool:
+                task = asyncio.ensure_future(pool.analyse(ChessBoard(), time_limit=30))
+                await asyncio.sleep(0.05)
+                task.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await task
+                # 剩余输出已读完，下一个请求得到自己的结果
+                result = await asyncio.wait_for(pool.analyse(ChessBoard(), depth=2), 5)
+                assert result[0]["depth"] == 2
+
+                engine = pool.engines[0]
+                engine.process.kill()
+                with pytest.raises(EngineError):
+                    await pool.analyse(ChessBoard(), depth=2)
+                assert pool.engines[0] is not engine
+                assert (await pool.analyse(ChessBoard(), depth=1))[0]["depth"] == 1
+
+        asyncio.run(run())
+
+    def test_multipv_not_sticky(self):
+        """同一个引擎先处理 multipv=3 的请求，之后 multipv=1 的请求只得到一条线路"""
+
+        async def run():
+            async with AsyncEnginePool(FAKE_ENGINE, size=1) as pool:
+                results = await pool.analyse(ChessBoard(), depth=2, multipv=3)
+                assert [r["multipv"] for r in results] == [1, 2, 3]
+                infos = [i async for i in pool.analyse_stream(ChessBoard(), depth=2)]
+                assert [i["depth"] for i in infos] == [1, 2]
+                assert all("multipv" not in i for i in infos)
+                results = await pool.analyse(ChessBoard(), depth=2)
+                assert len(results) == 1
+                assert "multipv" not in results[0]
+
+        asyncio.run(run())
+
+    def test_not_started(self):
+        """未启动或启动失败"""
+
+        async def run():
+            pool = AsyncEnginePool(FAKE_ENGINE)
+            with pytest.raises(EngineError):
+                await pool.analyse(ChessBoard(), depth=1)
+            assert not await AsyncEnginePool("no_such_engine.exe").start()
+
+        asyncio.run(run())
+
+
+@pytest.mark.skipif(os.name == "nt", reason="需要可直接执行的脚本")
+class TestAsyncEngineStream:
+    """测试 AsyncEngine.analyse_stream"""
+
+    def test_stream_all_infos(self):
+        """逐条返回 info，第一条在搜索结束前到达"""
+
+        async def run():
+            async with AsyncEngine(FAKE_ENGINE) as engine:
+                loop = asyncio.get_running_loop()
+                start = loop.time()
+                stamps = []
+                infos = []
+                async for info in engine.analyse_stream(ChessBoard(), depth=5, time_limit=0.5):
+                    stamps.append(loop.time() - start)
+                    infos.append(info)
+                assert [info["depth"] for info in infos] == [1, 2, 3, 4, 5]
+                assert infos[0]["pv"] == ["h2e2"]
+                assert "score" in infos[0]
+                assert stamps[0] < 0.2 < stamps[-1]
+                assert not engine._searching
+
+        asyncio.run(run())
+
+    def test_stream_filters(self):
+        """只在深度变化时返回，或按时间间隔节流"""
+
+        async def run():
+            async with AsyncEngine(FAKE_ENGINE) as engine:
+                infos = [
+                    info
+                    async for info in engine.analyse_stream(
+                        ChessBoard(), depth=4, multipv=3, depth_change_only=True
+                    )
+                ]
+                assert [(i["depth"], i["multipv"]) for i in infos] == [(d, 1) for d in range(1, 5)]
+
+                infos = [
+                    info
+                    async for info in engine.analyse_stream(
+                        ChessBoard(), depth=30, time_limit=0.3, interval=0.1
+                    )
+                ]
+                assert 2 <= len(infos) <= 6
+                # 搜索结束时补发最后一条
+                assert infos[-1]["depth"] == 30
+
+        asyncio.run(run())
+
+    def test_stream_close_and_cancel(self):
+        """提前关闭或取消迭代时停止搜索，引擎可以继续使用"""
+
+        async def run():
+            async with AsyncEngine(FAKE_ENGINE) as engine:
+                stream = engine.analyse_stream(ChessBoard(), time_limit=30)
+                assert (await stream.__anext__())["depth"] == 1
+                await asyncio.wait_for(stream.aclose(), 5)
+                assert not engine._searching
+                assert (await engine.play(ChessBoard(), depth=1))["move"] == "h2e2"
+
+                async def consume():
+                    async for _info in engine.analyse_stream(ChessBoard(), time_limit=30):
+                        pass
+
+                task = asyncio.ensure_future(consume())
+                await asyncio.sleep(0.05)
+                task.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await task
+                assert not engine._searching
+                result = await asyncio.wait_for(engine.analyse(ChessBoard(), depth=2), 5)
+                assert result[0]["depth"] == 2
+
+        asyncio.run(run())
+
+    def test_pool_stream(self):
+        """引擎池流式分析期间占用引擎，结束后放回"""
+
+        async def run():
+            async with AsyncEnginePool(FAKE_ENGINE, size=1) as pool:
+                stream = pool.analyse_stream(ChessBoard(), time_limit=30)
+                assert (await stream.__anext__())["depth"] == 1
+                assert pool.busy == 1
+                await stream.aclose()
+                assert pool.busy == 0
+                assert not pool.engines[0]._searching
+                assert (await pool.analyse(ChessBoard(), depth=1))[0]["depth"] == 1
+
+        asyncio.run(run())
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (C) 2024  walker li <walker8088@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from cchess import (
+    FULL_INIT_FEN,
+    EngineError,
+    EngineIOHub,
+    EngineManager,
+    EnginePool,
+    FenCache,
+)
+
+# 不做搜索的测试引擎（见 tests/fake_engine.py），只能在 POSIX 上直接执行
+FAKE_ENGINE = str(Path(__file__).parent / "fake_engine.py")
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="需要可直接执行的脚本")
+
+
+def _fen(n, side="w"):
+    return FULL_INIT_FEN.replace(" w", f" {side}") + f" - - 0 {n}"
+
+
+class TestEnginePool:
+    def test_map_keeps_order(self):
+        cache = FenCache()
+        pool = EnginePool(3, cache)
+        assert pool.load_uci(FAKE_ENGINE, {"Hash": 16}, {"depth": 2})
+        assert len(pool.managers) == 3
+        assert all(m.cache is cache for m in pool.managers)
+        fens = [_fen(n, "w" if n % 2 else "b") for n in range(1, 10)]
+        actions = list(pool.map(fens))
+        pool.quit()
+
+        for n, (fen, action) in enumerate(zip(fens, actions), 1):
+            assert action["action"] == "bestmove"
+            assert action["fen_engine"] == fen
+            assert action["move"] == ("h2e2" if n % 2 else "h7e7")
+            # 与 run_engine 一致：评分取走子后一方的视角
+            assert action["score"] == -n
+            assert cache.get(fen)[0] is not None
+
+    def test_submit_and_cache(self):
+        pool = EnginePool(2)
+        assert pool.load_ucci(FAKE_ENGINE, {}, {"depth": 1})
+        future = pool.submit(_fen(5))
+        assert future.result(timeout=10)["move"] == "h2e2"
+        # 命中共享缓存时不再询问引擎
+        pool.cache.fen_dict[_fen(5)]["h2e2"]["score"] = 99
+        assert pool.get_fen_score(_fen(5))["score"] == 99
+        pool.quit()
+        assert pool.managers == []
+
+    def test_not_loaded(self):
+        pool = EnginePool(2)
+        with pytest.raises(EngineError):
+            pool.submit(FULL_INIT_FEN)
+
+    def test_map_submits_eagerly(self, monkeypatch):
+        pool = EnginePool(2)
+        assert pool.load_uci(FAKE_ENGINE, {}, {"depth": 1})
+        submitted = []
+        submit = pool.submit
+        monkeypatch.setattr(
+            pool, "submit", lambda fen, use_cache=False: submitted.append(fen) or submit(fen, use_cache)
+        )
+        fens = [_fen(n) for n in range(1, 6)]
+        results = pool.map(fens)
+        # 还没有开始迭代，全部局面已经进入任务队列
+        assert submitted == fens
+        assert [a["score"] for a in results] == [-n for n in range(1, 6)]
+        pool.quit()
+
+    def test_dead_engine(self):
+        pool = EnginePool(3)
+        assert pool.load_uci(FAKE_ENGINE, {}, {"depth": 1})
+        for manager in pool.managers[:2]:
+            manager.engine.process.kill()
+            manager.engine.process.wait()
+        # 引擎已退出的工作线程把任务交给仍在运行的引擎
+        fens = [_fen(n) for n in range(1, 9)]
+        assert [a["score"] for a in pool.map(fens)] == [-n for n in range(1, 9)]
+
+        pool.managers[2].engine.process.kill()
+        pool.managers[2].engine.process.wait()
+        futures = [pool.submit(fen) for fen in fens]
+        for future in futures:
+            with pytest.raises(EngineError):
+                future.result(timeout=10)
+        with pytest.raises(EngineError):
+            pool.submit(FULL_INIT_FEN)
+        pool.quit()
+        assert pool.managers == []
+
+    def test_handshake_failure(self, tmp_path, monkeypatch):
+        # 第一个启动的引擎不应答 uci，其余为正常的测试引擎
+        script = tmp_path / "mute_engine.py"
+        script.write_text(
+            "#!/usr/bin/env python3\n"
+            "import os, sys\n"
+            f"mute = {str(tmp_path / 'mute.pid')!r}\n"
+            "try:\n"
+            "    fd = os.open(mute, os.O_CREAT | os.O_EXCL | os.O_WRONLY)\n"
+            "except FileExistsError:\n"
+            f"    os.execv(sys.executable, [sys.executable, {FAKE_ENGINE!r}])\n"
+            "os.write(fd, str(os.getpid()).encode())\n"
+            "os.close(fd)\n"
+            "for line in sys.stdin:\n"
+            "    if line.strip() == 'quit':\n"
+            "        break\n"
+        )
+        script.chmod(0o755)
+        monkeypatch.setattr(EngineManager, "ready_timeout", 0.5)
+
+        pool = EnginePool(3)
+        assert not pool.load_uci(str(script), {}, {"depth": 1})
+        assert pool.managers == []
+        # 握手失败但仍在运行的引擎进程已被关闭并回收
+        pid = int((tmp_path / "mute.pid").read_text())
+        with pytest.raises(ProcessLookupError):
+            os.kill(pid, 0)
+        assert len(pool.io_hub) == 0
+
+
+class TestEngineIOHub:
+    def test_single_reader_thread(self):
+        before = threading.active_count()
+        hub = EngineIOHub()
+        managers = [EngineManager(io_hub=hub) for _ in range(4)]
+        for manager in managers:
+            assert manager.load_uci(FAKE_ENGINE, {"Hash": 16}, {"depth": 3})
+            # 引擎自己的读线程没有启动
+            assert not manager.engine.is_alive()
+        assert len(hub) == 4
+        # 四个引擎只多出一个集线器线程
+        assert threading.active_count() == before + 1
+
+        for n, manager in enumerate(managers, 1):
+            action = manager.run_engine(_fen(n))
+            assert action["move"] == "h2e2"
+            assert action["score"] == -n
+            assert manager.engine.ids["name"] == "FakeEngine"
+
+        managers[0].quit()
+        # 进程退出后集线器读到管道结尾，不再读取该引擎
+        deadline = time.monotonic() + 5
+        while len(hub) == 4 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(hub) == 3
+        assert managers[0].engine.running is False
+        for manager in managers[1:]:
+            manager.quit()
+        hub.close()
+        assert threading.active_count() == before
+
+    def test_engine_exit(self):
+        hub = EngineIOHub()
+        manager = EngineManager(io_hub=hub)
+        assert manager.load_ucci(FAKE_ENGINE, {}, {"depth": 1})
+        manager.engine.process.kill()
+        manager.engine.process.wait()
+        with pytest.raises(EngineError):
+            manager.run_engine(FULL_INIT_FEN)
+        hub.close()
+
+    def test_pool_uses_hub(self):
+        pool = EnginePool(3)
+        assert pool.load_uci(FAKE_ENGINE, {}, {"depth": 2})
+        assert len(pool.io_hub) == 3
+        assert not any(m.engine.is_alive() for m in pool.managers)
+        fens = [_fen(n) for n in range(1, 7)]
+        assert [a["score"] for a in pool.map(fens)] == [-n for n in range(1, 7)]
+        pool.quit()
+
+    def test_close_while_busy(self):
+        # 解析输出时阻塞的引擎，用来让集线器线程在 close 时仍未退出
+        class BlockingEngine:
+            def __init__(self, pout):
+                self.pout = pout
+                self.running = False
+                self.entered = threading.Event()
+                self.release = threading.Event()
+
+            def _handle_output(self, _output):
+                self.entered.set()
+                self.release.wait(10)
+
+            def _handle_eof(self):
+                self.running = False
+
+        read_fd, write_fd = os.pipe()
+        engine = BlockingEngine(os.fdopen(read_fd, encoding="utf-8"))
+        hub = EngineIOHub()
+        hub.register(engine)
+        os.write(write_fd, b"info\n")
+        assert engine.entered.wait(5)
+
+        hub.close(timeout=0.1)
+        # 线程仍在运行，选择器与唤醒管道留给它退出时释放
+        assert hub._thread is not None
+        with pytest.raises(EngineError):
+            hub.register(engine)
+        engine.release.set()
+        deadline = time.monotonic() + 5
+        while hub._thread is not None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert hub._thread is None
+        assert hub._selector.get_map() is None
+        os.close(write_fd)
+        engine.pout.close()
@@ -17,7 +17,12 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 import os
-from cchess import Game, ChessBoard, FULL_INIT_FEN
+import threading
+
+import pytest
+
+from cchess import Game, ChessBoard, FULL_INIT_FEN, Move, CChessError
+from cchess import move as move_module
 
 
 class TestGameExtended:
@@ -134,3 +139,100 @@ class TestGameExtended:
         assert game.first_move == move1
         assert game.last_move == move2
         assert game.first_move.next_move == move2
+
+    def _play_game(self, texts):
+        """按顺序走完 texts，返回 (game, 每步走子前的 FEN 列表)。"""
+        game = Game()
+        board = ChessBoard(FULL_INIT_FEN)
+        fens = []
+        for text in texts:
+            fens.append(board.to_fen())
+            game.append_next_move(board.move_text(text))
+        fens.append(board.to_fen())
+        return game, fens
+
+    def test_lazy_board_snapshots(self):
+        texts = ["炮二平五", "马8进7", "马二进三", "车9平8", "车一平二", "炮8进4"]
+        game, fens = self._play_game(texts)
+        moves = list(game.iter_moves())
+        # 只有首步保留自己的棋盘，其余走子挂入棋局树后不再持有棋盘
+        assert moves[0]._base_board is not None
+        assert all(m._base_board is None for m in moves[1:])
+        for move, fen in zip(reversed(moves), reversed(fens[:-1])):
+            assert move.board_before().to_fen() == fen
+        # board_after 的走子方与走子前一致
+        assert moves[-1].board_after().to_fen().split()[0] == fens[-1].split()[0]
+        assert moves[-1].board_after().move_side() == moves[-1].move_side
+
+    def test_lazy_board_cache_bounded(self):
+        texts = ["炮二平五", "马8进7", "马二进三", "车9平8", "车一平二", "炮8进4"]
+        old_size = Move.snapshot_cache_size
+        Move.snapshot_cache_size = 2
+        try:
+            game, fens = self._play_game(texts)
+            moves = list(game.iter_moves())
+            for move, fen in zip(moves, fens):
+                assert move.board_before().to_fen() == fen
+            cached = [m for m in moves if m._board_cache is not None]
+            assert len(cached) <= 2
+            Move.snapshot_cache_size = 0
+            assert moves[2].board_before().to_fen() == fens[2]
+            assert all(m._board_cache is None for m in moves)
+        finally:
+            Move.snapshot_cache_size = old_size
+
+    def test_lazy_board_cache_dead_moves(self):
+        texts = ["炮二平五", "马8进7", "马二进三", "车9平8"]
+        old_size = Move.snapshot_cache_size
+        Move.snapshot_cache_size = 3
+        try:
+            for _ in range(20):
+                # 被回收的走子的旧缓存项不影响新对象（即使复用了同一 id）
+                game, fens = self._play_game(texts)
+                moves = list(game.iter_moves())
+                for move, fen in zip(moves, fens):
+                    assert move.board_before().to_fen() == fen
+                assert moves[-1]._board_cache is not None
+                del game, moves
+            assert len(move_module._SNAPSHOT_CACHE) <= 3
+        finally:
+            Move.snapshot_cache_size = old_size
+
+    def test_lazy_board_cache_threads(self):
+        texts = ["炮二平五", "马8进7", "马二进三", "车9平8", "车一平二", "炮8进4"]
+        old_size = Move.snapshot_cache_size
+        Move.snapshot_cache_size = 4
+        errors = []
+
+        def replay():
+            try:
+                game, fens = self._play_game(texts)
+                moves = list(game.iter_moves())
+                for _ in range(50):
+                    for move, fen in zip(moves, fens):
+                        assert move.board_before().to_fen() == fen
+            except Exception as e:  # pylint: disable=broad-except
+                errors.append(e)
+
+        try:
+            threads = [threading.Thread(target=replay) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            Move.snapshot_cache_size = old_size
+        assert errors == []
+        assert len(move_module._SNAPSHOT_CACHE) <= 4
+
+    def test_lazy_board_after_mirror(self):
+        game, fens = self._play_game(["炮二平五", "马8进7", "马二进三"])
+        game.mirror()
+        for move, fen in zip(game.iter_moves(), fens):
+            assert move.board_before().to_fen() == ChessBoard(fen).mirror().to_fen()
+
+    def test_lazy_board_without_origin(self):
+        move = ChessBoard(FULL_INIT_FEN).move_text("炮二平五")
+        orphan = Move(move.move_info)
+        with pytest.raises(CChessError):
+            orphan.board_before()
@@ -91,3 +91,23 @@ class TestReaderXQF:
             with pytest.raises(SystemExit) as ctx:
                 rt_main.main()
             assert ctx.value.code == -1
+
+
+class TestPerftCommand:
+    def test_perft_suite(self, capsys):
+        testargs = ["prog", "perft", "-d", "2"]
+        with patch.object(sys, "argv", testargs):
+            rt_main.main()
+        out = capsys.readouterr().out
+        assert "startpos" in out
+        assert "depth 2: 1920 nodes" in out
+        assert "FAIL" not in out
+
+    def test_perft_divide(self, capsys):
+        testargs = ["prog", "perft", "-d", "1", "--divide", "--array"]
+        testargs += ["--fen", "3k5/9/9/9/9/9/9/9/9/R3K4 w"]
+        with patch.object(sys, "argv", testargs):
+            rt_main.main()
+        out = capsys.readouterr().out
+        assert "a0a9: 1" in out
+        assert "depth 1: 14 nodes" in out
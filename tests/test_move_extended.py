@@ -16,7 +16,7 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
-from cchess import FULL_INIT_FEN, RED, ChessBoard
+from cchess import FULL_INIT_FEN, RED, ChessBoard, Game
 
 
 class TestMoveExtended:
@@ -116,3 +116,71 @@ class TestMoveExtended:
         move.prepare_for_engine(RED, history)
         # 检查是否设置了必要的属性
         assert hasattr(move, "board_after")
+
+    def test_move_slots_and_extra_fields(self):
+        board = ChessBoard(FULL_INIT_FEN)
+        move = board.move_text("炮二平五")
+        assert not hasattr(move, "__dict__")
+        # 没有注释、评分时不分配附加结构
+        move.annote = None
+        move.score = None
+        assert move._extra is None
+        assert move.annote == ""
+        assert move.score is None
+        move.annote = "中炮"
+        move.score = 30
+        assert move._extra is not None
+        assert (move.annote, move.score) == ("中炮", 30)
+
+    def test_variations_shared_per_group(self):
+        board = ChessBoard(FULL_INIT_FEN)
+        move1 = board.copy().move_text("炮二平五")
+        assert move1._variations is None
+        assert move1.len_variations() == 1
+        assert move1.get_variations() == []
+        assert move1.get_variation_index() == (0, 1)
+
+        move2 = board.copy().move_text("马二进三")
+        move3 = board.copy().move_text("相三进五")
+        move1.add_variation(move2)
+        move1.add_variation(move3)
+        assert move1.variations_all is move2.variations_all is move3.variations_all
+        assert move1.variations_all == [move1, move2, move3]
+        assert move3.get_variation_index() == (2, 3)
+
+    def test_prepare_for_engine_long_history(self):
+        board = ChessBoard("3k5/9/9/9/9/9/9/9/9/4K4 w")
+        init_fen = board.to_fen()
+        game = Game(board)
+        steps = [((4, 0), (4, 1)), ((3, 9), (3, 8)), ((4, 1), (4, 0)), ((3, 8), (3, 9))]
+        for index in range(400):
+            game.append_next_move(board.move(*steps[index % 4]))
+
+        history = []
+        iccs_list = []
+        for move in game.iter_moves():
+            move.prepare_for_engine(move.move_side, history)
+            history.append(move)
+            iccs_list.append(move.to_iccs())
+            # 只记录指向上一步的链接，不复制序列
+            assert move._extra.engine_moves is None
+        # 倒序取字符串，再正序取（复用前一步缓存）结果一致
+        moves = list(game.iter_moves())
+        assert moves[-1].to_engine_fen() == " ".join([init_fen, "moves"] + iccs_list)
+        for index, move in enumerate(moves):
+            assert move.fen_for_engine == init_fen
+            assert move.move_list_for_engine == iccs_list[: index + 1]
+            assert move.to_engine_fen() == " ".join(
+                [init_fen, "moves"] + iccs_list[: index + 1]
+            )
+
+    def test_prepare_for_engine_after_capture(self):
+        board = ChessBoard("3k5/9/9/9/9/9/9/9/4r4/4K4 w")
+        move1 = board.move((4, 0), (4, 1))
+        move2 = board.move((3, 9), (3, 8))
+        move1.prepare_for_engine(move1.move_side, [])
+        move2.prepare_for_engine(move2.move_side, [move1])
+        assert move1.move_list_for_engine == []
+        assert move1.to_engine_fen() == move1.fen_for_engine
+        assert move2.fen_for_engine == move1.fen_for_engine
+        assert move2.to_engine_fen() == f"{move1.fen_for_engine} moves d9d8"
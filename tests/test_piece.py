@@ -16,7 +16,9 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
-from cchess import ANY_COLOR, BLACK, RED
+import random
+
+from cchess import ANY_COLOR, BLACK, FULL_INIT_FEN, RED, ChessBoard
 from cchess.common import next_color
 
 
@@ -31,3 +33,40 @@ class TestPiece:
         assert next_color(RED) == BLACK
         assert next_color(RED) == BLACK
         assert next_color(next_color(RED)) == RED
+
+    def test_table_moves_match_rules(self):
+        # 查表生成的走法应与逐格 is_valid_move 判断的结果一致
+        rnd = random.Random(9)
+        board = ChessBoard(FULL_INIT_FEN)
+        for _ in range(30):
+            for piece in board.get_all_pieces():
+                if piece.species == "k":
+                    continue
+                side = board.move_side()
+                board.set_move_side(piece.color)
+                pos = (piece.x, piece.y)
+                expected = {
+                    (pos, (x, y))
+                    for x in range(9)
+                    for y in range(10)
+                    if board.is_valid_move(pos, (x, y))
+                }
+                board.set_move_side(side)
+                assert set(piece.create_moves()) == expected, (board.to_fen(), pos)
+            moves = list(board.create_moves())
+            if not moves:
+                break
+            board.move(*rnd.choice(moves), check=False)
+
+    def test_king_moves(self):
+        board = ChessBoard("4k4/9/9/9/9/9/9/9/9/4K4 w")
+        king = board.get_king(RED)
+        assert sorted(king.create_moves()) == [
+            ((4, 0), (3, 0)),
+            ((4, 0), (4, 1)),
+            ((4, 0), (4, 9)),
+            ((4, 0), (5, 0)),
+        ]
+        board.put_fench("P", (4, 5))
+        assert ((4, 0), (4, 9)) not in board.get_king(RED).create_moves()
+        assert len(board.get_king(BLACK).create_moves()) == 3
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (C) 2024  walker li <walker8088@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from cchess import FULL_INIT_FEN, ChessBoard, Searcher
+from cchess.search import MATE_SCORE, evaluate
+
+
+class TestSearcher:
+    def test_evaluate_symmetric(self):
+        board = ChessBoard(FULL_INIT_FEN)
+        assert evaluate(board) == 0
+        board = ChessBoard("4k4/9/9/9/9/9/9/9/9/R3K4 w")
+        assert evaluate(board) == 600
+        board.next_turn()
+        assert evaluate(board) == -600
+
+    def test_mate_in_one(self):
+        fen = "3k5/9/9/9/9/9/9/9/4R4/4K4 w"
+        action = Searcher().search(fen, depth=3)
+        assert action["action"] == "bestmove"
+        board = ChessBoard(fen)
+        board.move_iccs(action["move"])
+        board.next_turn()
+        assert board.is_checkmate()
+        # 与 run_engine 一致：评分取走子后一方的视角
+        assert action["score"] == -(MATE_SCORE - 1)
+        assert action["mate"] == -1
+
+    def test_win_hanging_rook(self):
+        # 红车可以白吃黑车
+        fen = "3k5/9/9/9/4r4/9/9/9/4R4/5K3 w"
+        action = Searcher({"depth": 2}).run_engine(fen)
+        assert action["move"] == "e1e5"
+        assert action["score"] < -500
+
+    def test_action_shape(self):
+        infos = []
+        action = Searcher().search(FULL_INIT_FEN, depth=2, on_info=infos.append)
+        for key in ("fen_engine", "raw_msg", "action", "move", "score", "depth", "moves"):
+            assert key in action
+        assert action["raw_msg"].startswith(f"bestmove {action['move']}")
+        assert action["moves"][0] == action["move"]
+        assert [info["depth"] for info in infos] == [1, 2]
+        assert all(info["action"] == "info_move" for info in infos)
+        assert ChessBoard(FULL_INIT_FEN).is_valid_iccs_move(action["move"])
+
+    def test_dead_position(self):
+        fen = "3k5/9/9/9/9/9/9/9/3R5/4K4 b"
+        action = Searcher().search(fen, depth=2)
+        assert action["action"] == "dead"
+        assert action["mate"] == 0
+
+    def test_budget(self):
+        searcher = Searcher()
+        action = searcher.search(FULL_INIT_FEN, nodes=3000)
+        assert action["action"] == "bestmove"
+        assert searcher.nodes < 3000 + 1024
+        action = searcher.search(FULL_INIT_FEN, movetime=200)
+        assert action["action"] == "bestmove"
+        assert action["time"] < 1000
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (C) 2024  walker li <walker8088@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from cchess import ChessBoard, TranspositionTable
+from cchess.common import pack_move
+from cchess.perft import PERFT_POSITIONS, run_perft
+from cchess.ttable import ENTRY_BYTES, EXACT, LOWER, UPPER
+
+
+class TestTranspositionTable:
+    def test_size(self):
+        table = TranspositionTable(1)
+        assert len(table) == 1024 * 1024 // ENTRY_BYTES
+        assert table.size_mb == 1
+        # 不是 2 的幂时向下取整
+        table = TranspositionTable(0.7)
+        assert len(table) == 32768
+        assert len(TranspositionTable(0)) == 2
+
+    def test_store_probe(self):
+        table = TranspositionTable(0.1)
+        move = pack_move((7, 2), (4, 2))
+        table.store(12345, 6, LOWER, -29990, move)
+        assert table.probe(12345) == (6, LOWER, -29990, move)
+        table.store(-98765, 3, UPPER, 2**31 - 1)
+        assert table.probe(-98765) == (3, UPPER, 2**31 - 1, 0)
+        assert table.probe(777) is None
+        # 同一局面没有新走法时保留原走法
+        table.store(12345, 7, EXACT, 15)
+        assert table.probe(12345) == (7, EXACT, 15, move)
+        assert table.stats()["hits"] == 3
+        assert table.stats()["misses"] == 1
+
+    def test_replacement(self):
+        table = TranspositionTable(0)
+        # 只有一个桶，所有键都落在同一个桶中
+        table.store(2, 8, EXACT, 1)
+        table.store(4, 2, EXACT, 2)
+        # 第一项更深，浅的写入第二项
+        assert table.probe(2)[2] == 1
+        assert table.probe(4)[2] == 2
+        table.store(6, 3, EXACT, 3)
+        assert table.probe(4) is None
+        assert table.collisions == 1
+        # 新一代搜索时旧项被优先替换
+        table.new_search()
+        table.store(8, 1, EXACT, 4)
+        assert table.probe(2) is None
+        assert table.probe(8)[2] == 4
+        table.clear()
+        assert table.probe(8) is None
+        assert table.hashfull() == 0
+
+    def test_hashed_perft(self):
+        table = TranspositionTable(4)
+        for _name, fen, counts in PERFT_POSITIONS[:3]:
+            board = ChessBoard(fen)
+            assert board.perft(3, table) == counts[2]
+            assert board.perft(3, table) == counts[2]
+            assert board.to_fen() == ChessBoard(fen).to_fen()
+        assert table.hits > 0
+        assert run_perft(PERFT_POSITIONS[0][1], 3, hash_mb=1)[0] == 79666